@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import logging
+
+class CompactCatalog():
+    """
+    Compact binary modules catalog (modules.json content) read through memory mapping.
+
+    Only the looked up module entry is decoded, full catalog is never loaded in memory.
+
+    File format (little endian)::
+
+        header: magic (4s), version (H), reserved (H), modules count (I), strings count (I),
+                index offset (I), strings offset (I), catalog update timestamp (q)
+        strings: strings count + 1 offsets (I) relative to strings data, then utf8 strings data
+        index: modules count entries of module name string id (I) and record offset (I),
+               sorted by module name
+        records: encoded module entries
+
+    Values are encoded with a type byte followed by its payload. All strings (dict keys and
+    values) are interned in the strings table and referenced by their id.
+    """
+
+    MAGIC = b'CCAT'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHIIIIq')
+    UINT = struct.Struct('<I')
+    INDEX_ENTRY = struct.Struct('<II')
+    INT = struct.Struct('<q')
+    FLOAT = struct.Struct('<d')
+
+    TYPE_NONE = b'N'
+    TYPE_TRUE = b'T'
+    TYPE_FALSE = b'F'
+    TYPE_INT = b'i'
+    TYPE_FLOAT = b'f'
+    TYPE_STRING = b's'
+    TYPE_LIST = b'l'
+    TYPE_DICT = b'd'
+
+    def __init__(self, path):
+        """
+        Constructor
+
+        Args:
+            path (string): compact catalog file path
+
+        Raises:
+            Exception if file is not a valid compact catalog
+        """
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # mmap is only imported when compact catalog is used (low memory devices)
+        import mmap
+        self.__fd = open(path, 'rb')
+        try:
+            self.__mmap = mmap.mmap(self.__fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.__fd.close()
+            raise
+
+        (magic, version, _, self.__count, self.__strings_count, self.__index_offset,
+         self.__strings_offset, self.update) = self.HEADER.unpack_from(self.__mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise Exception('Invalid compact catalog file "%s"' % path)
+        self.__strings_data_offset = self.__strings_offset + (self.__strings_count + 1) * self.UINT.size
+
+    def close(self):
+        """
+        Close catalog
+        """
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+        self.__fd.close()
+
+    def __len__(self):
+        return self.__count
+
+    def __contains__(self, module_name):
+        return self._find(module_name) is not None
+
+    def names(self):
+        """
+        Return catalog module names
+
+        Returns:
+            list: sorted module names
+        """
+        return [self._get_string(self._get_index_entry(position)[0]) for position in range(self.__count)]
+
+    def get(self, module_name):
+        """
+        Return module entry
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            dict: module entry as in modules.json or None if module is not in catalog
+        """
+        offset = self._find(module_name)
+        if offset is None:
+            return None
+
+        value, _ = self._decode(offset)
+        return value
+
+    def _get_index_entry(self, position):
+        """
+        Return index entry at specified position
+
+        Returns:
+            tuple: module name string id and record offset
+        """
+        return self.INDEX_ENTRY.unpack_from(self.__mmap, self.__index_offset + position * self.INDEX_ENTRY.size)
+
+    def _get_string(self, string_id):
+        """
+        Return interned string
+
+        Args:
+            string_id (int): string id
+
+        Returns:
+            string: string value
+        """
+        start, end = struct.unpack_from('<II', self.__mmap, self.__strings_offset + string_id * self.UINT.size)
+        return self.__mmap[self.__strings_data_offset + start:self.__strings_data_offset + end].decode('utf8')
+
+    def _find(self, module_name):
+        """
+        Binary search module in index
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            int: module record offset or None if module not found
+        """
+        low = 0
+        high = self.__count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            name_id, offset = self._get_index_entry(middle)
+            name = self._get_string(name_id)
+            if name == module_name:
+                return offset
+            if name < module_name:
+                low = middle + 1
+            else:
+                high = middle - 1
+
+        return None
+
+    def _decode(self, offset):
+        """
+        Decode value at specified offset
+
+        Args:
+            offset (int): value offset
+
+        Returns:
+            tuple: decoded value and offset of next value
+        """
+        value_type = self.__mmap[offset:offset+1]
+        offset += 1
+        if value_type == self.TYPE_STRING:
+            return self._get_string(self.UINT.unpack_from(self.__mmap, offset)[0]), offset + self.UINT.size
+        if value_type == self.TYPE_NONE:
+            return None, offset
+        if value_type == self.TYPE_TRUE:
+            return True, offset
+        if value_type == self.TYPE_FALSE:
+            return False, offset
+        if value_type == self.TYPE_INT:
+            return self.INT.unpack_from(self.__mmap, offset)[0], offset + self.INT.size
+        if value_type == self.TYPE_FLOAT:
+            return self.FLOAT.unpack_from(self.__mmap, offset)[0], offset + self.FLOAT.size
+
+        count = self.UINT.unpack_from(self.__mmap, offset)[0]
+        offset += self.UINT.size
+        if value_type == self.TYPE_LIST:
+            values = []
+            for _ in range(count):
+                value, offset = self._decode(offset)
+                values.append(value)
+            return values, offset
+        if value_type == self.TYPE_DICT:
+            values = {}
+            for _ in range(count):
+                key = self._get_string(self.UINT.unpack_from(self.__mmap, offset)[0])
+                value, offset = self._decode(offset + self.UINT.size)
+                values[key] = value
+            return values, offset
+
+        raise Exception('Invalid value type at offset %d in compact catalog "%s"' % (offset - 1, self.path))
+
+    @staticmethod
+    def build(path, modules_json):
+        """
+        Build compact catalog file from modules.json content
+
+        Args:
+            path (string): compact catalog file path
+            modules_json (dict): modules.json content
+
+        Returns:
+            CompactCatalog: opened compact catalog
+        """
+        strings = {}
+        def intern(value):
+            if value not in strings:
+                strings[value] = len(strings)
+            return strings[value]
+
+        def encode(value, out):
+            if value is None:
+                out.append(CompactCatalog.TYPE_NONE)
+            elif value is True:
+                out.append(CompactCatalog.TYPE_TRUE)
+            elif value is False:
+                out.append(CompactCatalog.TYPE_FALSE)
+            elif isinstance(value, int):
+                out.append(CompactCatalog.TYPE_INT + CompactCatalog.INT.pack(value))
+            elif isinstance(value, float):
+                out.append(CompactCatalog.TYPE_FLOAT + CompactCatalog.FLOAT.pack(value))
+            elif isinstance(value, str):
+                out.append(CompactCatalog.TYPE_STRING + CompactCatalog.UINT.pack(intern(value)))
+            elif isinstance(value, (list, tuple)):
+                out.append(CompactCatalog.TYPE_LIST + CompactCatalog.UINT.pack(len(value)))
+                for item in value:
+                    encode(item, out)
+            elif isinstance(value, dict):
+                out.append(CompactCatalog.TYPE_DICT + CompactCatalog.UINT.pack(len(value)))
+                for key, item in value.items():
+                    out.append(CompactCatalog.UINT.pack(intern(key)))
+                    encode(item, out)
+            else:
+                raise Exception('Unsupported value type "%s" in modules catalog' % type(value).__name__)
+
+        # encode records
+        modules = modules_json.get('list', {})
+        records = []
+        records_offsets = {}
+        records_size = 0
+        for module_name in sorted(modules.keys()):
+            intern(module_name)
+            out = []
+            encode(modules[module_name], out)
+            record = b''.join(out)
+            records_offsets[module_name] = records_size
+            records_size += len(record)
+            records.append(record)
+
+        # encode strings table
+        strings_data = []
+        strings_offsets = [0]
+        for value in sorted(strings.keys(), key=lambda key: strings[key]):
+            data = value.encode('utf8')
+            strings_data.append(data)
+            strings_offsets.append(strings_offsets[-1] + len(data))
+        strings_table = struct.pack('<%dI' % len(strings_offsets), *strings_offsets) + b''.join(strings_data)
+
+        # compute sections offsets
+        strings_offset = CompactCatalog.HEADER.size
+        index_offset = strings_offset + len(strings_table)
+        records_offset = index_offset + len(modules) * CompactCatalog.INDEX_ENTRY.size
+        index = b''.join([
+            CompactCatalog.INDEX_ENTRY.pack(strings[module_name], records_offset + records_offsets[module_name])
+            for module_name in sorted(modules.keys())
+        ])
+        header = CompactCatalog.HEADER.pack(
+            CompactCatalog.MAGIC,
+            CompactCatalog.VERSION,
+            0,
+            len(modules),
+            len(strings),
+            index_offset,
+            strings_offset,
+            int(modules_json.get('update') or 0),
+        )
+
+        # write file atomically
+        tmp_path = '%s.tmp' % path
+        with open(tmp_path, 'wb') as fd:
+            fd.write(header)
+            fd.write(strings_table)
+            fd.write(index)
+            for record in records:
+                fd.write(record)
+        os.replace(tmp_path, path)
+
+        return CompactCatalog(path)
+
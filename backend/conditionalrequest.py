@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+
+class ConditionalRequest():
+    """
+    Check if remote resource has changed using http validators (ETag and Last-Modified headers)
+    without downloading it.
+    """
+
+    TIMEOUT = 10.0
+
+    def __init__(self, url, validators=None):
+        """
+        Constructor
+
+        Args:
+            url (string): remote resource url
+            validators (dict): validators of last retrieved resource (see get_validators)
+        """
+        self.url = url
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__validators = validators or {}
+        self.__pending_validators = None
+
+    def get_validators(self):
+        """
+        Return validators of last retrieved resource
+
+        Returns:
+            dict: validators::
+
+                {
+                    etag (string): ETag header value
+                    lastmodified (string): Last-Modified header value
+                }
+
+        """
+        return dict(self.__validators)
+
+    def reset(self):
+        """
+        Forget stored validators. Next check will report resource as modified
+        """
+        self.__validators = {}
+        self.__pending_validators = None
+
+    def is_modified(self):
+        """
+        Check if remote resource has been modified since last commit
+
+        Notes:
+            New validators are only stored when commit is called, once resource has really been
+            retrieved. Any request error reports resource as modified.
+
+        Returns:
+            bool: True if resource has been modified (or if it can't be determined)
+        """
+        self.__pending_validators = None
+        headers = {}
+        if self.__validators.get('etag'):
+            headers['If-None-Match'] = self.__validators['etag']
+        if self.__validators.get('lastmodified'):
+            headers['If-Modified-Since'] = self.__validators['lastmodified']
+
+        # http stack is only imported when a check is really performed
+        import urllib.error
+        import urllib.request
+        try:
+            request = urllib.request.Request(self.url, headers=headers, method='HEAD')
+            with urllib.request.urlopen(request, timeout=self.TIMEOUT) as resp:
+                validators = {
+                    'etag': resp.headers.get('ETag'),
+                    'lastmodified': resp.headers.get('Last-Modified'),
+                }
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                self.logger.debug('Resource "%s" not modified' % self.url)
+                return False
+            self.logger.warning('Unable to check if "%s" is modified: %s' % (self.url, str(error)))
+            return True
+        except Exception as error:
+            self.logger.warning('Unable to check if "%s" is modified: %s' % (self.url, str(error)))
+            return True
+
+        # some servers ignore conditional headers on HEAD requests
+        if validators['etag'] and validators['etag'] == self.__validators.get('etag'):
+            self.logger.debug('Resource "%s" not modified (same ETag)' % self.url)
+            return False
+
+        self.__pending_validators = validators
+        return True
+
+    def commit(self):
+        """
+        Store validators received during last check. Must be called once resource has been
+        successfully retrieved.
+        """
+        if self.__pending_validators is not None:
+            self.__validators = self.__pending_validators
+            self.__pending_validators = None
+
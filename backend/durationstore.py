@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import math
+import time
+import logging
+import threading
+
+class DurationStore():
+    """
+    Persisted durations of applications and Cleep processes.
+
+    Most recent timings are kept for each action and module in a ring buffer (oldest timing is
+    dropped when buffer is full). Each timing stores duration of process phases:
+
+        - resolve: sub actions computation (dependencies resolution)
+        - download: package download (staging)
+        - install: install/update/uninstall process execution
+        - callback: end of process handling (logs storage, configuration update)
+
+    Timings are stored as compact lists ([timestamp, version, resolve, download, install, callback])
+    to keep file small.
+    """
+
+    PHASES = ('resolve', 'download', 'install', 'callback')
+
+    def __init__(self, cleep_filesystem, path, max_records=20):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+            path (string): durations file path
+            max_records (int): maximum number of timings kept per action and module
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.path = path
+        self.max_records = max_records
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__lock = threading.Lock()
+        self.__durations = None
+
+    def record(self, action, module_name, version, phases):
+        """
+        Record timing of a process
+
+        Args:
+            action (string): action name (install, update, uninstall)
+            module_name (string): module name ("cleep" for Cleep update)
+            version (string): module version concerned by action
+            phases (dict): phases durations (seconds). Missing phases are stored as 0
+        """
+        timing = [int(time.time()), version]
+        timing.extend([round(phases.get(phase) or 0.0, 3) for phase in self.PHASES])
+
+        with self.__lock:
+            durations = self._get_durations()
+            records = durations.setdefault(self._get_key(action, module_name), [])
+            records.append(timing)
+            if len(records) > self.max_records:
+                del records[:len(records) - self.max_records]
+            self._save()
+
+    def get_records(self, action, module_name):
+        """
+        Return recorded timings of specified action and module
+
+        Args:
+            action (string): action name (install, update, uninstall)
+            module_name (string): module name
+
+        Returns:
+            list: timings, most recent last::
+
+                [
+                    {
+                        timestamp (int): process end timestamp
+                        version (string): module version
+                        duration (float): process duration (all phases)
+                        phases (dict): phases durations (resolve, download, install, callback)
+                    },
+                    ...
+                ]
+
+        """
+        with self.__lock:
+            records = list(self._get_durations().get(self._get_key(action, module_name), []))
+
+        timings = []
+        for record in records:
+            phases = dict(zip(self.PHASES, record[2:]))
+            timings.append({
+                'timestamp': record[0],
+                'version': record[1],
+                'duration': round(sum(phases.values()), 3),
+                'phases': phases,
+            })
+
+        return timings
+
+    def estimate(self, action, module_name, phases=None):
+        """
+        Estimate process duration from recorded timings
+
+        Args:
+            action (string): action name (install, update, uninstall)
+            module_name (string): module name
+            phases (list): phases to take into account. All phases if None
+
+        Returns:
+            dict: estimation or None if there is no timing::
+
+                {
+                    samples (int): number of timings used
+                    p50 (float): median duration (seconds)
+                    p95 (float): 95th percentile duration (seconds)
+                    phases (dict): median duration of each phase
+                }
+
+        """
+        timings = self.get_records(action, module_name)
+        if not timings:
+            return None
+
+        phases = phases or self.PHASES
+        durations = [sum([timing['phases'][phase] for phase in phases]) for timing in timings]
+        return {
+            'samples': len(timings),
+            'p50': self._percentile(durations, 50),
+            'p95': self._percentile(durations, 95),
+            'phases': {
+                phase: self._percentile([timing['phases'][phase] for timing in timings], 50)
+                for phase in phases
+            },
+        }
+
+    def _percentile(self, values, percent):
+        """
+        Compute percentile using nearest rank method
+
+        Args:
+            values (list): values
+            percent (int): percentile (0-100)
+
+        Returns:
+            float: percentile value
+        """
+        values = sorted(values)
+        rank = max(int(math.ceil(percent / 100.0 * len(values))), 1)
+        return round(values[rank - 1], 3)
+
+    def _get_key(self, action, module_name):
+        """
+        Return durations key of specified action and module
+        """
+        return '%s:%s' % (action, module_name)
+
+    def _get_durations(self):
+        """
+        Return durations, loading them if necessary
+
+        Returns:
+            dict: durations::
+
+                {
+                    action:module (string): list of timings (list)
+                    ...
+                }
+
+        """
+        if self.__durations is None:
+            durations = None
+            if os.path.exists(self.path):
+                durations = self.cleep_filesystem.read_json(self.path)
+            self.__durations = durations if isinstance(durations, dict) else {}
+
+        return self.__durations
+
+    def _save(self):
+        """
+        Save durations to filesystem
+        """
+        if not self.cleep_filesystem.write_json(self.path, self.__durations):
+            self.logger.error('Unable to save durations to "%s"' % self.path)
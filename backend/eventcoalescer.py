@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+import threading
+
+class EventCoalescer():
+    """
+    Rate limit events sent for the same key (usually event name and module name).
+
+    At most one event is sent per interval and per key: events received during interval are
+    merged, only last one is sent at the end of interval. Terminal events (end of process) are
+    always sent immediately, dropping pending event of the same key.
+
+    Each event gets a sequence number when it is received. Events of the same key are sent in
+    sequence order: an event older than last sent one of its key (a pending event flushed by
+    timer while a terminal event was sent) is dropped.
+    """
+
+    def __init__(self, interval=0.5):
+        """
+        Constructor
+
+        Args:
+            interval (float): minimum duration (seconds) between two events of the same key
+        """
+        self.interval = interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__lock = threading.Lock()
+        self.__send_lock = threading.Lock()
+        # per key state
+        self.__keys = {}
+        self.__sequence = 0
+        # per key sequence number of last sent event
+        self.__sent_sequences = {}
+        self.__stats = {
+            'sent': 0,
+            'merged': 0,
+            'dropped': 0,
+        }
+
+    def send(self, key, callback, params, terminal=False):
+        """
+        Send event or postpone it if an event with the same key was sent recently
+
+        Args:
+            key (any): event key
+            callback (function): function sending event, called with params
+            params (dict): event parameters
+            terminal (bool): True if event must be sent immediately (end of process)
+        """
+        with self.__lock:
+            self.__sequence += 1
+            sequence = self.__sequence
+            state = self.__keys.get(key)
+            if state is None:
+                state = {
+                    'lastsend': 0,
+                    'pending': None,
+                    'timer': None,
+                }
+                self.__keys[key] = state
+
+            if terminal:
+                if state['pending'] is not None:
+                    self.__stats['dropped'] += 1
+                self._cancel_timer(state)
+                del self.__keys[key]
+                send_now = True
+            elif state['pending'] is None and time.time() - state['lastsend'] >= self.interval:
+                state['lastsend'] = time.time()
+                send_now = True
+            else:
+                if state['pending'] is not None:
+                    self.__stats['merged'] += 1
+                state['pending'] = (callback, params, sequence)
+                if state['timer'] is None:
+                    delay = max(0.0, self.interval - (time.time() - state['lastsend']))
+                    state['timer'] = threading.Timer(delay, self._flush, [key, state])
+                    state['timer'].daemon = True
+                    state['timer'].start()
+                send_now = False
+
+        if send_now:
+            self._send(key, callback, params, sequence)
+
+    def get_stats(self):
+        """
+        Return coalescer statistics
+
+        Returns:
+            dict: statistics::
+
+                {
+                    sent (int): number of sent events
+                    merged (int): number of events replaced by a more recent one
+                    dropped (int): number of pending events dropped by a terminal event
+                    pending (int): number of events waiting to be sent
+                }
+
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['pending'] = len([state for state in self.__keys.values() if state['pending'] is not None])
+
+        return stats
+
+    def stop(self):
+        """
+        Stop all pending timers. Pending events are not sent
+        """
+        with self.__lock:
+            for state in self.__keys.values():
+                self._cancel_timer(state)
+            self.__keys.clear()
+            self.__sent_sequences.clear()
+
+    def _flush(self, key, state):
+        """
+        Send pending event (timer callback)
+
+        Args:
+            key (any): event key
+            state (dict): key state
+        """
+        with self.__lock:
+            state['timer'] = None
+            if self.__keys.get(key) is not state or state['pending'] is None:
+                return
+            callback, params, sequence = state['pending']
+            state['pending'] = None
+            state['lastsend'] = time.time()
+
+        # a terminal event may have been sent since lock was released, _send drops this one then
+        self._send(key, callback, params, sequence)
+
+    def _cancel_timer(self, state):
+        """
+        Cancel key timer
+
+        Args:
+            state (dict): key state
+        """
+        if state['timer']:
+            state['timer'].cancel()
+            state['timer'] = None
+
+    def _send(self, key, callback, params, sequence):
+        """
+        Send event if no more recent event of the same key was sent
+
+        Args:
+            key (any): event key
+            callback (function): function sending event
+            params (dict): event parameters
+            sequence (int): event sequence number
+        """
+        # send lock is held during callback so events are sent in sequence check order
+        with self.__send_lock:
+            with self.__lock:
+                if sequence <= self.__sent_sequences.get(key, 0):
+                    self.logger.debug('Drop event with params %s older than last sent one' % params)
+                    self.__stats['dropped'] += 1
+                    return
+                self.__sent_sequences[key] = sequence
+                self.__stats['sent'] += 1
+            try:
+                callback(params)
+            except Exception:
+                self.logger.exception('Error sending event with params %s' % params)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib
+import threading
+
+class LazyImport():
+    """
+    Proxy of a module attribute (usually a class) imported on first use.
+
+    It allows to declare heavy dependencies at module level (so they can still be patched during
+    tests) without paying their import cost until they are really used::
+
+        Install = LazyImport('cleep.libs.internals.install', 'Install')
+        Install.STATUS_DONE                  # module is imported here
+        Install(cleep_filesystem, ...)       # instance of real class
+    """
+
+    def __init__(self, module_name, attribute_name):
+        """
+        Constructor
+
+        Args:
+            module_name (string): module to import
+            attribute_name (string): module attribute to proxy
+        """
+        self.__module_name = module_name
+        self.__attribute_name = attribute_name
+        self.__attribute = None
+        self.__lock = threading.Lock()
+
+    def is_loaded(self):
+        """
+        Return True if proxied attribute has already been imported
+
+        Returns:
+            bool: True if attribute is imported
+        """
+        return self.__attribute is not None
+
+    def resolve(self):
+        """
+        Import proxied attribute if necessary and return it
+
+        Returns:
+            any: proxied attribute
+        """
+        if self.__attribute is None:
+            with self.__lock:
+                if self.__attribute is None:
+                    module = importlib.import_module(self.__module_name)
+                    self.__attribute = getattr(module, self.__attribute_name)
+
+        return self.__attribute
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return '<LazyImport %s.%s%s>' % (
+            self.__module_name,
+            self.__attribute_name,
+            '' if self.is_loaded() else ' (not loaded)',
+        )
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+
+class LogsIndex():
+    """
+    Persisted index of applications and Cleep process logs.
+
+    It avoids listing install directory and stat'ing each log file every time logs infos are
+    requested. Index is updated each time a process status is stored and is rebuilt from
+    filesystem only when index file is missing.
+    """
+
+    def __init__(self, cleep_filesystem, install_path, index_path, success_filename, failure_filename):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+            install_path (string): path of directory containing modules process logs directories
+            index_path (string): index file path
+            success_filename (string): process success log filename
+            failure_filename (string): process failure log filename
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.install_path = install_path
+        self.index_path = index_path
+        self.success_filename = success_filename
+        self.failure_filename = failure_filename
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__index = None
+
+    def get(self, module_name):
+        """
+        Return infos about most recent process log of specified module
+
+        Args:
+            module_name (string): module name ("cleep" for Cleep process logs)
+
+        Returns:
+            dict: last process log infos or None if no log::
+
+                {
+                    timestamp (int): log file timestamp
+                    path (string): log file path
+                    size (int): log file size
+                    failed (bool): True if last process failed
+                }
+
+        """
+        entry = self._get_index().get(module_name)
+        if not entry:
+            return None
+
+        success = entry.get('success')
+        failure = entry.get('failure')
+        if not success and not failure:
+            return None
+
+        # keep most recent one
+        if success and (not failure or success['timestamp'] > failure['timestamp']):
+            return {
+                'timestamp': success['timestamp'],
+                'path': success['path'],
+                'size': success['size'],
+                'failed': False,
+            }
+
+        return {
+            'timestamp': failure['timestamp'],
+            'path': failure['path'],
+            'size': failure['size'],
+            'failed': True,
+        }
+
+    def get_module_names(self):
+        """
+        Return names of modules that have process logs
+
+        Returns:
+            list: modules names
+        """
+        return list(self._get_index().keys())
+
+    def update(self, module_name, path, failed):
+        """
+        Update index after process log has been written
+
+        Args:
+            module_name (string): module name ("cleep" for Cleep process logs)
+            path (string): written log file path
+            failed (bool): True if process failed
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.logger.warning('Unable to index process log "%s"' % path)
+            return
+
+        entry = self._get_index().setdefault(module_name, {'success': None, 'failure': None})
+        entry['failure' if failed else 'success'] = {
+            'timestamp': int(stat.st_mtime),
+            'path': path,
+            'size': stat.st_size,
+        }
+        self._save()
+
+    def rebuild(self):
+        """
+        Rebuild index scanning install directory
+        """
+        self.logger.debug('Rebuild process logs index from "%s"' % self.install_path)
+        index = {}
+        if os.path.exists(self.install_path):
+            for dir_entry in os.scandir(self.install_path):
+                if not dir_entry.is_dir():
+                    continue
+                entry = {
+                    'success': self._get_log_infos(os.path.join(dir_entry.path, self.success_filename)),
+                    'failure': self._get_log_infos(os.path.join(dir_entry.path, self.failure_filename)),
+                }
+                if entry['success'] or entry['failure']:
+                    index[dir_entry.name] = entry
+
+        self.__index = index
+        if os.path.exists(self.install_path):
+            self._save()
+
+    def _get_log_infos(self, path):
+        """
+        Return log file infos
+
+        Args:
+            path (string): log file path
+
+        Returns:
+            dict: log infos (timestamp, path and size) or None if file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return {
+            'timestamp': int(stat.st_mtime),
+            'path': path,
+            'size': stat.st_size,
+        }
+
+    def _get_index(self):
+        """
+        Return index, loading or rebuilding it if necessary
+
+        Returns:
+            dict: index::
+
+                {
+                    module name (string): {
+                        success (dict): success log infos (timestamp, path, size) or None
+                        failure (dict): failure log infos (timestamp, path, size) or None
+                    },
+                    ...
+                }
+
+        """
+        if self.__index is None:
+            index = None
+            if os.path.exists(self.index_path):
+                index = self.cleep_filesystem.read_json(self.index_path)
+            if isinstance(index, dict):
+                self.__index = index
+            else:
+                self.rebuild()
+
+        return self.__index
+
+    def _save(self):
+        """
+        Save index to filesystem
+        """
+        if not self.cleep_filesystem.write_json(self.index_path, self.__index):
+            self.logger.error('Unable to save process logs index to "%s"' % self.index_path)
+
@@ -0,0 +1,417 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+ModuleUpdateValues = namedtuple('ModuleUpdateValues', [
+    'name',
+    'version',
+    'updatable',
+    'processing',
+    'pending',
+    'progress',
+    'eta',
+    'failed',
+    'update_version',
+    'changelog',
+])
+
+class ModulesSnapshot(namedtuple('ModulesSnapshot', [
+    'revision',
+    'resetrevision',
+    'modules',
+    'revisions',
+    'installed',
+    'updatable',
+    'processing',
+])):
+    """
+    Published modules states. Modules are ModuleUpdateValues shared with store records, modules
+    updates dicts are only built by to_dict
+    """
+
+    __slots__ = ()
+
+    def to_dict(self, module_names=None):
+        """
+        Return snapshot modules as modules updates dict
+
+        Args:
+            module_names (iterable): only serialize specified modules. All modules if None
+
+        Returns:
+            dict: modules updates (see ModulesState.to_dict)
+        """
+        if module_names is None:
+            module_names = self.modules.keys()
+
+        return {
+            module_name: ModuleUpdateState.values_to_dict(self.modules[module_name])
+            for module_name in module_names
+            if module_name in self.modules
+        }
+
+class ModuleUpdateState():
+    """
+    Module update state record.
+
+    Record values are stored in an immutable ModuleUpdateValues replaced on each change, so
+    published snapshots can reference them without copy.
+
+    Item access (state['processing'], state['update']['progress']) is supported to keep the
+    modules updates dict format used by api.
+    """
+
+    __slots__ = ('_store', '_values')
+
+    # dict keys of "update" sub dict mapped to record attributes
+    UPDATE_FIELDS = {
+        'progress': 'progress',
+        'eta': 'eta',
+        'failed': 'failed',
+        'version': 'update_version',
+        'changelog': 'changelog',
+    }
+    FIELDS = ('updatable', 'processing', 'pending', 'name', 'version')
+
+    def __init__(self, store, name, version, update_version=None):
+        """
+        Constructor
+
+        Args:
+            store (ModulesState): store the record belongs to
+            name (string): module name
+            version (string): installed module version, None if module is not installed yet
+            update_version (string): module version after update
+        """
+        self._store = store
+        self._values = ModuleUpdateValues(name, version, False, False, False, 0, None, False, update_version, None)
+
+    def __getitem__(self, key):
+        if key == 'update':
+            return ModuleUpdateStateUpdate(self)
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key == 'update':
+            for update_key, update_value in value.items():
+                setattr(self, self.UPDATE_FIELDS[update_key], update_value)
+            return
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __getattr__(self, key):
+        # only called for record values (not slots)
+        if key not in ModuleUpdateValues._fields:
+            raise AttributeError(key)
+        return getattr(self._values, key)
+
+    def __setattr__(self, key, value):
+        if key in self.__slots__:
+            object.__setattr__(self, key, value)
+            return
+        if key not in ModuleUpdateValues._fields:
+            raise AttributeError(key)
+        object.__setattr__(self, '_values', self._values._replace(**{key: value}))
+        if key in ('version', 'updatable', 'processing'):
+            # keep store indexes up to date
+            self._store._index(self)
+        self._store._mark_dirty(self)
+
+    def to_dict(self):
+        """
+        Return record as modules updates dict entry
+
+        Returns:
+            dict: module update data::
+
+                {
+                    updatable (bool): True if module is updatable
+                    processing (bool): True if module has action in progress
+                    pending (bool): True if module has been updated/uninstalled/installed
+                    name (string): module name
+                    version (string): installed module version, None if module is not installed yet
+                    update (dict): update data::
+
+                        {
+                            progress (float): progress percentage (0-100)
+                            eta (int): estimated remaining duration (seconds), None if unknown
+                            failed (bool): True if process has failed
+                            version (string): update version
+                            changelog (string): update changelog
+                        }
+
+                }
+
+        """
+        return self.values_to_dict(self._values)
+
+    @staticmethod
+    def values_to_dict(values):
+        """
+        Return record values as modules updates dict entry
+
+        Args:
+            values (ModuleUpdateValues): record values
+
+        Returns:
+            dict: module update data (see to_dict)
+        """
+        return {
+            'updatable': values.updatable,
+            'processing': values.processing,
+            'pending': values.pending,
+            'name': values.name,
+            'version': values.version,
+            'update': {
+                'progress': values.progress,
+                'eta': values.eta,
+                'failed': values.failed,
+                'version': values.update_version,
+                'changelog': values.changelog,
+            },
+        }
+
+class ModuleUpdateStateUpdate():
+    """
+    Item access view on "update" fields of a module update state record
+    """
+
+    __slots__ = ('_record',)
+
+    def __init__(self, record):
+        self._record = record
+
+    def __getitem__(self, key):
+        return getattr(self._record, ModuleUpdateState.UPDATE_FIELDS[key])
+
+    def __setitem__(self, key, value):
+        setattr(self._record, ModuleUpdateState.UPDATE_FIELDS[key], value)
+
+class ModulesState():
+    """
+    Modules update states store.
+
+    It maintains installed, updatable and processing modules indexes while records are updated,
+    so membership checks do not need to scan all records. Records are serialized to modules
+    updates dict format only on demand.
+
+    Writers update records inside writer() context which holds store lock and publishes a new
+    snapshot when leaving. Snapshots reference immutable records values, so they are never modified
+    once published and readers can use them without locking nor copying. Unchanged records values
+    are shared by records and snapshots, only values changed since last snapshot exist twice.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.__records = {}
+        self.__lock = threading.RLock()
+        self.__writers = 0
+        self.__dirty = set()
+        self.__revision = 0
+        self.__reset_revision = 0
+        self.__revisions = {}
+        self.installed = set()
+        self.updatable = set()
+        self.processing = set()
+        self.__snapshot = ModulesSnapshot(0, 0, {}, {}, frozenset(), frozenset(), frozenset())
+
+    @contextmanager
+    def writer(self):
+        """
+        Context manager to use when updating records. Snapshot is published at the end of
+        the outermost writer context
+        """
+        with self.__lock:
+            self.__writers += 1
+            try:
+                yield self
+            finally:
+                self.__writers -= 1
+                if self.__writers == 0:
+                    self.publish()
+
+    def touch(self, module_name=None):
+        """
+        Increase store revision after records changed
+
+        Args:
+            module_name (string): changed module name. If None all records changed
+        """
+        with self.__lock:
+            self.__revision += 1
+            if module_name is None:
+                self.__revisions.clear()
+                self.__reset_revision = self.__revision
+            else:
+                self.__revisions[module_name] = self.__revision
+
+    def publish(self):
+        """
+        Publish new snapshot with current records
+        """
+        with self.__lock:
+            previous = self.__snapshot
+            modules = dict(previous.modules)
+            for module_name in self.__dirty:
+                if module_name in self.__records:
+                    modules[module_name] = self.__records[module_name]._values
+                else:
+                    modules.pop(module_name, None)
+            self.__dirty.clear()
+            self.__snapshot = ModulesSnapshot(
+                self.__revision,
+                self.__reset_revision,
+                modules,
+                dict(self.__revisions),
+                frozenset(self.installed),
+                frozenset(self.updatable),
+                frozenset(self.processing),
+            )
+
+    def get_snapshot(self):
+        """
+        Return last published snapshot. Snapshot content must not be modified
+
+        Returns:
+            ModulesSnapshot: snapshot (revision, resetrevision, modules, revisions, installed,
+                             updatable and processing)
+        """
+        return self.__snapshot
+
+    def add(self, module_name, version, update_version=None):
+        """
+        Add (or replace) module record
+
+        Args:
+            module_name (string): module name
+            version (string): installed module version, None if module is not installed yet
+            update_version (string): module version after update
+
+        Returns:
+            ModuleUpdateState: added record
+        """
+        record = ModuleUpdateState(self, module_name, version, update_version)
+        with self.__lock:
+            self.__records[module_name] = record
+            self._index(record)
+            self.__dirty.add(module_name)
+
+        return record
+
+    def clear(self, keep=None):
+        """
+        Remove all records
+
+        Args:
+            keep (iterable): names of modules whose records must be kept
+        """
+        with self.__lock:
+            kept = {module_name: self.__records[module_name] for module_name in keep or [] if module_name in self.__records}
+            self.__dirty.update(module_name for module_name in self.__records if module_name not in kept)
+            self.__records.clear()
+            self.__records.update(kept)
+            self.installed.clear()
+            self.updatable.clear()
+            self.processing.clear()
+            for record in kept.values():
+                self._index(record)
+
+    def load(self, modules_updates):
+        """
+        Replace records with modules updates dict content
+
+        Args:
+            modules_updates (dict): modules updates (see ModuleUpdateState.to_dict)
+        """
+        with self.writer():
+            self.clear()
+            for module_name, module in modules_updates.items():
+                record = self.add(module_name, module.get('version'))
+                for key in ('updatable', 'processing', 'pending', 'update'):
+                    if key in module:
+                        record[key] = module[key]
+            self.touch()
+
+    def to_dict(self, module_names=None):
+        """
+        Return records as modules updates dict
+
+        Args:
+            module_names (iterable): only serialize specified modules. All modules if None
+
+        Returns:
+            dict: modules updates::
+
+                {
+                    module name (string): module update data (see ModuleUpdateState.to_dict)
+                    ...
+                }
+
+        """
+        if module_names is None:
+            return {module_name: record.to_dict() for module_name, record in self.__records.items()}
+
+        return {
+            module_name: self.__records[module_name].to_dict()
+            for module_name in module_names
+            if module_name in self.__records
+        }
+
+    def get(self, module_name, default=None):
+        return self.__records.get(module_name, default)
+
+    def keys(self):
+        return self.__records.keys()
+
+    def values(self):
+        return self.__records.values()
+
+    def items(self):
+        return self.__records.items()
+
+    def __getitem__(self, module_name):
+        return self.__records[module_name]
+
+    def __contains__(self, module_name):
+        return module_name in self.__records
+
+    def __iter__(self):
+        return iter(self.__records)
+
+    def __len__(self):
+        return len(self.__records)
+
+    def _mark_dirty(self, record):
+        """
+        Mark record as changed since last published snapshot
+
+        Args:
+            record (ModuleUpdateState): updated record
+        """
+        if self.__records.get(record.name) is record:
+            self.__dirty.add(record.name)
+
+    def _index(self, record):
+        """
+        Update indexes with record values
+
+        Args:
+            record (ModuleUpdateState): updated record
+        """
+        if self.__records.get(record.name) is not record:
+            return
+
+        for index, value in ((self.installed, record.version is not None), (self.updatable, record.updatable),
+                             (self.processing, record.processing)):
+            if value:
+                index.add(record.name)
+            else:
+                index.discard(record.name)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+import threading
+from collections import deque
+
+class OutputStreamer():
+    """
+    Stream applications process output lines as batches.
+
+    Process callbacks receive whole process output each time, this class only keeps new lines and
+    sends them grouped in batches to limit number of sent events: a batch is sent when its size
+    exceeds max_bytes, when interval elapsed since previous batch or when process terminates.
+    Last lines of each module are kept in a ring buffer for late subscribers.
+    """
+
+    OUTPUT_KEYS = ('process', 'stdout', 'stderr')
+
+    def __init__(self, send_callback, interval=1.0, max_bytes=4096, buffer_size=200):
+        """
+        Constructor
+
+        Args:
+            send_callback (function): function called with module name and lines batch
+            interval (float): maximum duration (seconds) lines are kept before being sent
+            max_bytes (int): batch size (bytes) that triggers immediate send
+            buffer_size (int): number of lines kept per module for late subscribers
+        """
+        self.send_callback = send_callback
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__lock = threading.Lock()
+        # per module streaming state
+        self.__streams = {}
+        # per module last lines
+        self.__buffers = {}
+
+    def feed(self, module_name, status, terminated=False):
+        """
+        Feed streamer with process status
+
+        Args:
+            module_name (string): module name
+            status (dict): process status containing whole process, stdout and stderr outputs
+            terminated (bool): True if process is terminated. All pending lines are sent
+        """
+        batch = None
+        with self.__lock:
+            stream = self.__streams.get(module_name)
+            if stream is None:
+                stream = {
+                    'offsets': dict.fromkeys(self.OUTPUT_KEYS, 0),
+                    'pending': [],
+                    'pendingbytes': 0,
+                    'lastsend': time.time(),
+                    'timer': None,
+                }
+                self.__streams[module_name] = stream
+                self.__buffers[module_name] = deque(maxlen=self.buffer_size)
+
+            # keep only new lines
+            for key in self.OUTPUT_KEYS:
+                lines = status.get(key) or []
+                if len(lines) < stream['offsets'][key]:
+                    # outputs restarted
+                    stream['offsets'][key] = 0
+                for line in lines[stream['offsets'][key]:]:
+                    entry = {'output': key, 'line': line}
+                    stream['pending'].append(entry)
+                    stream['pendingbytes'] += len(line)
+                    self.__buffers[module_name].append(entry)
+                stream['offsets'][key] = len(lines)
+
+            if terminated:
+                batch = self._pop_pending(stream)
+                self._cancel_timer(stream)
+                del self.__streams[module_name]
+            elif stream['pending'] and (stream['pendingbytes'] >= self.max_bytes or time.time() - stream['lastsend'] >= self.interval):
+                batch = self._pop_pending(stream)
+                self._cancel_timer(stream)
+            elif stream['pending'] and stream['timer'] is None:
+                # make sure pending lines are sent even if process is quiet
+                stream['timer'] = threading.Timer(self.interval, self._flush, [module_name, stream])
+                stream['timer'].daemon = True
+                stream['timer'].start()
+
+        if batch:
+            self._send(module_name, batch)
+
+    def get_buffer(self, module_name):
+        """
+        Return last output lines of specified module
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            list: last output lines::
+
+                [
+                    {
+                        output (string): output name (process, stdout or stderr)
+                        line (string): output line
+                    },
+                    ...
+                ]
+
+        """
+        with self.__lock:
+            return list(self.__buffers.get(module_name, []))
+
+    def reset(self, module_name):
+        """
+        Reset module streaming state and buffered lines, for example before new process starts
+
+        Args:
+            module_name (string): module name
+        """
+        with self.__lock:
+            stream = self.__streams.pop(module_name, None)
+            if stream:
+                self._cancel_timer(stream)
+            self.__buffers.pop(module_name, None)
+
+    def stop(self):
+        """
+        Stop all pending timers
+        """
+        with self.__lock:
+            for stream in self.__streams.values():
+                self._cancel_timer(stream)
+
+    def _flush(self, module_name, stream):
+        """
+        Send pending lines (timer callback)
+
+        Args:
+            module_name (string): module name
+            stream (dict): module streaming state
+        """
+        with self.__lock:
+            stream['timer'] = None
+            if self.__streams.get(module_name) is not stream:
+                return
+            batch = self._pop_pending(stream)
+
+        if batch:
+            self._send(module_name, batch)
+
+    def _pop_pending(self, stream):
+        """
+        Pop stream pending lines
+
+        Args:
+            stream (dict): module streaming state
+
+        Returns:
+            list: pending lines
+        """
+        batch = stream['pending']
+        stream['pending'] = []
+        stream['pendingbytes'] = 0
+        stream['lastsend'] = time.time()
+
+        return batch
+
+    def _cancel_timer(self, stream):
+        """
+        Cancel stream timer
+
+        Args:
+            stream (dict): module streaming state
+        """
+        if stream['timer']:
+            stream['timer'].cancel()
+            stream['timer'] = None
+
+    def _send(self, module_name, batch):
+        """
+        Send lines batch
+
+        Args:
+            module_name (string): module name
+            batch (list): lines to send
+        """
+        try:
+            self.send_callback(module_name, batch)
+        except Exception:
+            self.logger.exception('Error sending module "%s" output' % module_name)
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import hashlib
+import logging
+
+class PackageCache():
+    """
+    Content-addressed cache of downloaded packages (applications archives and Cleep packages).
+
+    Packages are stored under their sha256 checksum. Least recently used packages are evicted
+    when cache size exceeds configured byte budget. Pinned packages are never evicted.
+    """
+
+    INDEX_FILENAME = 'index.json'
+    DOWNLOAD_CHUNK_SIZE = 65536
+    DOWNLOAD_TIMEOUT = 60.0
+
+    def __init__(self, cleep_filesystem, path, max_size=0):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+            path (string): cache directory path
+            max_size (int): cache byte budget. 0 disables cache
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.path = path
+        self.max_size = max_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.hits = 0
+        self.misses = 0
+        self.downloaded = 0
+        self.__index = None
+        # last access updates are only saved with next index change or flush
+        self.__index_dirty = False
+        self.__pinned = set()
+
+    def is_enabled(self):
+        """
+        Return True if cache is enabled
+
+        Returns:
+            bool: True if cache is enabled
+        """
+        return self.max_size > 0
+
+    def set_max_size(self, max_size):
+        """
+        Set cache byte budget, evicting packages if necessary
+
+        Args:
+            max_size (int): cache byte budget. 0 disables and empties cache
+        """
+        self.max_size = max_size
+        self._evict()
+
+    def pin(self, sha256):
+        """
+        Pin package to prevent its eviction until it is unpinned
+
+        Args:
+            sha256 (string): package sha256 checksum
+        """
+        self.__pinned.add(sha256.lower())
+
+    def unpin(self):
+        """
+        Unpin all packages, evicting packages if necessary
+        """
+        if not self.__pinned:
+            return
+        self.__pinned.clear()
+        self._evict()
+
+    def get_stats(self):
+        """
+        Return cache statistics
+
+        Returns:
+            dict: cache statistics::
+
+                {
+                    count (int): number of cached packages
+                    size (int): cache size in bytes
+                    maxsize (int): cache byte budget
+                    hits (int): number of cache hits
+                    misses (int): number of cache misses
+                    downloaded (int): number of bytes downloaded
+                }
+
+        """
+        index = self._get_index()
+        return {
+            'count': len(index),
+            'size': sum([entry['size'] for entry in index.values()]),
+            'maxsize': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'downloaded': self.downloaded,
+        }
+
+    def get(self, sha256):
+        """
+        Return cached package path
+
+        Args:
+            sha256 (string): package sha256 checksum
+
+        Returns:
+            string: package path or None if package is not cached
+        """
+        sha256 = sha256.lower()
+        index = self._get_index()
+        if sha256 not in index:
+            return None
+
+        path = os.path.join(self.path, sha256)
+        if not os.path.exists(path):
+            self.logger.warning('Cached package "%s" vanished from filesystem' % sha256)
+            del index[sha256]
+            self._save_index()
+            return None
+
+        index[sha256]['lastaccess'] = time.time()
+        self.__index_dirty = True
+        return path
+
+    def fetch(self, url, sha256, headers=None, size=None):
+        """
+        Return local path of specified package, downloading it only if it is not cached yet.
+        Package bigger than cache byte budget is not downloaded
+
+        Args:
+            url (string): package url
+            sha256 (string): package sha256 checksum
+            headers (dict): extra http headers used when downloading package
+            size (int): package size if known (from modules.json)
+
+        Returns:
+            string: package path or None if package is bigger than cache byte budget (or
+                    remaining budget when packages are pinned)
+
+        Raises:
+            Exception if download failed or checksum is invalid
+        """
+        sha256 = sha256.lower()
+        path = self.get(sha256)
+        if path:
+            self.hits += 1
+            self.logger.debug('Package "%s" found in cache' % sha256)
+            return path
+        self.misses += 1
+
+        if size is not None and size > self.max_size:
+            self.logger.info('Package "%s" (%d bytes) exceeds cache size, it is not cached' % (sha256, size))
+            return None
+
+        self.logger.debug('Package "%s" not in cache, download it from "%s"' % (sha256, url))
+        path = os.path.join(self.path, sha256)
+        if not os.path.exists(self.path):
+            self.cleep_filesystem.mkdir(self.path, True)
+        size = self._download(url, path, sha256, headers)
+        if size is None:
+            self.logger.info('Package "%s" exceeds cache size, it is not cached' % sha256)
+            return None
+        self.downloaded += size
+
+        self._get_index()[sha256] = {
+            'size': size,
+            'lastaccess': time.time(),
+        }
+        self._evict(keep=sha256)
+        if sha256 not in self._get_index():
+            self.logger.info('Package "%s" exceeds cache size left by pinned packages, it is not cached' % sha256)
+            return None
+
+        return path
+
+    def fetch_checksum(self, url, headers=None):
+        """
+        Download checksum file and return sha256 checksum it contains
+
+        Args:
+            url (string): checksum file url
+            headers (dict): extra http headers
+
+        Returns:
+            string: sha256 checksum
+
+        Raises:
+            Exception if checksum file is invalid
+        """
+        # http stack is only imported when a package is really downloaded
+        import urllib.request
+        request = urllib.request.Request(url, headers=self._get_headers(headers))
+        with urllib.request.urlopen(request, timeout=self.DOWNLOAD_TIMEOUT) as resp:
+            content = resp.read(1024).decode('utf8').strip()
+
+        # checksum file content is "<checksum>  <filename>" or only "<checksum>"
+        checksum = content.split()[0].lower() if content else ''
+        if len(checksum) != 64:
+            raise Exception('Invalid checksum file content from "%s"' % url)
+
+        return checksum
+
+    def flush(self):
+        """
+        Save cache index if packages were accessed since it was last saved
+        """
+        if self.__index_dirty:
+            self._save_index()
+
+    def clear(self):
+        """
+        Remove all cached packages except pinned ones
+        """
+        index = self._get_index()
+        for sha256 in list(index.keys()):
+            if sha256 in self.__pinned:
+                continue
+            self._remove(sha256)
+        self._save_index()
+
+    def _get_headers(self, headers):
+        """
+        Return download http headers
+
+        Args:
+            headers (dict): extra http headers
+
+        Returns:
+            dict: http headers
+        """
+        out = {
+            # needed to download github release assets
+            'Accept': 'application/octet-stream',
+        }
+        if headers:
+            out.update(headers)
+
+        return out
+
+    def _download(self, url, path, sha256, headers):
+        """
+        Download package to specified path checking its checksum on the fly. Download is
+        stopped as soon as package is known to exceed cache byte budget
+
+        Args:
+            url (string): package url
+            path (string): destination path
+            sha256 (string): expected sha256 checksum
+            headers (dict): extra http headers
+
+        Returns:
+            int: downloaded bytes or None if package exceeds cache byte budget
+
+        Raises:
+            Exception if download failed or checksum is invalid
+        """
+        import urllib.request
+        size = 0
+        checksum = hashlib.sha256()
+        request = urllib.request.Request(url, headers=self._get_headers(headers))
+        with urllib.request.urlopen(request, timeout=self.DOWNLOAD_TIMEOUT) as resp:
+            length = resp.headers.get('Content-Length') if resp.headers else None
+            if length and length.isdigit() and int(length) > self.max_size:
+                return None
+
+            fd = self.cleep_filesystem.open(path, 'wb')
+            try:
+                while True:
+                    chunk = resp.read(self.DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_size:
+                        # no Content-Length header, package size is known while downloading
+                        size = None
+                        break
+                    checksum.update(chunk)
+                    fd.write(chunk)
+            except Exception:
+                self.cleep_filesystem.close(fd)
+                self.cleep_filesystem.rm(path)
+                raise
+            self.cleep_filesystem.close(fd)
+
+        if size is None:
+            self.cleep_filesystem.rm(path)
+            return None
+
+        if checksum.hexdigest() != sha256:
+            self.cleep_filesystem.rm(path)
+            raise Exception('Invalid checksum for package downloaded from "%s"' % url)
+
+        return size
+
+    def _get_index(self):
+        """
+        Return cache index, loading it from filesystem if necessary
+
+        Returns:
+            dict: cache index::
+
+                {
+                    sha256 (string): {
+                        size (int): package size
+                        lastaccess (float): last access timestamp
+                    },
+                    ...
+                }
+
+        """
+        if self.__index is None:
+            index_path = os.path.join(self.path, self.INDEX_FILENAME)
+            index = None
+            if os.path.exists(index_path):
+                index = self.cleep_filesystem.read_json(index_path)
+            self.__index = index if isinstance(index, dict) else {}
+
+        return self.__index
+
+    def _save_index(self):
+        """
+        Save cache index to filesystem
+        """
+        if not os.path.exists(self.path):
+            self.cleep_filesystem.mkdir(self.path, True)
+        index_path = os.path.join(self.path, self.INDEX_FILENAME)
+        if not self.cleep_filesystem.write_json(index_path, self._get_index()):
+            self.logger.error('Unable to save package cache index to "%s"' % index_path)
+            return
+        self.__index_dirty = False
+
+    def _remove(self, sha256):
+        """
+        Remove package from cache. Index is not saved
+
+        Args:
+            sha256 (string): package sha256 checksum
+        """
+        path = os.path.join(self.path, sha256)
+        if os.path.exists(path):
+            self.cleep_filesystem.rm(path)
+        self._get_index().pop(sha256, None)
+
+    def _evict(self, keep=None):
+        """
+        Evict least recently used packages until cache size fits byte budget. Pinned packages
+        are not evicted, so kept package is evicted last if cache still exceeds byte budget
+
+        Args:
+            keep (string): sha256 of package to evict only if other packages are not enough
+        """
+        index = self._get_index()
+        size = sum([entry['size'] for entry in index.values()])
+        if size <= self.max_size and keep is None:
+            return
+
+        for sha256 in sorted(index.keys(), key=lambda key: index[key]['lastaccess']):
+            if size <= self.max_size:
+                break
+            if sha256 == keep or sha256 in self.__pinned:
+                continue
+            self.logger.debug('Evict package "%s" from cache' % sha256)
+            size -= index[sha256]['size']
+            self._remove(sha256)
+
+        if size > self.max_size and keep in index:
+            self.logger.debug('Evict package "%s" from cache' % keep)
+            self._remove(keep)
+
+        self._save_index()
+
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import shutil
+import logging
+import threading
+
+class PackageServer():
+    """
+    Loopback http server serving package cache content.
+
+    Core installers (Install and InstallCleep) only download packages from http(s) urls, so cached
+    packages are handed to them through this server instead of their filesystem path. Server
+    listens on 127.0.0.1 only, on a random port, and is started on first use.
+
+    Only files named after a sha256 checksum in cache directory are served.
+    """
+
+    HOST = '127.0.0.1'
+    CHUNK_SIZE = 65536
+    PACKAGE_NAME_PATTERN = re.compile(r'^/([0-9a-f]{64})$')
+
+    def __init__(self, path):
+        """
+        Constructor
+
+        Args:
+            path (string): package cache directory path
+        """
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__server = None
+        self.__lock = threading.Lock()
+
+    def start(self):
+        """
+        Start server if not already running
+        """
+        with self.__lock:
+            if self.__server:
+                return
+
+            # http server is only imported when a cached package is used
+            from http.server import ThreadingHTTPServer
+            self.__server = ThreadingHTTPServer((self.HOST, 0), self._get_handler_class())
+            self.__server.daemon_threads = True
+            thread = threading.Thread(target=self.__server.serve_forever, name='packageserver')
+            thread.daemon = True
+            thread.start()
+            self.logger.debug('Package server listening on port %d' % self.__server.server_address[1])
+
+    def stop(self):
+        """
+        Stop server
+        """
+        with self.__lock:
+            if not self.__server:
+                return
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+    def get_url(self, path):
+        """
+        Return url of cached package, starting server if necessary
+
+        Args:
+            path (string): cached package path (as returned by PackageCache)
+
+        Returns:
+            string: package url
+
+        Raises:
+            Exception if path is not a package of cache directory
+        """
+        name = os.path.basename(path)
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.path) or not self.PACKAGE_NAME_PATTERN.match('/' + name):
+            raise Exception('"%s" is not a cached package' % path)
+
+        self.start()
+        return 'http://%s:%d/%s' % (self.HOST, self.__server.server_address[1], name)
+
+    def is_url(self, url):
+        """
+        Return True if url points to this server
+
+        Args:
+            url (string): url
+
+        Returns:
+            bool: True if url is a cached package url
+        """
+        server = self.__server
+        if not server or not url:
+            return False
+
+        return url.startswith('http://%s:%d/' % (self.HOST, server.server_address[1]))
+
+    def _get_handler_class(self):
+        """
+        Return http request handler class serving cache directory
+
+        Returns:
+            class: BaseHTTPRequestHandler subclass
+        """
+        from http.server import BaseHTTPRequestHandler
+        package_server = self
+
+        class PackageRequestHandler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                self._send_package(False)
+
+            def do_GET(self):
+                self._send_package(True)
+
+            def _send_package(self, with_body):
+                match = package_server.PACKAGE_NAME_PATTERN.match(self.path)
+                path = os.path.join(package_server.path, match.group(1)) if match else None
+                if not path or not os.path.isfile(path):
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Length', str(os.path.getsize(path)))
+                self.end_headers()
+                if with_body:
+                    with open(path, 'rb') as fd:
+                        shutil.copyfileobj(fd, self.wfile, package_server.CHUNK_SIZE)
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                package_server.logger.debug(format % args)
+
+        return PackageRequestHandler
@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import io
+import re
+import json
+import zlib
+import binascii
+import time
+import logging
+
+class ProcessHistory():
+    """
+    Bounded history of applications and Cleep process statuses.
+
+    Each module history is stored in a single file where every process status is a gzip
+    compressed JSON lines record (one gzip member per record). History index keeps offset and
+    length of each record so a single record can be read without decompressing the whole file.
+    Oldest records are dropped when a module history exceeds its maximum number of records or
+    its byte budget.
+    """
+
+    HISTORY_FILENAME = 'process_history.jsonl.gz'
+    OUTPUT_KEYS = ('process', 'stdout', 'stderr')
+    TOKENS_FILTER_BITS = 2048
+    TOKEN_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, cleep_filesystem, install_path, index_path, max_records=10, max_size=262144):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+            install_path (string): path of directory containing modules process logs directories
+            index_path (string): history index file path
+            max_records (int): maximum number of records kept per module
+            max_size (int): maximum history file size per module (bytes)
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.install_path = install_path
+        self.index_path = index_path
+        self.max_records = max_records
+        self.max_size = max_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__index = None
+
+    def get_path(self, module_name):
+        """
+        Return module history file path
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            string: history file path
+        """
+        return os.path.join(self.install_path, module_name, self.HISTORY_FILENAME)
+
+    def get_module_names(self):
+        """
+        Return names of modules that have history
+
+        Returns:
+            list: modules names
+        """
+        return list(self._get_index().keys())
+
+    def get_records(self, module_name):
+        """
+        Return module history records infos, most recent first
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            list: records infos::
+
+                [
+                    {
+                        timestamp (int): record timestamp
+                        failed (bool): True if process failed
+                        size (int): compressed record size
+                    },
+                    ...
+                ]
+
+        """
+        return [
+            {
+                'timestamp': record['timestamp'],
+                'failed': record['failed'],
+                'size': record['length'],
+            }
+            for record in reversed(self._get_index().get(module_name, []))
+        ]
+
+    def get_record(self, module_name, position):
+        """
+        Return module history record content
+
+        Args:
+            module_name (string): module name
+            position (int): record position (0 is most recent record)
+
+        Returns:
+            dict: stored process status or None if record does not exist
+        """
+        status = None
+        for line in self.iter_record_lines(module_name, position):
+            if status is None:
+                status = line['status']
+                for key in self.OUTPUT_KEYS:
+                    status[key] = []
+                continue
+            for key, value in line.items():
+                status[key].append(value)
+
+        return status
+
+    def iter_record_lines(self, module_name, position):
+        """
+        Iterate over module history record lines, decompressing record on the fly
+
+        Args:
+            module_name (string): module name
+            position (int): record position (0 is most recent record)
+
+        Returns:
+            iterator: record lines. First line is record header::
+
+                {
+                    timestamp (int): record timestamp
+                    failed (bool): True if process failed
+                    status (dict): process status without its outputs
+                }
+
+            next lines are process outputs lines::
+
+                {
+                    process|stdout|stderr (string): output line
+                }
+
+        """
+        records = self._get_index().get(module_name, [])
+        if position < 0 or position >= len(records):
+            return
+
+        record = records[len(records) - 1 - position]
+        with open(self.get_path(module_name), 'rb') as fd:
+            fd.seek(record['offset'])
+            data = fd.read(record['length'])
+        import gzip
+        with gzip.GzipFile(fileobj=io.BytesIO(data), mode='rb') as gz:
+            for line in io.TextIOWrapper(gz, encoding='utf8'):
+                yield json.loads(line)
+
+    def search(self, query, since=None, failed=None, max_results=100, snippet_size=160):
+        """
+        Search case insensitive text in process outputs of all modules histories
+
+        Records are decompressed and parsed line by line, and records that cannot contain
+        query words are skipped thanks to their tokens filter.
+
+        Args:
+            query (string): text to search
+            since (int): only search records more recent than this timestamp
+            failed (bool): only search failed (True) or succeed (False) records. All records if None
+            max_results (int): maximum number of returned matches
+            snippet_size (int): maximum number of characters returned around each match
+
+        Returns:
+            dict: search results::
+
+                {
+                    results (list): list of matches, most recent records first::
+                        [
+                            {
+                                module (string): module name
+                                timestamp (int): record timestamp
+                                failed (bool): True if process failed
+                                position (int): record position in module history
+                                output (string): output name (process, stdout or stderr)
+                                snippet (string): matching line part
+                            },
+                            ...
+                        ]
+                    truncated (bool): True if there are more matches than max_results
+                }
+
+        """
+        pattern = query.lower()
+        tokens = self._get_query_tokens(pattern)
+        candidates = []
+        for module_name, records in self._get_index().items():
+            for position, record in enumerate(reversed(records)):
+                if since is not None and record['timestamp'] < since:
+                    continue
+                if failed is not None and record['failed'] != failed:
+                    continue
+                if not self._may_contain(record.get('tokens'), tokens):
+                    continue
+                candidates.append((record['timestamp'], module_name, position, record))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        results = []
+        for timestamp, module_name, position, record in candidates:
+            lines = self.iter_record_lines(module_name, position)
+            next(lines, None)
+            for line in lines:
+                for output, value in line.items():
+                    index = value.lower().find(pattern)
+                    if index < 0:
+                        continue
+                    if len(results) >= max_results:
+                        lines.close()
+                        return {'results': results, 'truncated': True}
+
+                    start = max(0, index - max(0, snippet_size - len(pattern)) // 2)
+                    results.append({
+                        'module': module_name,
+                        'timestamp': timestamp,
+                        'failed': record['failed'],
+                        'position': position,
+                        'output': output,
+                        'snippet': value[start:start + max(snippet_size, len(pattern))],
+                    })
+
+        return {'results': results, 'truncated': False}
+
+    def append(self, module_name, status, failed, lines=None):
+        """
+        Append process status to module history, dropping oldest records if necessary
+
+        Args:
+            module_name (string): module name
+            status (dict): process status
+            failed (bool): True if process failed
+            lines (iterator): process output lines ({process|stdout|stderr: line}). If not specified
+                              outputs are read from status
+        """
+        timestamp = int(time.time())
+        if lines is None:
+            lines = self._iter_status_lines(status)
+        record_data, tokens_filter = self._compress(timestamp, failed, status, lines)
+        path = self.get_path(module_name)
+        records = self._get_index().setdefault(module_name, [])
+
+        # drop oldest records if new one does not fit
+        kept = records[:]
+        while kept and (len(kept) + 1 > self.max_records or self._get_size(kept) + len(record_data) > self.max_size):
+            kept.pop(0)
+
+        if len(kept) == len(records) and os.path.exists(path):
+            offset = os.path.getsize(path)
+            fd = self.cleep_filesystem.open(path, 'ab')
+            fd.write(record_data)
+            self.cleep_filesystem.close(fd)
+        else:
+            # rewrite history with kept records (copied as is, no recompression)
+            contents = []
+            if kept and os.path.exists(path):
+                with open(path, 'rb') as fd:
+                    for record in kept:
+                        fd.seek(record['offset'])
+                        contents.append(fd.read(record['length']))
+            offset = 0
+            fd = self.cleep_filesystem.open(path, 'wb')
+            for record, content in zip(kept, contents):
+                record['offset'] = offset
+                fd.write(content)
+                offset += len(content)
+            fd.write(record_data)
+            self.cleep_filesystem.close(fd)
+
+        kept.append({
+            'timestamp': timestamp,
+            'failed': failed,
+            'offset': offset,
+            'length': len(record_data),
+            'tokens': tokens_filter,
+        })
+        self._get_index()[module_name] = kept
+        self._save()
+
+    def _iter_status_lines(self, status):
+        """
+        Iterate over process status outputs lines
+
+        Args:
+            status (dict): process status
+
+        Returns:
+            iterator: output lines ({process|stdout|stderr: line})
+        """
+        for key in self.OUTPUT_KEYS:
+            for line in status.get(key) or []:
+                yield {key: line}
+
+    def _compress(self, timestamp, failed, status, lines):
+        """
+        Compress process status as JSON lines record, computing record tokens filter on the fly
+
+        Args:
+            timestamp (int): record timestamp
+            failed (bool): True if process failed
+            status (dict): process status
+            lines (iterator): process output lines
+
+        Returns:
+            tuple: gzip member containing record header line followed by one line per output line,
+                   and hex encoded bloom filter of output words
+        """
+        # gzip is only imported when history is really read or written
+        import gzip
+        bits = bytearray(self.TOKENS_FILTER_BITS // 8)
+        data = io.BytesIO()
+        with gzip.GzipFile(fileobj=data, mode='wb') as gz:
+            gz.write((json.dumps({
+                'timestamp': timestamp,
+                'failed': failed,
+                'status': {key: value for key, value in status.items() if key not in self.OUTPUT_KEYS},
+            }) + '\n').encode('utf8'))
+            for line in lines:
+                gz.write((json.dumps(line) + '\n').encode('utf8'))
+                for value in line.values():
+                    for token in self.TOKEN_PATTERN.findall(value.lower()):
+                        for bit in self._get_token_bits(token):
+                            bits[bit // 8] |= 1 << (bit % 8)
+
+        return data.getvalue(), binascii.hexlify(bytes(bits)).decode('ascii')
+
+    def _get_token_bits(self, token):
+        """
+        Return filter bits of specified token
+
+        Args:
+            token (string): token
+
+        Returns:
+            tuple: token bits
+        """
+        data = token.encode('utf8')
+        return (
+            zlib.crc32(data) % self.TOKENS_FILTER_BITS,
+            zlib.adler32(data) % self.TOKENS_FILTER_BITS,
+        )
+
+    def _get_query_tokens(self, query):
+        """
+        Return query words that must appear as whole words in matching lines
+
+        Words at query edges are ignored because they can be part of a longer word in lines.
+
+        Args:
+            query (string): lowercased query
+
+        Returns:
+            list: query tokens
+        """
+        return [
+            match.group(0)
+            for match in self.TOKEN_PATTERN.finditer(query)
+            if match.start() > 0 and match.end() < len(query)
+        ]
+
+    def _may_contain(self, tokens_filter, tokens):
+        """
+        Check if record may contain all specified tokens
+
+        Args:
+            tokens_filter (string): record hex encoded tokens filter
+            tokens (list): tokens to check
+
+        Returns:
+            bool: False if record cannot contain all tokens
+        """
+        if not tokens_filter or not tokens:
+            return True
+
+        bits = binascii.unhexlify(tokens_filter)
+        for token in tokens:
+            for bit in self._get_token_bits(token):
+                if not bits[bit // 8] & (1 << (bit % 8)):
+                    return False
+
+        return True
+
+    def _get_size(self, records):
+        """
+        Return records size
+
+        Args:
+            records (list): index records
+
+        Returns:
+            int: records size
+        """
+        return sum([record['length'] for record in records])
+
+    def _get_index(self):
+        """
+        Return history index, loading it if necessary
+
+        Returns:
+            dict: history index::
+
+                {
+                    module name (string): [
+                        {
+                            timestamp (int): record timestamp
+                            failed (bool): True if process failed
+                            offset (int): record offset in history file
+                            length (int): record length
+                            tokens (string): hex encoded bloom filter of record output words
+                        },
+                        ...
+                    ],
+                    ...
+                }
+
+        """
+        if self.__index is None:
+            index = None
+            if os.path.exists(self.index_path):
+                index = self.cleep_filesystem.read_json(self.index_path)
+            self.__index = index if isinstance(index, dict) else {}
+
+        return self.__index
+
+    def _save(self):
+        """
+        Save history index
+        """
+        if not self.cleep_filesystem.write_json(self.index_path, self.__index):
+            self.logger.error('Unable to save process history index to "%s"' % self.index_path)
+
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import logging
+from collections import deque
+
+class ProcessOutputLog():
+    """
+    Write applications and Cleep process outputs incrementally to disk.
+
+    Process callbacks receive whole process output each time. Only new lines are appended to
+    module output log (one JSON line per output line) and only last lines of each output are
+    kept in memory to build compact process summary when process terminates.
+    """
+
+    OUTPUT_FILENAME = 'process_output.jsonl'
+    OUTPUT_KEYS = ('process', 'stdout', 'stderr')
+
+    def __init__(self, cleep_filesystem, install_path, tail_size=20):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+            install_path (string): path of directory containing modules process logs directories
+            tail_size (int): number of lines kept in memory for each output
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.install_path = install_path
+        self.tail_size = tail_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # running processes states
+        self.__processes = {}
+
+    def get_path(self, module_name):
+        """
+        Return module output log path
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            string: output log path
+        """
+        return os.path.join(self.install_path, module_name, self.OUTPUT_FILENAME)
+
+    def write(self, module_name, status):
+        """
+        Append new process output lines to module output log. Output log is truncated when
+        first status of a process is written.
+
+        Args:
+            module_name (string): module name
+            status (dict): process status containing whole process, stdout and stderr outputs
+        """
+        process = self.__processes.get(module_name)
+        if process is None:
+            process = {
+                'offsets': dict.fromkeys(self.OUTPUT_KEYS, 0),
+                'tails': {key: deque(maxlen=self.tail_size) for key in self.OUTPUT_KEYS},
+                'written': False,
+            }
+            self.__processes[module_name] = process
+
+        lines = []
+        for key in self.OUTPUT_KEYS:
+            values = status.get(key) or []
+            if len(values) < process['offsets'][key]:
+                # outputs restarted
+                process['offsets'][key] = 0
+            for value in values[process['offsets'][key]:]:
+                lines.append(json.dumps({key: value}))
+                process['tails'][key].append(value)
+            process['offsets'][key] = len(values)
+        if not lines and process['written']:
+            return
+
+        path = self.get_path(module_name)
+        if not os.path.exists(os.path.dirname(path)):
+            self.cleep_filesystem.mkdir(os.path.dirname(path), True)
+        try:
+            fd = self.cleep_filesystem.open(path, 'a' if process['written'] else 'w', encoding='utf8')
+            for line in lines:
+                fd.write(line + '\n')
+            self.cleep_filesystem.close(fd)
+            process['written'] = True
+        except Exception:
+            self.logger.exception('Error writing module "%s" process output to "%s"' % (module_name, path))
+
+    def iter_lines(self, module_name):
+        """
+        Iterate over module output log lines
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            iterator: output lines::
+
+                {
+                    process|stdout|stderr (string): output line
+                }
+
+        """
+        path = self.get_path(module_name)
+        if not os.path.exists(path):
+            return
+
+        with open(path, encoding='utf8') as fd:
+            for line in fd:
+                yield json.loads(line)
+
+    def get_summary(self, module_name, status):
+        """
+        Return compact process summary: status without whole outputs but only their last lines
+
+        Args:
+            module_name (string): module name
+            status (dict): process status
+
+        Returns:
+            dict: process summary::
+
+                {
+                    ... (any): status fields except outputs
+                    process (list): last process output lines
+                    stdout (list): last stdout lines
+                    stderr (list): last stderr lines
+                    outputlines (dict): number of lines of each output
+                }
+
+        Notes:
+            Output log path is not part of summary because output log is truncated by next process
+            of the module. Whole outputs are kept in process status file (see write_status) and in
+            history.
+
+        """
+        process = self.__processes.get(module_name)
+        summary = {key: value for key, value in status.items() if key not in self.OUTPUT_KEYS}
+        summary.update({
+            key: list(process['tails'][key]) if process else [] for key in self.OUTPUT_KEYS
+        })
+        summary['outputlines'] = {key: process['offsets'][key] if process else 0 for key in self.OUTPUT_KEYS}
+
+        return summary
+
+    def write_status(self, module_name, status, path):
+        """
+        Write process status file with whole process outputs (same content as process status dict).
+        Outputs are streamed from module output log so they are never loaded in memory.
+
+        Args:
+            module_name (string): module name
+            status (dict): process status (outputs it contains are ignored)
+            path (string): status file path
+
+        Returns:
+            bool: True if file written successfully
+        """
+        fields = {key: value for key, value in status.items() if key not in self.OUTPUT_KEYS}
+        try:
+            fd = self.cleep_filesystem.open(path, 'w', encoding='utf8')
+            try:
+                fd.write(json.dumps(fields)[:-1])
+                separator = ', ' if fields else ''
+                for key in self.OUTPUT_KEYS:
+                    fd.write('%s%s: [' % (separator, json.dumps(key)))
+                    line_separator = ''
+                    for line in self.iter_lines(module_name):
+                        if key in line:
+                            fd.write(line_separator + json.dumps(line[key]))
+                            line_separator = ', '
+                    fd.write(']')
+                    separator = ', '
+                fd.write('}')
+            finally:
+                self.cleep_filesystem.close(fd)
+            return True
+        except Exception:
+            self.logger.exception('Error writing module "%s" process status to "%s"' % (module_name, path))
+            return False
+
+    def finish(self, module_name):
+        """
+        Forget process state once process is terminated. Output log is kept on disk until
+        next process of the same module
+
+        Args:
+            module_name (string): module name
+        """
+        self.__processes.pop(module_name, None)
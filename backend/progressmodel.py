@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+import threading
+
+class ProgressModel():
+    """
+    Compute main action progress from its sub actions.
+
+    Each sub action is weighted by its estimated duration: duration of previous executions of the
+    same action on the same module if any, otherwise duration estimated from package size.
+    Progress of running sub action is interpolated with elapsed time so reported progress is
+    continuous, and remaining estimated durations give an ETA.
+    """
+
+    TIMEOUT = 5.0
+    # duration of an action without known package size
+    DEFAULT_DURATION = 20.0
+    # fixed part of an install (dependencies, scripts...)
+    BASE_DURATION = 5.0
+    # estimated package download and extract throughput (bytes per second)
+    BYTES_PER_SECOND = 100 * 1024
+    UNINSTALL_DURATION = 10.0
+    # running step progress never reaches its full weight before being terminated
+    MAX_STEP_RATIO = 0.95
+
+    def __init__(self, get_duration=None):
+        """
+        Constructor
+
+        Args:
+            get_duration (function): function returning duration of previous executions of an action
+                                     (called with action and module name, returns None if unknown)
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__lock = threading.Lock()
+        self.__get_duration = get_duration
+        self.__steps = []
+        self.__current = -1
+
+    def get_package_size(self, url):
+        """
+        Return package size without downloading it
+
+        Args:
+            url (string): package url
+
+        Returns:
+            int: package size (bytes) or None if size can't be determined
+        """
+        if not url:
+            return None
+
+        try:
+            # http stack is only imported when a package size is really requested
+            import urllib.request
+            request = urllib.request.Request(url, method='HEAD')
+            with urllib.request.urlopen(request, timeout=self.TIMEOUT) as resp:
+                size = resp.headers.get('Content-Length')
+                return int(size) if size else None
+        except Exception as error:
+            self.logger.debug('Unable to get size of package "%s": %s' % (url, str(error)))
+            return None
+
+    def estimate_duration(self, action, module_name, size=None):
+        """
+        Estimate action duration
+
+        Args:
+            action (string): action name (install, update, uninstall)
+            module_name (string): module name
+            size (int): package size (bytes) if known
+
+        Returns:
+            float: estimated duration (seconds)
+        """
+        duration = None
+        if self.__get_duration:
+            try:
+                duration = self.__get_duration(action, module_name)
+            except Exception:
+                self.logger.exception('Unable to get "%s" duration of module "%s"' % (action, module_name))
+        if duration is not None:
+            return max(duration, 1.0)
+        if action == 'uninstall':
+            return self.UNINSTALL_DURATION
+        if size:
+            return self.BASE_DURATION + float(size) / self.BYTES_PER_SECOND
+
+        return self.DEFAULT_DURATION
+
+    def start(self, steps):
+        """
+        Start new progress computation
+
+        Args:
+            steps (list): sub actions in execution order::
+
+                [
+                    {
+                        action (string): action name (install, update, uninstall)
+                        module (string): module name
+                        size (int): package size (bytes) or None if unknown
+                    },
+                    ...
+                ]
+
+        Returns:
+            list: weight of each step (percentage), sum is always 100
+        """
+        estimations = [self.estimate_duration(step['action'], step['module'], step.get('size')) for step in steps]
+        total = sum(estimations)
+
+        weights = []
+        for estimation in estimations[:-1]:
+            weights.append(round(estimation * 100.0 / total, 2))
+        if estimations:
+            # last step gets remaining percentage to avoid rounding errors
+            weights.append(round(100.0 - sum(weights), 2))
+
+        with self.__lock:
+            self.__steps = [
+                {
+                    'action': step['action'],
+                    'module': step['module'],
+                    'estimation': estimation,
+                    'weight': weight,
+                    'start': None,
+                    'done': False,
+                }
+                for step, estimation, weight in zip(steps, estimations, weights)
+            ]
+            self.__current = -1
+
+        return weights
+
+    def start_step(self):
+        """
+        Start next step
+        """
+        with self.__lock:
+            if self.__current + 1 >= len(self.__steps):
+                return
+            self.__current += 1
+            self.__steps[self.__current]['start'] = time.monotonic()
+
+    def end_step(self):
+        """
+        Terminate running step
+
+        Returns:
+            float: step duration (seconds) or None if no step is running
+        """
+        with self.__lock:
+            if self.__current < 0 or self.__steps[self.__current]['done']:
+                return None
+            step = self.__steps[self.__current]
+            step['done'] = True
+
+        return time.monotonic() - step['start']
+
+    def get_progress(self):
+        """
+        Return progress of all steps
+
+        Returns:
+            float: progress percentage (0-100)
+        """
+        with self.__lock:
+            if not self.__steps:
+                return 0.0
+            progress = 0.0
+            for step in self.__steps:
+                if step['done']:
+                    progress += step['weight']
+                elif step['start'] is not None:
+                    ratio = min((time.monotonic() - step['start']) / step['estimation'], self.MAX_STEP_RATIO)
+                    progress += step['weight'] * ratio
+
+        return min(round(progress, 1), 100.0)
+
+    def get_eta(self):
+        """
+        Return estimated remaining duration of all steps
+
+        Returns:
+            int: remaining duration (seconds) or None if no step is running
+        """
+        with self.__lock:
+            if self.__current < 0:
+                return None
+            eta = 0.0
+            for step in self.__steps:
+                if step['done']:
+                    continue
+                if step['start'] is not None:
+                    eta += max(0.0, step['estimation'] - (time.monotonic() - step['start']))
+                else:
+                    eta += step['estimation']
+
+        return int(round(eta))
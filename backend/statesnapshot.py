@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import logging
+
+class StateSnapshot():
+    """
+    Persisted snapshot of last updates check results.
+
+    It allows to restore Cleep and modules updates infos right after restart without checking
+    updates again. Snapshot is stamped with Cleep version and installed modules versions: Cleep
+    update infos are dropped if Cleep version changed, and module update infos are dropped if
+    module installed version changed.
+
+    Only updatable modules are stored to keep file small::
+
+        {
+            format (int): snapshot format
+            timestamp (int): snapshot timestamp
+            cleepversion (string): Cleep version when snapshot was saved
+            cleep (dict): Cleep update infos if Cleep is updatable, None otherwise
+            installed (dict): installed modules versions (module name => version)
+            modules (dict): updatable modules (module name => [update version, changelog])
+            modulesjson (list): modules.json signature used to compute modules updates
+        }
+
+    """
+
+    FORMAT = 1
+    CLEEP_FIELDS = ('version', 'changelog', 'packageurl', 'checksumurl')
+
+    def __init__(self, cleep_filesystem, path):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+            path (string): snapshot file path
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.__data = None
+
+    def save(self, cleep_version, cleep_updates, modules_updates=None, modules_json_signature=None):
+        """
+        Save snapshot
+
+        Args:
+            cleep_version (string): installed Cleep version
+            cleep_updates (dict): Cleep updates infos (updatable, version, changelog, packageurl, checksumurl)
+            modules_updates (dict): modules updates (see ModuleUpdateState.to_dict). If None, modules
+                                    infos of previous snapshot are kept
+            modules_json_signature (tuple): modules.json signature used to compute modules updates
+        """
+        data = self._get_data()
+        snapshot = {
+            'format': self.FORMAT,
+            'timestamp': int(time.time()),
+            'cleepversion': cleep_version,
+            'cleep': None,
+            'installed': data.get('installed', {}),
+            'modules': data.get('modules', {}),
+            'modulesjson': data.get('modulesjson'),
+        }
+        if cleep_updates.get('updatable'):
+            snapshot['cleep'] = {field: cleep_updates.get(field) for field in self.CLEEP_FIELDS}
+        if modules_updates is not None:
+            snapshot['installed'] = {
+                module_name: module['version']
+                for module_name, module in modules_updates.items()
+                if module['version'] is not None
+            }
+            snapshot['modules'] = {
+                module_name: [module['update']['version'], module['update']['changelog']]
+                for module_name, module in modules_updates.items()
+                if module['updatable'] and module['version'] is not None
+            }
+            snapshot['modulesjson'] = list(modules_json_signature) if modules_json_signature else None
+
+        self.__data = snapshot
+        if not self.cleep_filesystem.write_json(self.path, snapshot):
+            self.logger.error('Unable to save update state snapshot to "%s"' % self.path)
+
+    def get_cleep_updates(self, cleep_version):
+        """
+        Return Cleep update infos of snapshot
+
+        Args:
+            cleep_version (string): installed Cleep version
+
+        Returns:
+            dict: Cleep update infos (version, changelog, packageurl, checksumurl) or None if no
+                  update was available or Cleep version changed since snapshot
+        """
+        data = self._get_data()
+        if data.get('cleepversion') != cleep_version:
+            return None
+
+        return data.get('cleep')
+
+    def get_modules_updates(self, installed_versions, modules_json_signature=None):
+        """
+        Return modules update infos of snapshot still valid with installed modules
+
+        Args:
+            installed_versions (dict): installed modules versions (module name => version)
+            modules_json_signature (tuple): current modules.json signature
+
+        Returns:
+            tuple: (updatable modules, up to date) with::
+
+                updatable modules (dict): module name => (update version, changelog)
+                up to date (bool): True if snapshot was computed with same installed modules and
+                                   modules.json, so no modules updates computation is needed
+
+        """
+        data = self._get_data()
+        snapshot_versions = data.get('installed', {})
+        modules = {
+            module_name: tuple(infos)
+            for module_name, infos in data.get('modules', {}).items()
+            if module_name in installed_versions and snapshot_versions.get(module_name) == installed_versions[module_name]
+        }
+        signature = list(modules_json_signature) if modules_json_signature else None
+        up_to_date = bool(data) and snapshot_versions == installed_versions and data.get('modulesjson') == signature
+
+        return modules, up_to_date
+
+    def _get_data(self):
+        """
+        Return snapshot content, loading it if necessary
+
+        Returns:
+            dict: snapshot content or empty dict if there is no valid snapshot
+        """
+        if self.__data is None:
+            data = None
+            if os.path.exists(self.path):
+                data = self.cleep_filesystem.read_json(self.path)
+            if not isinstance(data, dict) or data.get('format') != self.FORMAT:
+                data = {}
+            self.__data = data
+
+        return self.__data
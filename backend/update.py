@@ -3,20 +3,45 @@
 
 import os
 import time
+import uuid
 import random
 import copy
+import json
+import hashlib
 import logging
+import threading
 from cleep.exception import MissingParameter, InvalidParameter, CommandError, CommandInfo
 from cleep.core import CleepModule
-from cleep.libs.internals.installmodule import PATH_INSTALL
-from cleep.libs.configs.modulesjson import ModulesJson
-from cleep.libs.configs.cleepconf import CleepConf
-from cleep.libs.internals.cleepgithub import CleepGithub
 import cleep.libs.internals.tools as Tools
 from cleep import __version__ as VERSION
-from cleep.libs.internals.installcleep import InstallCleep
-from cleep.libs.internals.install import Install
-from cleep.libs.internals.task import Task
+from .lazyimport import LazyImport
+from .packagecache import PackageCache
+from .packageserver import PackageServer
+from .conditionalrequest import ConditionalRequest
+from .compactcatalog import CompactCatalog
+from .logsindex import LogsIndex
+from .processhistory import ProcessHistory
+from .outputstreamer import OutputStreamer
+from .processoutputlog import ProcessOutputLog
+from .eventcoalescer import EventCoalescer
+from .modulesstate import ModulesState
+from .progressmodel import ProgressModel
+from .durationstore import DurationStore
+from .statesnapshot import StateSnapshot
+from .updatemetrics import UpdateMetrics
+
+# heavy libraries (http, packaging...) are only imported when used, most Cleep boots never
+# check nor install anything
+ModulesJson = LazyImport('cleep.libs.configs.modulesjson', 'ModulesJson')
+CleepConf = LazyImport('cleep.libs.configs.cleepconf', 'CleepConf')
+CleepGithub = LazyImport('cleep.libs.internals.cleepgithub', 'CleepGithub')
+InstallCleep = LazyImport('cleep.libs.internals.installcleep', 'InstallCleep')
+Install = LazyImport('cleep.libs.internals.install', 'Install')
+Task = LazyImport('cleep.libs.internals.task', 'Task')
+
+# same path as cleep.libs.internals.installmodule.PATH_INSTALL, not imported from there because
+# installmodule loads the whole download stack
+PATH_INSTALL = '/opt/cleep/install'
 
 class Update(CleepModule):
     """
@@ -42,13 +67,37 @@ class Update(CleepModule):
         'cleepversion': '0.0.0',
         'cleeplastcheck': None,
         'moduleslastcheck': None,
+        'packagecachesize': 64 * 1024 * 1024,
+        'compactcatalog': None,
+        'modulesjsonvalidators': None,
+        'metricsfile': None,
     }
 
     CLEEP_GITHUB_OWNER = 'tangb'
     CLEEP_GITHUB_REPO = 'raspiot'
     PROCESS_STATUS_SUCCESS_FILENAME = 'process_success.log'
     PROCESS_STATUS_FAILURE_FILENAME = 'process_failure.log'
+    LOGS_INDEX_PATH = os.path.join(PATH_INSTALL, 'logs_index.json')
+    LOGS_PAGE_SIZE = 65536
+    PROCESS_HISTORY_INDEX_PATH = os.path.join(PATH_INSTALL, 'process_history_index.json')
+    PROCESS_HISTORY_MAX_RECORDS = 10
+    PROCESS_HISTORY_MAX_SIZE = 262144
+    SEARCH_LOGS_MAX_RESULTS = 100
+    OUTPUT_STREAM_INTERVAL = 1.0
+    OUTPUT_STREAM_MAX_BYTES = 4096
+    OUTPUT_STREAM_BUFFER_SIZE = 200
+    PROCESS_OUTPUT_TAIL_SIZE = 20
+    PROCESS_EVENTS_INTERVAL = 0.5
+    DURATIONS_PATH = os.path.join(PATH_INSTALL, 'durations.json')
+    DURATIONS_MAX_RECORDS = 20
+    STATE_SNAPSHOT_PATH = os.path.join(PATH_INSTALL, 'update_state.json')
+    INVENTORY_SYNC_TIMEOUT = 20.0
+    INVENTORY_SYNC_RETRY_DELAY = 2.0
+    INVENTORY_SYNC_MAX_RETRY_DELAY = 60.0
     CLEEP_STATUS_FILEPATH = ''
+    PACKAGE_CACHE_PATH = '/opt/cleep/cache/packages'
+    COMPACT_CATALOG_PATH = '/tmp/cleep_update_catalog.bin'
+    COMPACT_CATALOG_MAX_MEMORY = 1024 * 1024 * 1024
     ACTION_MODULE_INSTALL = 'install'
     ACTION_MODULE_UPDATE = 'update'
     ACTION_MODULE_UNINSTALL = 'uninstall'
@@ -68,9 +117,62 @@ class Update(CleepModule):
         self.logger.setLevel(logging.TRACE)
 
         # members
-        self.modules_json = ModulesJson(self.cleep_filesystem)
-        self.cleep_conf = CleepConf(self.cleep_filesystem)
-        self._modules_updates = {}
+        self._modules_json = None
+        self._cleep_conf = None
+        self.package_cache = PackageCache(self.cleep_filesystem, self.PACKAGE_CACHE_PATH)
+        self._package_server = PackageServer(self.PACKAGE_CACHE_PATH)
+        self._modules_json_request = None
+        self._logs_index = LogsIndex(
+            self.cleep_filesystem,
+            PATH_INSTALL,
+            self.LOGS_INDEX_PATH,
+            self.PROCESS_STATUS_SUCCESS_FILENAME,
+            self.PROCESS_STATUS_FAILURE_FILENAME,
+        )
+        self._process_history = ProcessHistory(
+            self.cleep_filesystem,
+            PATH_INSTALL,
+            self.PROCESS_HISTORY_INDEX_PATH,
+            self.PROCESS_HISTORY_MAX_RECORDS,
+            self.PROCESS_HISTORY_MAX_SIZE,
+        )
+        self._events_coalescer = EventCoalescer(self.PROCESS_EVENTS_INTERVAL)
+        self._process_output = ProcessOutputLog(self.cleep_filesystem, PATH_INSTALL, self.PROCESS_OUTPUT_TAIL_SIZE)
+        self._durations = DurationStore(self.cleep_filesystem, self.DURATIONS_PATH, self.DURATIONS_MAX_RECORDS)
+        self._progress_model = ProgressModel(self._get_estimated_duration)
+        self._state_snapshot = StateSnapshot(self.cleep_filesystem, self.STATE_SNAPSHOT_PATH)
+        self._metrics = UpdateMetrics(self.cleep_filesystem)
+        self._output_streamer = OutputStreamer(
+            self._send_module_output,
+            self.OUTPUT_STREAM_INTERVAL,
+            self.OUTPUT_STREAM_MAX_BYTES,
+            self.OUTPUT_STREAM_BUFFER_SIZE,
+        )
+        # parsed modules.json content, invalidated when file changes
+        self._modules_json_cache = {
+            'content': None,
+            'signature': None,
+            'hits': 0,
+            'misses': 0,
+        }
+        # modules.json entries hashes and installed versions used during last modules updates computation
+        self._modules_json_entries_hashes = {}
+        self._modules_checked_versions = {}
+        # compact catalog is used on low memory devices to avoid loading whole modules.json
+        # (set during configuration, see _is_compact_catalog_enabled)
+        self._compact_catalog = None
+        self._compact_catalog_signature = None
+        self._use_compact_catalog = False
+        # modules updates are published as snapshots to readers (see ModulesState)
+        self._modules_updates = ModulesState()
+        # modules updates revisions restart on each run, run id lets clients detect it
+        self._run_id = uuid.uuid4().hex
+        # modules updates are filled from inventory in background during startup
+        self._modules_syncing = False
+        self._modules_ready = threading.Event()
+        self.__inventory_sync_stop = threading.Event()
+        # cleep updates dict is never modified once assigned (see _set_cleep_updates)
+        self._cleep_updates_lock = threading.Lock()
         self._cleep_updates = {
             'updatable': False,
             'processing': False,
@@ -94,31 +196,174 @@ class Update(CleepModule):
         # contains sub actions of mains actions (to perform action on dependencies)
         self.__sub_actions = []
         self.__sub_actions_task = None
+        self.__running_sub_action = None
+        # timings of running Cleep update
+        self._cleep_update_timings = None
 
         # events
         self.module_install_event = self._get_event('update.module.install')
         self.module_uninstall_event = self._get_event('update.module.uninstall')
         self.module_update_event = self._get_event('update.module.update')
         self.cleep_update_event = self._get_event('update.cleep.update')
+        self.module_output_event = self._get_event('update.module.output')
+        self.modules_ready_event = self._get_event('update.modules.ready')
+
+    @property
+    def modules_json(self):
+        """
+        ModulesJson instance, created on first use
+        """
+        if self._modules_json is None:
+            self._modules_json = ModulesJson(self.cleep_filesystem)
+        return self._modules_json
+
+    @modules_json.setter
+    def modules_json(self, modules_json):
+        self._modules_json = modules_json
+
+    @property
+    def cleep_conf(self):
+        """
+        CleepConf instance, created on first use
+        """
+        if self._cleep_conf is None:
+            self._cleep_conf = CleepConf(self.cleep_filesystem)
+        return self._cleep_conf
+
+    @cleep_conf.setter
+    def cleep_conf(self, cleep_conf):
+        self._cleep_conf = cleep_conf
 
     def _configure(self):
         """
         Configure module
         """
         self._set_config_field('cleepversion', VERSION)
+        self.package_cache.set_max_size(self._get_config_field('packagecachesize'))
+        self._use_compact_catalog = self._is_compact_catalog_enabled(self._get_config_field('compactcatalog'))
 
     def _on_start(self):
         """
         Module is started
         """
-        # init installed modules
-        self._fill_modules_updates()
+        # restore last cleep update check result
+        self._restore_cleep_updates()
+
+        # init installed modules in background to not delay Cleep startup
+        self._start_inventory_sync()
 
     def _on_stop(self):
         """
         Module stopped
         """
+        self.__inventory_sync_stop.set()
         self.__stop_actions_tasks()
+        self._close_compact_catalog()
+        self._output_streamer.stop()
+        self._events_coalescer.stop()
+        self._package_server.stop()
+        self.package_cache.flush()
+
+    def _start_inventory_sync(self):
+        """
+        Start filling modules updates from inventory in background. Modules updates are empty and
+        flagged as syncing until inventory responds
+        """
+        self._modules_syncing = True
+        self._modules_ready.clear()
+        self.__inventory_sync_stop.clear()
+
+        thread = threading.Thread(target=self._sync_inventory, name='update-inventory-sync')
+        thread.daemon = True
+        thread.start()
+
+    def _sync_inventory(self):
+        """
+        Fill modules updates from inventory, retrying with increasing delay until it succeeds or
+        module is stopped. Modules ready event is sent at the end
+        """
+        delay = self.INVENTORY_SYNC_RETRY_DELAY
+        while True:
+            try:
+                self._fill_modules_updates()
+                break
+            except Exception as error:
+                self.logger.warning('Unable to get installed modules (%s), retry in %s seconds' % (str(error), delay))
+            if self.__inventory_sync_stop.wait(delay):
+                self.logger.debug('Inventory sync stopped')
+                return
+            delay = min(delay * 2, self.INVENTORY_SYNC_MAX_RETRY_DELAY)
+
+        # restore last modules updates check result, and compute updatable modules from local
+        # modules.json if it is not up to date, to display updates without network check
+        if not self._restore_modules_updates():
+            self._compute_local_modules_updates()
+
+        self._modules_syncing = False
+        self._save_state_snapshot()
+        self._modules_ready.set()
+        self.modules_ready_event.send(params={
+            'revision': self._modules_updates.get_snapshot().revision,
+            'runid': self._run_id,
+        })
+
+    def _restore_cleep_updates(self):
+        """
+        Restore Cleep update infos from state snapshot if Cleep version has not changed
+        """
+        try:
+            cleep_updates = self._state_snapshot.get_cleep_updates(VERSION)
+            if cleep_updates:
+                self.logger.debug('Cleep update infos restored from snapshot: %s' % cleep_updates)
+                self._set_cleep_updates(updatable=True, **cleep_updates)
+        except Exception:
+            self.logger.exception('Unable to restore Cleep update infos')
+
+    def _restore_modules_updates(self):
+        """
+        Restore modules update infos from state snapshot for modules whose installed version has
+        not changed
+
+        Returns:
+            bool: True if snapshot is up to date (same installed modules and modules.json)
+        """
+        try:
+            snapshot = self._modules_updates.get_snapshot()
+            installed_versions = {
+                module_name: snapshot.modules[module_name].version
+                for module_name in snapshot.installed
+            }
+            modules, up_to_date = self._state_snapshot.get_modules_updates(
+                installed_versions,
+                self._get_modules_json_signature(),
+            )
+
+            with self._modules_updates.writer():
+                for module_name, (update_version, changelog) in modules.items():
+                    module = self._modules_updates[module_name]
+                    module.updatable = True
+                    module.update_version = update_version
+                    module.changelog = changelog
+                    self._bump_modules_updates_revision(module_name)
+            self.logger.debug(
+                'Modules update infos restored from snapshot for %s (up to date=%s)' % (list(modules.keys()), up_to_date)
+            )
+
+            return up_to_date
+        except Exception:
+            self.logger.exception('Unable to restore modules update infos')
+            return False
+
+    def _save_state_snapshot(self):
+        """
+        Save last updates check results. Modules update infos are not saved while installed modules
+        are not loaded
+        """
+        try:
+            modules_updates = None if self._modules_syncing else self._modules_updates.get_snapshot().to_dict()
+            self._state_snapshot.save(VERSION, self._cleep_updates, modules_updates, self._get_modules_json_signature())
+        except Exception:
+            self.logger.exception('Unable to save update state snapshot')
 
     def get_module_config(self):
         """
@@ -130,6 +375,7 @@ class Update(CleepModule):
         config = self._get_config()
         config.update({
             'cleepupdatelogs': self._get_last_update_logs('cleep'),
+            'modulessyncing': self._modules_syncing,
         })
 
         return config
@@ -160,6 +406,8 @@ class Update(CleepModule):
                 elif config['modulesupdateenabled']:
                     try:
                         self.update_modules()
+                    except CommandInfo as error:
+                        self.logger.info('Automatic applications update skipped: %s' % str(error))
                     except Exception: # pragma: no cover
                         self.crash_report.report_exception()
 
@@ -174,7 +422,10 @@ class Update(CleepModule):
                 module name: {
                     timestamp (int)
                     path (string)
+                    size (int)
                     failed (bool)
+                    name (string)
+                    installed (bool)
                 }
                 ...
             }
@@ -182,12 +433,8 @@ class Update(CleepModule):
         """
         out = {}
 
-        if not os.path.exists(PATH_INSTALL):
-            return out
-
         installed_modules = self._get_installed_modules_names()
-        module_names = os.listdir(PATH_INSTALL)
-        for module_name in module_names:
+        for module_name in self._logs_index.get_module_names():
             if module_name == 'cleep':
                 continue
 
@@ -217,71 +464,249 @@ class Update(CleepModule):
             {
                 timestamp (int): logs file timestamp
                 path (string): log file path
+                size (int): log file size
                 failed (bool): True if last update failed
             }
 
         """
-        path_success = os.path.join(PATH_INSTALL, module_name, self.PROCESS_STATUS_SUCCESS_FILENAME)
-        timestamp_success = 0
-        if os.path.exists(path_success):
-            timestamp_success = int(os.path.getmtime(path_success))
-        path_failure = os.path.join(PATH_INSTALL, module_name, self.PROCESS_STATUS_FAILURE_FILENAME)
-        timestamp_failure = 0
-        if os.path.exists(path_failure):
-            timestamp_failure = int(os.path.getmtime(path_failure))
+        return self._logs_index.get(module_name)
 
-        if timestamp_success == 0 and timestamp_failure == 0:
-            return None
-
-        # keep most recent one
-        if timestamp_success > timestamp_failure:
-            return {
-                'timestamp': timestamp_success,
-                'path': path_success,
-                'failed': False,
-            }
-
-        return {
-            'timestamp': timestamp_failure,
-            'path': path_failure,
-            'failed': True,
-        }
-
-    def get_logs(self, module_name):
+    def get_logs(self, module_name, offset=None, limit=None, tail=None):
         """
         Get logs content for specified module or cleep
 
         Args:
             module_name (string): module name. Specify "cleep" to retrieve logs for cleep
+            offset (int): read logs from this byte offset
+            limit (int): maximum number of bytes to read (default LOGS_PAGE_SIZE)
+            tail (int): read last specified number of bytes (offset is ignored)
+
+        Returns:
+            string: whole logs content if no offset, limit or tail is specified
+            dict: logs page otherwise::
+
+                {
+                    content (string): logs content
+                    offset (int): byte offset of returned content
+                    nextoffset (int): byte offset to read next content from
+                    size (int): logs file size
+                }
+
         """
-        path_success = os.path.join(PATH_INSTALL, module_name, self.PROCESS_STATUS_SUCCESS_FILENAME)
-        timestamp_success = 0
-        if os.path.exists(path_success):
-            timestamp_success = int(os.path.getmtime(path_success))
-        path_failure = os.path.join(PATH_INSTALL, module_name, self.PROCESS_STATUS_FAILURE_FILENAME)
-        timestamp_failure = 0
-        if os.path.exists(path_failure):
-            timestamp_failure = int(os.path.getmtime(path_failure))
+        for name, value in (('offset', offset), ('limit', limit), ('tail', tail)):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+                raise InvalidParameter('Parameter "%s" is invalid' % name)
 
-        if timestamp_success == 0 and timestamp_failure == 0:
+        infos = self._get_last_update_logs(module_name)
+        if not infos:
             raise CommandError('There is no logs for app "%s"' % module_name)
 
-        path = path_failure
-        if timestamp_success > timestamp_failure:
-            path = path_success
+        if offset is None and limit is None and tail is None:
+            lines = self.cleep_filesystem.read_data(infos['path'], encoding='utf8')
+            if lines is None:
+                raise CommandError('Error reading app "%s" logs file' % module_name)
+
+            return ''.join(lines)
 
-        lines = self.cleep_filesystem.read_data(path, encoding='utf8')
-        if lines is None:
+        try:
+            return self._read_logs_page(infos['path'], offset or 0, limit or self.LOGS_PAGE_SIZE, tail)
+        except Exception:
+            self.logger.exception('Error reading logs file "%s"' % infos['path'])
             raise CommandError('Error reading app "%s" logs file' % module_name)
 
-        return ''.join(lines)
+    def get_logs_history(self, module_name):
+        """
+        Return module process logs history
+
+        Args:
+            module_name (string): module name. Specify "cleep" to retrieve history for cleep
+
+        Returns:
+            list: history records infos, most recent first::
+
+                [
+                    {
+                        timestamp (int): process timestamp
+                        failed (bool): True if process failed
+                        size (int): compressed record size
+                    },
+                    ...
+                ]
+
+        """
+        if module_name is None or len(module_name) == 0:
+            raise MissingParameter('Parameter "module_name" is missing')
+
+        return self._process_history.get_records(module_name)
+
+    def get_logs_history_entry(self, module_name, position):
+        """
+        Return module process logs history entry
+
+        Args:
+            module_name (string): module name. Specify "cleep" to retrieve history for cleep
+            position (int): history entry position (0 is the most recent one)
+
+        Returns:
+            dict: stored process status (with process, stdout and stderr lines)
+        """
+        if module_name is None or len(module_name) == 0:
+            raise MissingParameter('Parameter "module_name" is missing')
+        if position is None:
+            raise MissingParameter('Parameter "position" is missing')
+        if not isinstance(position, int) or isinstance(position, bool) or position < 0:
+            raise InvalidParameter('Parameter "position" is invalid')
+
+        try:
+            status = self._process_history.get_record(module_name, position)
+        except Exception:
+            self.logger.exception('Error reading module "%s" history entry %s' % (module_name, position))
+            raise CommandError('Error reading app "%s" logs history' % module_name)
+        if status is None:
+            raise CommandError('There is no logs history entry for app "%s"' % module_name)
+
+        return status
+
+    def get_module_output(self, module_name):
+        """
+        Return last output lines of current or last process of specified module. It is useful
+        to fill output before receiving "update.module.output" events.
+
+        Args:
+            module_name (string): module name
+
+        Returns:
+            list: last output lines::
+
+                [
+                    {
+                        output (string): output name (process, stdout or stderr)
+                        line (string): output line
+                    },
+                    ...
+                ]
+
+        """
+        if module_name is None or len(module_name) == 0:
+            raise MissingParameter('Parameter "module_name" is missing')
+
+        return self._output_streamer.get_buffer(module_name)
+
+    def _send_module_output(self, module_name, lines):
+        """
+        Send module output lines batch to ui
+
+        Args:
+            module_name (string): module name
+            lines (list): output lines
+        """
+        self.module_output_event.send(params={
+            'module': module_name,
+            'lines': lines,
+        })
+
+    def search_update_logs(self, query, since=None, status=None):
+        """
+        Search text in all stored apps and Cleep process logs
+
+        Args:
+            query (string): text to search (case insensitive)
+            since (int): only search logs more recent than this timestamp
+            status (string): only search "success" or "failure" logs. All logs if not specified
+
+        Returns:
+            dict: search results::
+
+                {
+                    results (list): list of matches, most recent first::
+                        [
+                            {
+                                module (string): module name ("cleep" for Cleep logs)
+                                timestamp (int): process timestamp
+                                failed (bool): True if process failed
+                                position (int): logs history entry position (see get_logs_history_entry)
+                                output (string): output name (process, stdout or stderr)
+                                snippet (string): matching line part
+                            },
+                            ...
+                        ]
+                    truncated (bool): True if there are more results than returned ones
+                }
+
+        """
+        if query is None or len(query) == 0:
+            raise MissingParameter('Parameter "query" is missing')
+        if not isinstance(query, str):
+            raise InvalidParameter('Parameter "query" is invalid')
+        if since is not None and (not isinstance(since, int) or isinstance(since, bool) or since < 0):
+            raise InvalidParameter('Parameter "since" is invalid')
+        if status not in (None, 'success', 'failure'):
+            raise InvalidParameter('Parameter "status" must be "success" or "failure"')
+
+        failed = None if status is None else status == 'failure'
+        try:
+            return self._process_history.search(query, since, failed, self.SEARCH_LOGS_MAX_RESULTS)
+        except Exception:
+            self.logger.exception('Error searching "%s" in logs history' % query)
+            raise CommandError('Error searching logs')
+
+    def _read_logs_page(self, path, offset, limit, tail=None):
+        """
+        Read logs file page, only reading requested bytes range
+
+        Args:
+            path (string): logs file path
+            offset (int): byte offset to read from
+            limit (int): maximum number of bytes to read
+            tail (int): read last specified number of bytes instead of reading from offset
+
+        Returns:
+            dict: logs page (see get_logs)
+        """
+        with open(path, 'rb') as fd:
+            size = os.fstat(fd.fileno()).st_size
+            if tail is not None:
+                offset = max(0, size - tail)
+                limit = tail
+            offset = min(offset, size)
+            fd.seek(offset)
+            data = fd.read(limit)
+
+        # do not split utf8 multibytes characters at page boundaries
+        start = 0
+        while offset + start > 0 and start < len(data) and start < 4 and (data[start] & 0xC0) == 0x80:
+            start += 1
+        end = len(data)
+        if offset + end < size:
+            for index in range(end - 1, max(start, end - 4) - 1, -1):
+                if (data[index] & 0xC0) != 0x80:
+                    lead = data[index]
+                    length = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+                    if index + length > end:
+                        end = index
+                    break
+            if end <= start:
+                # limit is too small to contain a whole character
+                end = len(data)
+
+        return {
+            'content': data[start:end].decode('utf8', errors='replace'),
+            'offset': offset + start,
+            'nextoffset': offset + end,
+            'size': size,
+        }
 
-    def get_modules_updates(self):
+    def get_modules_updates(self, since_revision=None, run_id=None):
         """
         Return list of modules updates
 
+        Args:
+            since_revision (int): if specified, only return modules updates changed after this revision
+            run_id (string): run id returned with since_revision. If it is not the current run id
+                             (module restarted since), all modules updates are returned
+
         Returns:
-            dict: list of modules updates::
+            dict: list of modules updates if since_revision is not specified::
 
             {
                 module name (string): {
@@ -289,8 +714,66 @@ class Update(CleepModule):
                 ...
             }
 
+            dict: modules updates changed after since_revision otherwise::
+
+            {
+                revision (int): current modules updates revision
+                runid (string): current run id (revisions restart on each run)
+                full (bool): True if all modules updates are returned (client must replace its list)
+                modules (dict): changed modules updates (same format as above)
+                syncing (bool): True if installed modules are not loaded yet (update.modules.ready
+                                event is sent once loaded)
+            }
+
+        """
+        snapshot = self._modules_updates.get_snapshot()
+        if since_revision is None:
+            return snapshot.to_dict()
+        if not isinstance(since_revision, int) or isinstance(since_revision, bool) or since_revision < 0:
+            raise InvalidParameter('Parameter "since_revision" is invalid')
+
+        full = (
+            run_id != self._run_id
+            or since_revision < snapshot.resetrevision
+            or since_revision > snapshot.revision
+        )
+        if full:
+            modules = snapshot.to_dict()
+        else:
+            modules = snapshot.to_dict(
+                module_name
+                for module_name, revision in snapshot.revisions.items()
+                if revision > since_revision
+            )
+
+        return {
+            'revision': snapshot.revision,
+            'runid': self._run_id,
+            'full': full,
+            'modules': modules,
+            'syncing': self._modules_syncing,
+        }
+
+    def _bump_modules_updates_revision(self, module_name=None):
+        """
+        Increase modules updates revision after modules updates changed
+
+        Args:
+            module_name (string): changed module name. If None all modules updates changed
+        """
+        self._modules_updates.touch(module_name)
+
+    def _set_cleep_updates(self, **fields):
+        """
+        Update cleep updates infos. A new dict is assigned so readers never see partial update
+
+        Args:
+            fields (dict): cleep updates fields to update
         """
-        return self._modules_updates
+        with self._cleep_updates_lock:
+            cleep_updates = dict(self._cleep_updates)
+            cleep_updates.update(fields)
+            self._cleep_updates = cleep_updates
 
     def get_cleep_updates(self):
         """
@@ -318,11 +801,11 @@ class Update(CleepModule):
         Return installed modules names
 
         Returns:
-            list: list of modules names
+            frozenset: set of modules names
         """
-        # modules updates dict can contains module that are installing,
-        # but there are not yet so we must filter them
-        return [module['name'] for module in self._modules_updates.values() if module['version'] is not None]
+        # modules updates can contains module that are installing, but there are not yet
+        # installed so they are not part of installed modules index
+        return self._modules_updates.get_snapshot().installed
 
     def __start_actions_tasks(self):
         """
@@ -381,6 +864,8 @@ class Update(CleepModule):
             # remove previous action if necessary
             if len(self.__main_actions) > 0 and self.__main_actions[len(self.__main_actions)-1]['processing']:
                 self.__main_actions.pop()
+                # previous action packages are not needed anymore
+                self.package_cache.unpin()
 
             # is there main action to run ?
             if len(self.__main_actions) == 0:
@@ -392,6 +877,7 @@ class Update(CleepModule):
             action = self.__main_actions[len(self.__main_actions)-1]
             self.logger.debug('Processing action %s' % action)
             action['processing'] = True
+            resolve_start = time.monotonic()
             if action['action'] == Update.ACTION_MODULE_INSTALL:
                 self._install_main_module(action['module'])
             elif action['action'] == Update.ACTION_MODULE_UNINSTALL:
@@ -399,34 +885,101 @@ class Update(CleepModule):
             elif action['action'] == Update.ACTION_MODULE_UPDATE:
                 self._update_main_module(action['module'])
             self.logger.debug('%d sub actions postponed' % len(self.__sub_actions))
+            resolve_duration = time.monotonic() - resolve_start
+            self._metrics.add_duration('resolve', resolve_duration)
+            for sub_action in self.__sub_actions:
+                if sub_action['module'] == action['module']:
+                    sub_action.setdefault('timings', {})['resolve'] = resolve_duration
+
+            # stage packages before touching installed applications
+            self._stage_sub_actions_packages()
 
             # update main action and module infos
             action['processing'] = True
             self._set_module_process(progress=0)
 
-            # update progress step for all sub actions
-            # this is done after all sub actions are stored to compute valid progress step
-            try:
-                progress_step = int(100 / len(self.__sub_actions))
-            except ZeroDivisionError:
-                progress_step = 0
-            for sub_action in self.__sub_actions:
-                sub_action['progressstep'] = progress_step
+            # start progress model with all sub actions
+            # this is done after all sub actions are stored to weight them against each other
+            # (sub actions are executed from the end of the list)
+            self._progress_model.start([
+                {
+                    'action': sub_action['action'],
+                    'module': sub_action['module'],
+                    'size': self._get_sub_action_package_size(sub_action),
+                }
+                for sub_action in reversed(self.__sub_actions)
+            ])
 
         except Exception:
             self.logger.exception('Error occured executing action: %s' % action)
+            self._metrics.add_failure('plan')
             self._set_module_process(failed=True)
+            self.package_cache.unpin()
             if action:
                 params = {
                     'module': action['module'],
                     'status': Install.STATUS_ERROR
                 }
-                if action['action'] == Update.ACTION_MODULE_INSTALL:
-                    self.module_install_event.send(params)
-                elif action['action'] == Update.ACTION_MODULE_UNINSTALL:
-                    self.module_uninstall_event.send(params)
-                elif action['action'] == Update.ACTION_MODULE_UPDATE:
-                    self.module_update_event.send(params)
+                self._send_process_event(action['action'], params, terminal=True)
+
+    def _stage_sub_actions_packages(self):
+        """
+        Download all packages needed by sub actions into package cache before executing them.
+        This way a plan fails before any installed application is modified if a package can't be
+        retrieved, and sub actions only perform local operations.
+
+        Staged packages are pinned in cache until end of main action. Nothing is staged if package
+        cache is disabled or if plan packages exceed cache size (they are downloaded during install).
+
+        Raises:
+            Exception if a package can't be staged
+        """
+        if not self.package_cache.is_enabled():
+            return
+
+        sub_actions = [
+            sub_action
+            for sub_action in self.__sub_actions
+            if sub_action['action'] != Update.ACTION_MODULE_UNINSTALL
+            and sub_action['infos']
+            and sub_action['infos'].get('sha256')
+            and sub_action['infos'].get('download')
+        ]
+        plan_size = sum([sub_action['infos'].get('size') or 0 for sub_action in sub_actions])
+        if plan_size > self.package_cache.max_size:
+            self.logger.info('Packages to stage (%d bytes) exceed package cache size, they will be downloaded during install' % plan_size)
+            return
+
+        for sub_action in sub_actions:
+            infos = sub_action['infos']
+            download_start = time.monotonic()
+            path = self.package_cache.fetch(infos['download'], infos['sha256'], size=infos.get('size'))
+            download_duration = time.monotonic() - download_start
+            sub_action.setdefault('timings', {})['download'] = download_duration
+            self._metrics.add_duration('download', download_duration)
+            if path:
+                self.logger.debug('Package of "%s" staged in "%s"' % (sub_action['module'], path))
+                self.package_cache.pin(infos['sha256'])
+                sub_action['infos'] = copy.copy(infos)
+                sub_action['infos']['download'] = self._package_server.get_url(path)
+
+    def _get_sub_action_package_size(self, sub_action):
+        """
+        Return size of package used by sub action
+
+        Args:
+            sub_action (dict): sub action
+
+        Returns:
+            int: package size (bytes) or None if unknown or sub action does not use package
+        """
+        infos = sub_action['infos']
+        if sub_action['action'] == Update.ACTION_MODULE_UNINSTALL or not infos:
+            return None
+        if infos.get('size'):
+            return infos['size']
+
+        return self._progress_model.get_package_size(infos.get('download'))
 
     def _execute_sub_actions_task(self):
         """
@@ -455,7 +1008,9 @@ class Update(CleepModule):
             return
 
         # update module process progress
-        self._set_module_process(inc_progress=sub_action['progressstep'])
+        self.__running_sub_action = sub_action
+        self._progress_model.start_step()
+        self._update_module_progress()
 
         # launch sub action
         if sub_action['action'] == Update.ACTION_MODULE_INSTALL:
@@ -478,13 +1033,69 @@ class Update(CleepModule):
         action = self.__main_actions[len(self.__main_actions)-1]
         return action['module'] if action['processing'] else None
 
-    def _set_module_process(self, progress=None, inc_progress=None, failed=None, pending=None, forced_module_name=None):
+    def _update_module_progress(self, **kwargs):
+        """
+        Set processing module progress and eta from progress model
+
+        Args:
+            kwargs: other module process infos (see _set_module_process)
+        """
+        self._set_module_process(
+            progress=self._progress_model.get_progress(),
+            eta=self._progress_model.get_eta(),
+            **kwargs
+        )
+
+    def _get_estimated_duration(self, action, module_name):
+        """
+        Return estimated process duration of module action from previous executions
+
+        Args:
+            action (string): action name (see ACTION_XXX constants)
+            module_name (string): module name
+
+        Returns:
+            float: median process duration (seconds) or None if action was never executed
+        """
+        estimation = self._durations.estimate(action, module_name, ['install'])
+        return estimation['p50'] if estimation else None
+
+    def _record_sub_action_duration(self, install_duration, callback_duration):
+        """
+        Record phases durations of running sub action
+
+        Args:
+            install_duration (float): process duration (seconds)
+            callback_duration (float): end of process handling duration (seconds)
+        """
+        self._metrics.add_duration('install', install_duration)
+        self._metrics.add_duration('callback', callback_duration)
+
+        sub_action = self.__running_sub_action
+        if not sub_action or install_duration is None:
+            return
+
+        try:
+            timings = sub_action.get('timings') or {}
+            version = sub_action['infos'].get('version') if sub_action['infos'] else None
+            self._durations.record(sub_action['action'], sub_action['module'], version, {
+                'resolve': timings.get('resolve'),
+                'download': timings.get('download'),
+                'install': install_duration,
+                'callback': callback_duration,
+            })
+        except Exception:
+            self.logger.exception(
+                'Unable to record "%s" durations of module "%s"' % (sub_action['action'], sub_action['module'])
+            )
+
+    def _set_module_process(self, progress=None, eta=None, failed=None, pending=None, forced_module_name=None):
         """
         Set module process infos. Nothing is updated if no module is processing.
 
         Args:
-            progress (int): set progress value to specified value (0-100)
-            inc_progress (int): increase progress value with specified value
+            progress (float): set progress value to specified value (0-100)
+            eta (int): estimated remaining duration (seconds)
             failed (bool): action process failed if set to False
             pending (bool): True if module action termined successfully and app needs to be restarted
             forced_module_name (string): Force module name instead of getting it from currently processing one
@@ -495,28 +1106,32 @@ class Update(CleepModule):
             self.logger.debug('Can\'t update module infos when no module is processing')
             return
 
-        # make sure entry exists in modules updates (case when installing new module)
-        if module_name not in self._modules_updates:
-            module_infos = self._get_module_infos_from_modules_json(module_name)
-            new_module_version = module_infos['version'] if module_infos else '0.0.0'
-            self._modules_updates[module_name] = self.__get_module_update_data(module_name, None, new_module_version)
-
-        module = self._modules_updates[module_name]
-        module['processing'] = True
-        if progress is not None:
-            module['update']['progress'] = progress
-        elif inc_progress is not None:
-            module['update']['progress'] += inc_progress
-        if module['update']['progress'] > 100:
-            module['update']['progress'] = 100
-            module['processing'] = False
-        if failed is not None:
-            module['update']['failed'] = failed
-            module['update']['progress'] = 100
-            module['processing'] = False
-        if pending is not None:
-            module['pending'] = pending
-            module['processing'] = not pending
+        with self._modules_updates.writer():
+            # make sure entry exists in modules updates (case when installing new module)
+            if module_name not in self._modules_updates:
+                module_infos = self._get_module_infos_from_modules_json(module_name)
+                new_module_version = module_infos['version'] if module_infos else '0.0.0'
+                self._modules_updates.add(module_name, None, new_module_version)
+
+            module = self._modules_updates[module_name]
+            module.processing = True
+            if progress is not None:
+                module.progress = progress
+            if eta is not None:
+                module.eta = eta
+            if module.progress > 100:
+                module.progress = 100
+                module.processing = False
+            if failed is not None:
+                module.failed = failed
+                module.progress = 100
+                module.processing = False
+            if pending is not None:
+                module.pending = pending
+                module.processing = not pending
+            if not module.processing:
+                module.eta = None
+            self._bump_modules_updates_revision(module_name)
 
     def _is_module_process_failed(self):
         """
@@ -530,7 +1145,7 @@ class Update(CleepModule):
             self.logger.debug('Can\'t get process status while no module is processing')
             return True
 
-        return self._modules_updates[module_name]['update']['failed']
+        return self._modules_updates[module_name].failed
 
     def _fill_modules_updates(self):
         """
@@ -541,7 +1156,7 @@ class Update(CleepModule):
             modules_updates format:
 
                 {
-                    module name (string): dict returned by __get_module_update_data
+                    module name (string): ModuleUpdateState record
                     ...
                 }
 
@@ -549,60 +1164,24 @@ class Update(CleepModule):
             Exception if send command failed
         """
         # retrieve modules from inventory
-        resp = self.send_command('get_modules', 'inventory', timeout=20)
+        with self._metrics.timer('inventory'):
+            resp = self.send_command('get_modules', 'inventory', timeout=self.INVENTORY_SYNC_TIMEOUT)
         if resp.error:
+            self._metrics.add_failure('inventory')
             raise Exception('Unable to get modules list from inventory')
         inventory_modules = resp.data
 
-        # save modules
-        modules = {}
-        for (module_name, module) in {k:v for (k, v) in inventory_modules.items() if v['installed']}.items():
-            modules[module_name] = self.__get_module_update_data(module_name, module['version'])
-        self._modules_updates = modules
-
-    def __get_module_update_data(self, module_name, installed_module_version, new_module_version=None):
-        """
-        Get module update data
-
-        Args:
-            module_name (string): module name
-            installed_module_version (string): installed module version
-            new_module_version (string): new module version after update
-
-        Returns:
-            dict: module update data::
-
-                {
-                    updatable (bool): True if module is updatable
-                    processing (bool): True if module has action in progress
-                    pending (bool): True if module has been updated/uninstalled/installed
-                    name (string): module name
-                    version (string): installed module version, None if module is not installed yet
-                    update (dict): update data::
-
-                        {
-                            progress (int): progress percentage (0-100)
-                            failed (bool): True if process has failed
-                            version (string): update version
-                            changelog (string): update changelog
-                        }
-
-                }
-
-        """
-        return {
-            'updatable': False,
-            'processing': False,
-            'pending': False,
-            'name': module_name,
-            'version': installed_module_version,
-            'update': {
-                'progress': 0,
-                'failed': False,
-                'version': new_module_version,
-                'changelog': None,
-            },
-        }
+        # save modules, keeping records of modules with action in progress
+        with self._modules_updates.writer():
+            self._modules_json_entries_hashes.clear()
+            self._modules_checked_versions.clear()
+            self._modules_updates.clear(keep=self._modules_updates.processing)
+            for (module_name, module) in {k:v for (k, v) in inventory_modules.items() if v['installed']}.items():
+                if module_name in self._modules_updates:
+                    self._modules_updates[module_name].version = module['version']
+                else:
+                    self._modules_updates.add(module_name, module['version'])
+            self._bump_modules_updates_revision()
 
     def _restart_cleep(self, delay=10.0):
         """
@@ -612,6 +1191,8 @@ class Update(CleepModule):
             delay (float): delay before restarting (default 10.0 seconds)
         """
         self.logger.info('Restart Cleep in %s seconds)' % delay)
+        self._metrics.add_duration('restart', delay)
+        self._export_metrics()
         resp = self.send_command('restart_cleep', 'system', {'delay': delay})
         if resp.error:
             self.logger.error('Unable to restart Cleep')
@@ -634,7 +1215,8 @@ class Update(CleepModule):
                 }
 
         """
-        update = copy.deepcopy(self._cleep_updates)
+        update = dict(self._cleep_updates)
+        self._metrics.increment('cleepchecks')
 
         try:
             # get beta release if GITHUB_TOKEN env variable registered
@@ -702,12 +1284,15 @@ class Update(CleepModule):
 
         except:
             self.logger.exception('Error occured during updates checking:')
+            self._metrics.add_failure('cleepcheck')
             self.crash_report.report_exception()
             raise CommandError('Error occured during cleep update check')
 
         # update config
         self._set_config_field('cleeplastcheck', int(time.time()))
-        self._cleep_updates = update
+        self._set_cleep_updates(**update)
+        self._save_state_snapshot()
+        self._export_metrics()
 
         return self._cleep_updates
 
@@ -722,70 +1307,139 @@ class Update(CleepModule):
                     modulesupdates (bool): True if at least one module has an update
                     moduleslastcheck (int): last modules update check timestamp
                     modulesjsonupdated (bool): True if modules.json updated (front needs to force modules update)
+                    changedmodules (list): names of modules whose update infos have been computed again
                 }
 
         """
-        # store local modules list (from modules.json)
-        current_modules_json = self.modules_json.get_json()
-
-        # update modules.json content
+        # update modules.json content only if remote one changed (cheap http HEAD request)
+        self._metrics.increment('moduleschecks')
         try:
-            modules_json_updated = self.modules_json.update()
-            new_modules_json = current_modules_json
+            modules_json_updated = False
+            modules_json_request = self._get_modules_json_request()
+            if self._get_modules_json_signature() is None:
+                # local file is missing, stored validators are meaningless
+                modules_json_request.reset()
+            if modules_json_request.is_modified():
+                modules_json_updated = self.modules_json.update()
+                modules_json_request.commit()
+                signature = self._get_modules_json_signature()
+                if modules_json_updated and signature:
+                    self._metrics.increment('downloadedbytes', signature[1])
+                validators = modules_json_request.get_validators()
+                validators['url'] = modules_json_request.url
+                self._set_config_field('modulesjsonvalidators', validators)
             if modules_json_updated:
-                new_modules_json = self.modules_json.get_json()
+                self._invalidate_modules_json_cache()
+                new_modules_json = None if self._use_compact_catalog else self._get_modules_json()
         except:
             self.logger.warning('Unable to refresh modules list from repository')
+            self._metrics.add_failure('modulescheck')
             raise CommandError('Unable to refresh modules list from internet')
 
         # check for modules updates available
-        update_available = False
+        changed_modules = set()
         if modules_json_updated:
+            changed_modules = self._compute_modules_updates(new_modules_json)
+        update_available = len(self._modules_updates.get_snapshot().updatable) > 0
+
+        # update config
+        config = {
+            'modulesupdates': update_available,
+            'moduleslastcheck': int(time.time())
+        }
+        self._update_config(config)
+        self._save_state_snapshot()
+        self._export_metrics()
+
+        return {
+            'modulesupdates': update_available,
+            'modulesjsonupdated': modules_json_updated,
+            'moduleslastcheck': config['moduleslastcheck'],
+            'changedmodules': sorted(changed_modules),
+        }
+
+    def _compute_local_modules_updates(self):
+        """
+        Compute installed modules update infos from locally stored modules.json
+        """
+        try:
+            modules_json = None if self._use_compact_catalog else self._get_modules_json()
+            changed_modules = self._compute_modules_updates(modules_json)
+            self.logger.debug('Modules updates computed from local modules.json for %s' % changed_modules)
+        except Exception:
+            self.logger.warning('Unable to compute modules updates from local modules.json')
+
+    def _get_modules_json_entry_hash(self, module_infos):
+        """
+        Return hash of modules.json module entry
+
+        Args:
+            module_infos (dict): modules.json module entry
+
+        Returns:
+            string: entry hash
+        """
+        return hashlib.sha1(json.dumps(module_infos, sort_keys=True).encode('utf8')).hexdigest()
+
+    def _compute_modules_updates(self, modules_json=None):
+        """
+        Compute installed modules update infos from modules.json content.
+
+        Only modules whose modules.json entry or installed version changed since last computation
+        are evaluated again.
+
+        Args:
+            modules_json (dict): modules.json content. If None modules entries are looked up one by one
+
+        Returns:
+            set: names of modules that have been evaluated again
+        """
+        changed_modules = set()
+        with self._modules_updates.writer():
             for module_name, module in self._modules_updates.items():
                 try:
-                    new_version = (new_modules_json['list'][module_name]['version'] if module_name in new_modules_json['list']
-                                   else '0.0.0')
-                    if Tools.compare_versions(module['version'], new_version):
+                    if modules_json is None:
+                        module_infos = self._get_module_infos_from_modules_json(module_name)
+                    else:
+                        module_infos = modules_json['list'].get(module_name)
+
+                    # skip module if nothing changed since last computation
+                    entry_hash = self._get_modules_json_entry_hash(module_infos)
+                    if (self._modules_json_entries_hashes.get(module_name) == entry_hash and
+                            self._modules_checked_versions.get(module_name) == module.version):
+                        continue
+
+                    new_version = module_infos['version'] if module_infos else '0.0.0'
+                    if Tools.compare_versions(module.version, new_version):
                         # new version available for current module
-                        update_available = True
-                        module['updatable'] = True
-                        module['update'] = {
-                            'version': new_version,
-                            'changelog': new_modules_json['list'][module_name]['changelog'],
-                        }
+                        module.updatable = True
+                        module.update_version = new_version
+                        module.changelog = module_infos['changelog']
                         self.logger.info('New version available for app "%s" (v%s => v%s)' % (
                             module_name,
-                            module['version'],
+                            module.version,
                             new_version
                         ))
                     else:
                         # force module infos update in case of version revert in modules.json
-                        module['updatable'] = False
-                        module['update'] = {
-                            'version': module['version'],
-                            'changelog': '',
-                        }
+                        module.updatable = False
+                        module.update_version = module.version
+                        module.changelog = ''
                         self.logger.debug('No new version available for app "%s" (v%s => v%s)' % (
                             module_name,
-                            module['version'],
+                            module.version,
                             new_version
                         ))
 
+                    self._modules_json_entries_hashes[module_name] = entry_hash
+                    self._modules_checked_versions[module_name] = module.version
+                    changed_modules.add(module_name)
+                    self._bump_modules_updates_revision(module_name)
+
                 except Exception:
                     self.logger.exception('Invalid "%s" app infos from modules.json' % module_name)
 
-        # update config
-        config = {
-            'modulesupdates': update_available,
-            'moduleslastcheck': int(time.time())
-        }
-        self._update_config(config)
-
-        return {
-            'modulesupdates': update_available,
-            'modulesjsonupdated': modules_json_updated,
-            'moduleslastcheck': config['moduleslastcheck']
-        }
+        return changed_modules
 
     def _update_cleep_callback(self, status):
         """
@@ -796,8 +1450,16 @@ class Update(CleepModule):
         """
         self.logger.debug('Cleep update callback status: %s' % status)
 
+        # write new output lines
+        self._process_output.write('cleep', status)
+
         # send process status (only status)
-        self.cleep_update_event.send(params={'status': status['status']})
+        self._events_coalescer.send(
+            'cleep',
+            self.cleep_update_event.send,
+            {'status': status['status']},
+            status['status'] >= InstallCleep.STATUS_UPDATED,
+        )
 
         # store final status when update terminated (successfully or not)
         if status['status'] >= InstallCleep.STATUS_UPDATED:
@@ -808,19 +1470,21 @@ class Update(CleepModule):
         if status['status'] == InstallCleep.STATUS_UPDATED:
             # update successful
             self.logger.info('Cleep update installed successfully. Restart now')
+            callback_start = time.monotonic()
             self._store_process_status(status, success=True)
 
             # reset cleep update
-            self._cleep_updates.update({
-                'updatable': False,
-                'processing': False,
-                'pending': True,
-                'failed': False,
-                'version': None,
-                'changelog': None,
-                'packageurl': None,
-                'checksumurl': None,
-            })
+            self._set_cleep_updates(
+                updatable=False,
+                processing=False,
+                pending=True,
+                failed=False,
+                version=None,
+                changelog=None,
+                packageurl=None,
+                checksumurl=None,
+            )
+            self._record_cleep_update_duration(time.monotonic() - callback_start)
 
             # restart cleep
             self._restart_cleep()
@@ -828,14 +1492,40 @@ class Update(CleepModule):
         elif status['status'] > InstallCleep.STATUS_UPDATED:
             # error occured
             self._store_process_status(status, success=False)
+            self._metrics.add_failure('cleep')
             self.logger.error('Cleep update failed. Please check process outpout')
 
             # reset cleep update
-            self._cleep_updates.update({
-                'processing': False,
-                'pending': False,
-                'failed': True,
+            self._set_cleep_updates(
+                processing=False,
+                pending=False,
+                failed=True,
+            )
+            self._cleep_update_timings = None
+
+    def _record_cleep_update_duration(self, callback_duration):
+        """
+        Record phases durations of Cleep update
+
+        Args:
+            callback_duration (float): end of update handling duration (seconds)
+        """
+        timings = self._cleep_update_timings
+        self._cleep_update_timings = None
+        if not timings:
+            return
+
+        install_duration = time.monotonic() - timings['start'] - callback_duration
+        self._metrics.add_duration('install', install_duration)
+        self._metrics.add_duration('callback', callback_duration)
+        try:
+            self._durations.record(Update.ACTION_MODULE_UPDATE, 'cleep', timings['version'], {
+                'download': timings['download'],
+                'install': install_duration,
+                'callback': callback_duration,
             })
+        except Exception:
+            self.logger.exception('Unable to record Cleep update durations')
 
     def update_cleep(self):
         """
@@ -844,25 +1534,179 @@ class Update(CleepModule):
         # check
         if not self._cleep_updates['updatable']:
             raise CommandInfo('No Cleep update available, please launch update check first')
+        if self._cleep_updates.get('processing'):
+            raise CommandInfo('Cleep update is already in progress')
         if len(self.__main_actions) != 0:
             raise CommandInfo('Applications updates are in progress. Please wait end of it')
 
-        # unlock filesystem
-        self.cleep_filesystem.enable_write(True, True)
-
         # reset flags
-        self._cleep_updates.update({
-            'failed': False,
-            'pending': False,
-            'processing': True,
-        })
+        self._set_cleep_updates(
+            failed=False,
+            pending=False,
+            processing=True,
+        )
 
-        # launch update
-        package_url = self._cleep_updates['packageurl']
-        checksum_url = self._cleep_updates['checksumurl']
-        self.logger.debug('Update Cleep: package_url=%s checksum_url=%s' % (package_url, checksum_url))
-        update = InstallCleep(self.cleep_filesystem, self.crash_report)
-        update.install(package_url, checksum_url, self._update_cleep_callback)
+        # launch update in background: package may be downloaded to cache before install
+        thread = threading.Thread(
+            target=self._install_cleep,
+            args=(self._cleep_updates['packageurl'], self._cleep_updates['checksumurl'], self._cleep_updates['version']),
+            name='update-cleep',
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _install_cleep(self, package_url, checksum_url, version):
+        """
+        Install Cleep package. Filesystem is unlocked only when install starts, it is locked
+        again at end of install (see _update_cleep_callback)
+
+        Args:
+            package_url (string): Cleep package url
+            checksum_url (string): Cleep package checksum url
+            version (string): Cleep version to install
+        """
+        write_enabled = False
+        try:
+            download_start = time.monotonic()
+            package_url = self._get_cached_cleep_package_url(package_url, checksum_url)
+            self._cleep_update_timings = {
+                'version': version,
+                'download': time.monotonic() - download_start,
+                'start': time.monotonic(),
+            }
+            if self.package_cache.is_enabled():
+                # package is downloaded during install otherwise
+                self._metrics.add_duration('download', self._cleep_update_timings['download'])
+
+            self.logger.debug('Update Cleep: package_url=%s checksum_url=%s' % (package_url, checksum_url))
+            self.cleep_filesystem.enable_write(True, True)
+            write_enabled = True
+            update = InstallCleep(self.cleep_filesystem, self.crash_report)
+            update.install(package_url, checksum_url, self._update_cleep_callback)
+
+        except Exception:
+            self.logger.exception('Unable to launch Cleep update')
+            if write_enabled:
+                self.cleep_filesystem.disable_write(True, True)
+            self._metrics.add_failure('cleep')
+            self._set_cleep_updates(
+                processing=False,
+                pending=False,
+                failed=True,
+            )
+            self._cleep_update_timings = None
+
+    def _get_cached_cleep_package_url(self, package_url, checksum_url):
+        """
+        Return Cleep package url, pointing to package cache if enabled
+
+        Args:
+            package_url (string): Cleep package url
+            checksum_url (string): Cleep package checksum url
+
+        Returns:
+            string: package url to install Cleep from
+        """
+        if not self.package_cache.is_enabled():
+            return package_url
+
+        try:
+            headers = None
+            if 'GITHUB_TOKEN' in os.environ:
+                headers = {'Authorization': 'token %s' % os.environ['GITHUB_TOKEN']}
+            checksum = self.package_cache.fetch_checksum(checksum_url, headers)
+            path = self.package_cache.fetch(package_url, checksum, headers)
+            if path:
+                return self._package_server.get_url(path)
+        except Exception:
+            self.logger.exception('Unable to get Cleep package from cache, it will be downloaded during update')
+
+        return package_url
+
+    def _get_cached_module_infos(self, module_name, module_infos):
+        """
+        Return module infos with download url pointing to package cache if enabled
+
+        Args:
+            module_name (string): module name
+            module_infos (dict): module infos (from modules.json)
+
+        Returns:
+            dict: module infos to install module from
+        """
+        if not self.package_cache.is_enabled() or not module_infos.get('sha256') or not module_infos.get('download'):
+            return module_infos
+        if self._package_server.is_url(module_infos['download']):
+            # package already staged
+            return module_infos
+
+        try:
+            path = self.package_cache.fetch(module_infos['download'], module_infos['sha256'], size=module_infos.get('size'))
+            if path:
+                module_infos = copy.copy(module_infos)
+                module_infos['download'] = self._package_server.get_url(path)
+        except Exception:
+            self.logger.exception('Unable to get "%s" package from cache, it will be downloaded during install' % module_name)
+
+        return module_infos
+
+    def set_package_cache_size(self, size):
+        """
+        Set package cache size. Cached packages are evicted if necessary
+
+        Args:
+            size (int): package cache byte budget. 0 disables cache
+
+        Returns:
+            dict: package cache stats (see PackageCache.get_stats)
+        """
+        if size is None:
+            raise MissingParameter('Parameter "size" is missing')
+        if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+            raise InvalidParameter('Parameter "size" is invalid')
+
+        self._set_config_field('packagecachesize', size)
+        self.package_cache.set_max_size(size)
+
+        return self.package_cache.get_stats()
+
+    def set_compact_catalog(self, enabled=None):
+        """
+        Set compact modules catalog usage
+
+        Args:
+            enabled (bool): True to always use compact catalog, False to never use it, None to only use
+                            it on low memory devices (default)
+
+        Returns:
+            bool: True if compact catalog is used
+        """
+        if enabled is not None and not isinstance(enabled, bool):
+            raise InvalidParameter('Parameter "enabled" is invalid')
+
+        self._set_config_field('compactcatalog', enabled)
+        self._use_compact_catalog = self._is_compact_catalog_enabled(enabled)
+        if not self._use_compact_catalog:
+            self._close_compact_catalog()
+
+        return self._use_compact_catalog
+
+    def _is_compact_catalog_enabled(self, compact_catalog):
+        """
+        Return True if compact catalog must be used
+
+        Args:
+            compact_catalog (bool): configured value. If None, compact catalog is only used on devices
+                                    with known total memory lower than COMPACT_CATALOG_MAX_MEMORY
+
+        Returns:
+            bool: True if compact catalog must be used
+        """
+        if compact_catalog is not None:
+            return compact_catalog
+
+        total_memory = self._get_total_memory()
+        return 0 < total_memory <= self.COMPACT_CATALOG_MAX_MEMORY
 
     def update_modules(self):
         """
@@ -871,10 +1715,14 @@ class Update(CleepModule):
         """
         if self._cleep_updates['processing'] or self._cleep_updates['pending']:
             raise CommandInfo('Cleep update is in progress. Please wait end of it')
+        if self._modules_syncing:
+            raise CommandInfo('Installed applications are loading. Please try again in a few seconds')
 
         # fill main actions with upgradable modules
-        for module in [module for module in self._modules_updates.values() if module['updatable'] and not module['processing'] and not module['pending']]:
-            self._postpone_main_action(Update.ACTION_MODULE_UPDATE, module['name'])
+        snapshot = self._modules_updates.get_snapshot()
+        for module_name in snapshot.updatable - snapshot.processing:
+            if not snapshot.modules[module_name].pending:
+                self._postpone_main_action(Update.ACTION_MODULE_UPDATE, module_name)
 
         # start main actions task
         self.__start_actions_tasks()
@@ -915,12 +1763,7 @@ class Update(CleepModule):
             'status': Install.STATUS_PROCESSING,
             'module': module_name,
         }
-        if action == self.ACTION_MODULE_INSTALL:
-            self.module_install_event.send(params)
-        elif action == self.ACTION_MODULE_UNINSTALL:
-            self.module_uninstall_event.send(params)
-        elif action == self.ACTION_MODULE_UPDATE:
-            self.module_update_event.send(params)
+        self._send_process_event(action, params)
 
         return True
 
@@ -941,7 +1784,7 @@ class Update(CleepModule):
             'main': main_module_name,
             'infos': module_infos,
             'extra': extra,
-            'progressstep': None, # will be set after all sub actions are computed
+            'timings': {}, # phases durations (see DurationStore)
         })
 
     def set_automatic_update(self, cleep_update_enabled, modules_update_enabled):
@@ -988,12 +1831,277 @@ class Update(CleepModule):
         Raises:
             Exception if modules.json is invalid
         """
-        modules_json = self.modules_json.get_json()
+        if self._use_compact_catalog:
+            return self._get_compact_catalog().get(module_name)
+
+        modules_json = self._get_modules_json()
         if module_name in modules_json['list']:
             return modules_json['list'][module_name]
 
         return None
 
+    def _get_modules_json(self):
+        """
+        Return modules.json content. Parsed content is cached until modules.json file changes
+        (modification time or size) or until cache is invalidated.
+
+        Returns:
+            dict: modules.json content
+
+        Raises:
+            Exception if modules.json is invalid
+        """
+        cache = self._modules_json_cache
+        signature = self._get_modules_json_signature()
+        if cache['content'] is not None and signature is not None and signature == cache['signature']:
+            cache['hits'] += 1
+            return cache['content']
+
+        cache['misses'] += 1
+        content = self.modules_json.get_json()
+        if cache['content'] is not None and content.get('update') != cache['content'].get('update'):
+            self.logger.debug('Modules.json content changed (update %s => %s)' % (cache['content'].get('update'), content.get('update')))
+        cache['content'] = content
+        cache['signature'] = signature
+
+        return content
+
+    def _invalidate_modules_json_cache(self):
+        """
+        Invalidate cached modules.json content (and compact catalog)
+        """
+        self._modules_json_cache['content'] = None
+        self._modules_json_cache['signature'] = None
+        self._close_compact_catalog()
+
+    def get_cache_stats(self):
+        """
+        Return update caches statistics
+
+        Returns:
+            dict: caches statistics::
+
+                {
+                    modulesjson (dict): parsed modules.json cache statistics::
+
+                        {
+                            hits (int): number of cache hits
+                            misses (int): number of cache misses
+                            update (int): cached modules.json update timestamp (None if nothing cached)
+                        }
+
+                    packages (dict): package cache statistics (see PackageCache.get_stats)
+                }
+
+        """
+        cache = self._modules_json_cache
+        return {
+            'modulesjson': {
+                'hits': cache['hits'],
+                'misses': cache['misses'],
+                'update': cache['content'].get('update') if cache['content'] else None,
+            },
+            'packages': self.package_cache.get_stats(),
+        }
+
+    def get_events_stats(self):
+        """
+        Return process events statistics
+
+        Returns:
+            dict: events statistics (see EventCoalescer.get_stats)
+        """
+        return self._events_coalescer.get_stats()
+
+    def estimate_duration(self, action, module_name):
+        """
+        Estimate action duration from its previous executions
+
+        Args:
+            action (string): action name (install, update or uninstall)
+            module_name (string): module name ("cleep" for Cleep update)
+
+        Returns:
+            dict: duration estimation or None if action was never executed on module::
+
+                {
+                    samples (int): number of previous executions used
+                    p50 (float): median duration (seconds)
+                    p95 (float): 95th percentile duration (seconds)
+                    phases (dict): median duration of each phase (resolve, download, install, callback)
+                }
+
+        """
+        if action is None or len(action) == 0:
+            raise MissingParameter('Parameter "action" is missing')
+        if action not in (Update.ACTION_MODULE_INSTALL, Update.ACTION_MODULE_UPDATE, Update.ACTION_MODULE_UNINSTALL):
+            raise InvalidParameter('Parameter "action" must be "install", "update" or "uninstall"')
+        if module_name is None or len(module_name) == 0:
+            raise MissingParameter('Parameter "module_name" is missing')
+
+        try:
+            return self._durations.estimate(action, module_name)
+        except Exception:
+            self.logger.exception('Error estimating "%s" duration of module "%s"' % (action, module_name))
+            raise CommandError('Error estimating duration')
+
+    def get_update_metrics(self):
+        """
+        Return update metrics since module start
+
+        Returns:
+            dict: update metrics (see UpdateMetrics.get_metrics). Counters are::
+
+                {
+                    cleepchecks (int): number of Cleep updates checks run
+                    moduleschecks (int): number of modules updates checks run
+                    cachehits (int): number of modules.json and package cache hits
+                    cachemisses (int): number of modules.json and package cache misses
+                    downloadedbytes (int): number of bytes downloaded (modules.json and cached packages)
+                }
+
+        """
+        return self._metrics.get_metrics(self._get_metrics_counters())
+
+    def set_metrics_file(self, path):
+        """
+        Set Prometheus text file metrics are exported to (usually in node exporter textfile
+        collector directory). File is updated after each check, process and before Cleep restart
+
+        Args:
+            path (string): metrics file path (.prom extension). None or empty to disable export
+        """
+        if path:
+            if not isinstance(path, str) or not os.path.isabs(path) or not path.endswith('.prom'):
+                raise InvalidParameter('Parameter "path" must be an absolute path to a .prom file')
+            if not os.path.isdir(os.path.dirname(path)):
+                raise InvalidParameter('Directory of "path" does not exist')
+
+        self._set_config_field('metricsfile', path or None)
+        self._export_metrics()
+
+    def _get_metrics_counters(self):
+        """
+        Return metrics counters maintained by caches
+
+        Returns:
+            dict: counters (see get_update_metrics)
+        """
+        return {
+            'cachehits': self._modules_json_cache['hits'] + self.package_cache.hits,
+            'cachemisses': self._modules_json_cache['misses'] + self.package_cache.misses,
+            'downloadedbytes': self.package_cache.downloaded,
+        }
+
+    def _export_metrics(self):
+        """
+        Write metrics to Prometheus text file if configured
+        """
+        path = self._get_config_field('metricsfile')
+        if not path:
+            return
+
+        try:
+            self._metrics.write_prometheus(path, self._get_metrics_counters())
+        except Exception:
+            self.logger.exception('Unable to export metrics to "%s"' % path)
+
+    def _send_process_event(self, action, params, terminal=False):
+        """
+        Send module process event. Events of the same module are rate limited, only terminal
+        events are sent immediately
+
+        Args:
+            action (string): process action (install, uninstall or update)
+            params (dict): event parameters (module and status)
+            terminal (bool): True if process is terminated
+        """
+        events = {
+            Update.ACTION_MODULE_INSTALL: self.module_install_event,
+            Update.ACTION_MODULE_UNINSTALL: self.module_uninstall_event,
+            Update.ACTION_MODULE_UPDATE: self.module_update_event,
+        }
+        if action not in events:
+            return
+
+        self._events_coalescer.send((action, params['module']), events[action].send, params, terminal)
+
+    def _get_total_memory(self):
+        """
+        Return device total memory
+
+        Returns:
+            int: total memory in bytes or 0 if it can't be determined
+        """
+        try:
+            with open('/proc/meminfo') as fd:
+                for line in fd:
+                    if line.startswith('MemTotal:'):
+                        return int(line.split()[1]) * 1024
+        except Exception:
+            self.logger.warning('Unable to get device total memory')
+
+        return 0
+
+    def _get_modules_json_request(self):
+        """
+        Return conditional request on remote modules.json
+
+        Request targets url ModulesJson downloads from. It is created again if this url changed
+        (after Cleep update for example), dropping stored validators that belong to previous url.
+
+        Returns:
+            ConditionalRequest: modules.json conditional request
+        """
+        url = getattr(self.modules_json, 'remote_url_version', None) or self.modules_json.remote_url_latest
+        if self._modules_json_request is None or self._modules_json_request.url != url:
+            validators = self._get_config_field('modulesjsonvalidators') or {}
+            if validators.get('url') != url:
+                validators = None
+            self._modules_json_request = ConditionalRequest(url, validators)
+
+        return self._modules_json_request
+
+    def _get_modules_json_signature(self):
+        """
+        Return modules.json file signature used to detect file changes
+
+        Returns:
+            tuple: file modification time and size, None if file does not exist
+        """
+        try:
+            stat = os.stat(ModulesJson.CONF)
+            return (stat.st_mtime, stat.st_size)
+        except OSError:
+            return None
+
+    def _get_compact_catalog(self):
+        """
+        Return compact catalog, building it from modules.json if it changed
+
+        Returns:
+            CompactCatalog: compact catalog instance
+
+        Raises:
+            Exception if modules.json is invalid
+        """
+        signature = self._get_modules_json_signature()
+        if self._compact_catalog is None or signature is None or signature != self._compact_catalog_signature:
+            self._close_compact_catalog()
+            self.logger.debug('Build compact modules catalog')
+            self._compact_catalog = CompactCatalog.build(self.COMPACT_CATALOG_PATH, self.modules_json.get_json())
+            self._compact_catalog_signature = signature
+
+        return self._compact_catalog
+
+    def _close_compact_catalog(self):
+        """
+        Close compact catalog if opened
+        """
+        if self._compact_catalog:
+            self._compact_catalog.close()
+            self._compact_catalog = None
+
     def _get_module_infos_from_inventory(self, module_name):
         """
         Return module infos from modules.json file
@@ -1008,8 +2116,10 @@ class Update(CleepModule):
             Exception if unknown module or error
         """
         # get infos from inventory
-        resp = self.send_command('get_module_infos', 'inventory', {'module_name': module_name})
+        with self._metrics.timer('inventory'):
+            resp = self.send_command('get_module_infos', 'inventory', {'module_name': module_name})
         if resp.error:
+            self._metrics.add_failure('inventory')
             self.logger.error('Unable to get module "%s" infos: %s' % (module_name, resp.message))
             raise Exception('Unable to get module "%s" infos' % module_name)
         if not resp.data:
@@ -1038,16 +2148,18 @@ class Update(CleepModule):
             # initiate recursive process
             context = {
                 'dependencies': [],
-                'visited': [module_name],
+                'visited': set([module_name]),
             }
         elif module_name in context['visited']:
-            # avoid circular deps
+            # avoid circular deps and already resolved deps
             return None
+        else:
+            context['visited'].add(module_name)
 
         # get module infos
         if module_name not in modules_infos:
-            infos = get_module_infos_callback(module_name)
-            modules_infos[module_name] = infos
+            modules_infos[module_name] = get_module_infos_callback(module_name)
+        infos = modules_infos[module_name]
 
         # handle app without infos (locally installed app)
         if infos:
@@ -1065,6 +2177,10 @@ class Update(CleepModule):
         """
         Store last module process status in filesystem
 
+        Whole process outputs are already written in process output log. They are streamed from it
+        to last process status file (served by get_logs) and to history, only a compact summary of
+        the process is kept in memory.
+
         Args:
             status (dict): process status
         """
@@ -1080,9 +2196,21 @@ class Update(CleepModule):
         if not os.path.exists(path):
             self.cleep_filesystem.mkdir(path, True)
 
-        # store status
-        if not self.cleep_filesystem.write_json(fullpath, status):
+        # flush remaining output lines and store process status with whole outputs
+        self._process_output.write(module_name, status)
+        summary = self._process_output.get_summary(module_name, status)
+        if not self._process_output.write_status(module_name, status, fullpath):
             self.logger.error('Error storing module "%s" process status into "%s"' % (module_name, fullpath))
+            self._process_output.finish(module_name)
+            return
+        self._logs_index.update(module_name, fullpath, not success)
+
+        # append status to module history, reading outputs from process output log
+        try:
+            self._process_history.append(module_name, summary, not success, self._process_output.iter_lines(module_name))
+        except Exception:
+            self.logger.exception('Error appending module "%s" process status to history' % module_name)
+        self._process_output.finish(module_name)
 
     def __install_module_callback(self, status):
         """
@@ -1102,31 +2230,47 @@ class Update(CleepModule):
         """
         self.logger.debug('Module install callback status: %s' % status)
 
+        # write and stream new output lines
+        self._process_output.write(status['module'], status)
+        self._output_streamer.feed(status['module'], status, status['status'] >= Install.STATUS_DONE)
+
+        # update progress while process is running
+        if status['status'] < Install.STATUS_DONE:
+            self._update_module_progress()
+
         # send process status
-        self.module_install_event.send(params={
+        self._send_process_event(Update.ACTION_MODULE_INSTALL, {
             'status': status['status'],
             'module': status['module'],
-        })
+        }, status['status'] >= Install.STATUS_DONE)
 
         # handle install success
         if status['status'] == Install.STATUS_DONE:
             # need to restart
             self._need_restart = True
-            self._set_module_process(pending=True)
+            install_duration = self._progress_model.end_step()
+            callback_start = time.monotonic()
+            self._update_module_progress(pending=True)
             self._store_process_status(status, success=True)
 
             # update cleep.conf
             self.cleep_conf.install_module(status['module'])
+            self._record_sub_action_duration(install_duration, time.monotonic() - callback_start)
 
         elif status['status'] == Install.STATUS_ERROR:
             # set main action failed
             self._store_process_status(status, success=False)
             self._set_module_process(failed=True)
+            self._metrics.add_failure(Update.ACTION_MODULE_INSTALL)
 
         # handle end of install to finalize install
         if status['status'] >= Install.STATUS_DONE:
             # reset processor
             self.__processor = None
+            # terminate step on process failure (already terminated on success)
+            self._progress_model.end_step()
+            self.__running_sub_action = None
+            self._export_metrics()
 
     def _install_module(self, module_name, module_infos):
         """
@@ -1149,6 +2293,8 @@ class Update(CleepModule):
 
         # non blocking, end of process handled in specified callback
         try:
+            module_infos = self._get_cached_module_infos(module_name, module_infos)
+            self._output_streamer.reset(module_name)
             self.__processor = Install(self.cleep_filesystem, self.crash_report, self.__install_module_callback)
             self.__processor.install_module(module_name, module_infos)
         except Exception as e:
@@ -1209,6 +2355,8 @@ class Update(CleepModule):
         # check params
         if self._cleep_updates['processing'] or self._cleep_updates['pending']:
             raise CommandInfo('Cleep update is in progress. Please wait end of it')
+        if self._modules_syncing:
+            raise CommandInfo('Installed applications are loading. Please try again in a few seconds')
         if module_name is None or len(module_name) == 0:
             raise MissingParameter('Parameter "module_name" is missing')
         installed_modules = self._get_installed_modules_names()
@@ -1245,30 +2393,46 @@ class Update(CleepModule):
         """
         self.logger.debug('Module uninstall callback status: %s' % status)
 
+        # write and stream new output lines
+        self._process_output.write(status['module'], status)
+        self._output_streamer.feed(status['module'], status, status['status'] >= Install.STATUS_DONE)
+
+        # update progress while process is running
+        if status['status'] < Install.STATUS_DONE:
+            self._update_module_progress()
+
         # handle process success
         if status['status'] == Install.STATUS_DONE:
             self._need_restart = True
-            self._set_module_process(pending=True)
+            install_duration = self._progress_model.end_step()
+            callback_start = time.monotonic()
+            self._update_module_progress(pending=True)
             self._store_process_status(status, success=True)
 
             # update cleep.conf
             self.cleep_conf.uninstall_module(status['module'])
+            self._record_sub_action_duration(install_duration, time.monotonic() - callback_start)
 
         elif status['status'] == Install.STATUS_ERROR:
             # set main action failed
             self._set_module_process(failed=True)
             self._store_process_status(status, success=False)
+            self._metrics.add_failure(Update.ACTION_MODULE_UNINSTALL)
 
         # handle end of process
         if status['status'] >= Install.STATUS_DONE:
             # reset processor
             self.__processor = None
+            # terminate step on process failure (already terminated on success)
+            self._progress_model.end_step()
+            self.__running_sub_action = None
+            self._export_metrics()
 
         # send process status to ui
-        self.module_uninstall_event.send(params={
+        self._send_process_event(Update.ACTION_MODULE_UNINSTALL, {
             'status': status['status'],
             'module': status['module'],
-        })
+        }, status['status'] >= Install.STATUS_DONE)
 
     def _uninstall_module(self, module_name, module_infos, extra):
         """
@@ -1280,6 +2444,7 @@ class Update(CleepModule):
             extra (any): extra data (not used here)
         """
         try:
+            self._output_streamer.reset(module_name)
             self.__processor = Install(self.cleep_filesystem, self.crash_report, self.__uninstall_module_callback)
             self.__processor.uninstall_module(module_name, module_infos, extra['force'])
         except Exception as e:
@@ -1330,6 +2495,8 @@ class Update(CleepModule):
         # check params
         if self._cleep_updates['processing'] or self._cleep_updates['pending']:
             raise CommandInfo('Cleep update is in progress. Please wait end of it')
+        if self._modules_syncing:
+            raise CommandInfo('Installed applications are loading. Please try again in a few seconds')
         if module_name is None or len(module_name) == 0:
             raise MissingParameter('Parameter "module_name" is missing')
         installed_modules = self._get_installed_modules_names()
@@ -1402,30 +2569,46 @@ class Update(CleepModule):
         """
         self.logger.debug('Module update callback status: %s' % status)
 
+        # write and stream new output lines
+        self._process_output.write(status['module'], status)
+        self._output_streamer.feed(status['module'], status, status['status'] >= Install.STATUS_DONE)
+
+        # update progress while process is running
+        if status['status'] < Install.STATUS_DONE:
+            self._update_module_progress()
+
         # send process status to ui
-        self.module_update_event.send(params={
+        self._send_process_event(Update.ACTION_MODULE_UPDATE, {
             'status': status['status'],
             'module': status['module'],
-        })
+        }, status['status'] >= Install.STATUS_DONE)
 
         # handle process success
         if status['status'] == Install.STATUS_DONE:
             self._need_restart = True
-            self._set_module_process(pending=True)
+            install_duration = self._progress_model.end_step()
+            callback_start = time.monotonic()
+            self._update_module_progress(pending=True)
             self._store_process_status(status, success=True)
 
             # update cleep.conf adding module to updated ones
             self.cleep_conf.update_module(status['module'])
+            self._record_sub_action_duration(install_duration, time.monotonic() - callback_start)
 
         elif status['status'] == Install.STATUS_ERROR:
             # set main action failed
             self._set_module_process(failed=True)
             self._store_process_status(status, success=False)
+            self._metrics.add_failure(Update.ACTION_MODULE_UPDATE)
 
         # handle end of process
         if status['status'] >= Install.STATUS_DONE:
             # reset processor
             self.__processor = None
+            # terminate step on process failure (already terminated on success)
+            self._progress_model.end_step()
+            self.__running_sub_action = None
+            self._export_metrics()
 
     def _update_module(self, module_name, module_infos):
         """
@@ -1435,6 +2618,8 @@ class Update(CleepModule):
             module_name (string): module name to install
             module_infos (dict): module infos
         """
+        module_infos = self._get_cached_module_infos(module_name, module_infos)
+        self._output_streamer.reset(module_name)
         self.__processor = Install(self.cleep_filesystem, self.crash_report, self.__update_module_callback)
         self.__processor.update_module(module_name, module_infos)
 
@@ -1516,6 +2701,8 @@ class Update(CleepModule):
         # check params
         if self._cleep_updates['processing'] or self._cleep_updates['pending']:
             raise CommandInfo('Cleep update is in progress. Please wait end of it')
+        if self._modules_syncing:
+            raise CommandInfo('Installed applications are loading. Please try again in a few seconds')
         if module_name is None or len(module_name) == 0:
             raise MissingParameter('Parameter "module_name" is missing')
         installed_modules = self._get_installed_modules_names()
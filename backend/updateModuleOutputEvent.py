@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+class UpdateModuleOutputEvent(Event):
+    """
+    Update.module.output event
+    """
+
+    EVENT_NAME = 'update.module.output'
+    EVENT_PROPAGATE = False
+    EVENT_PARAMS = ['module', 'lines']
+
+    def __init__(self, params):
+        """ 
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
+
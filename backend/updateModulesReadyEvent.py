@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+class UpdateModulesReadyEvent(Event):
+    """
+    Update.modules.ready event
+    """
+
+    EVENT_NAME = 'update.modules.ready'
+    EVENT_PROPAGATE = False
+    EVENT_PARAMS = ['revision', 'runid']
+
+    def __init__(self, params):
+        """ 
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from contextlib import contextmanager
+
+class UpdateMetrics():
+    """
+    Update process metrics: phases durations measured with monotonic clock, counters and failures
+    by type. Metrics are kept in memory since module start and can be exported in Prometheus text
+    format (for node exporter textfile collector).
+
+    Phases:
+        - resolve: main action plan computation (dependencies resolution)
+        - inventory: inventory round trips
+        - download: packages download (package cache staging and Cleep package)
+        - install: install/update/uninstall processes
+        - callback: end of process handling
+        - restart: delay before Cleep restart
+    """
+
+    PHASES = ('resolve', 'inventory', 'download', 'install', 'callback', 'restart')
+    COUNTERS = {
+        'cleepchecks': ('cleep_checks_total', 'Number of Cleep updates checks run'),
+        'moduleschecks': ('modules_checks_total', 'Number of modules updates checks run'),
+        'cachehits': ('cache_hits_total', 'Number of modules.json and package cache hits'),
+        'cachemisses': ('cache_misses_total', 'Number of modules.json and package cache misses'),
+        'downloadedbytes': ('downloaded_bytes_total', 'Number of bytes downloaded'),
+    }
+    PREFIX = 'cleep_update'
+
+    def __init__(self, cleep_filesystem):
+        """
+        Constructor
+
+        Args:
+            cleep_filesystem (CleepFilesystem): CleepFilesystem instance
+        """
+        self.cleep_filesystem = cleep_filesystem
+        self.__lock = threading.Lock()
+        self.__since = int(time.time())
+        self.__phases = {
+            phase: {'count': 0, 'total': 0.0, 'max': 0.0, 'last': None}
+            for phase in self.PHASES
+        }
+        self.__counters = {counter: 0 for counter in self.COUNTERS}
+        self.__failures = {}
+
+    def add_duration(self, phase, duration):
+        """
+        Add phase duration
+
+        Args:
+            phase (string): phase name (see PHASES)
+            duration (float): phase duration (seconds)
+        """
+        if duration is None:
+            return
+
+        with self.__lock:
+            stats = self.__phases[phase]
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['last'] = duration
+
+    @contextmanager
+    def timer(self, phase):
+        """
+        Context manager measuring phase duration. Duration is added even if an exception occurs
+
+        Args:
+            phase (string): phase name (see PHASES)
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_duration(phase, time.monotonic() - start)
+
+    def increment(self, counter, value=1):
+        """
+        Increment counter
+
+        Args:
+            counter (string): counter name (see COUNTERS)
+            value (int): value to add
+        """
+        with self.__lock:
+            self.__counters[counter] += value
+
+    def add_failure(self, failure_type):
+        """
+        Count failure
+
+        Args:
+            failure_type (string): failure type (install, update, uninstall, cleep, inventory...)
+        """
+        with self.__lock:
+            self.__failures[failure_type] = self.__failures.get(failure_type, 0) + 1
+
+    def get_metrics(self, extra_counters=None):
+        """
+        Return metrics
+
+        Args:
+            extra_counters (dict): values to add to counters (counters maintained outside metrics)
+
+        Returns:
+            dict: metrics::
+
+                {
+                    since (int): metrics start timestamp
+                    phases (dict): phases durations::
+
+                        {
+                            phase (string): {
+                                count (int): number of measures
+                                total (float): total duration (seconds)
+                                max (float): longest duration (seconds)
+                                last (float): last duration (seconds), None if never measured
+                                average (float): average duration (seconds), None if never measured
+                            },
+                            ...
+                        }
+
+                    counters (dict): counters (counter name => value)
+                    failures (dict): failures by type (failure type => count)
+                }
+
+        """
+        with self.__lock:
+            phases = {}
+            for phase, stats in self.__phases.items():
+                phases[phase] = dict(stats)
+                phases[phase]['average'] = stats['total'] / stats['count'] if stats['count'] else None
+            counters = dict(self.__counters)
+            failures = dict(self.__failures)
+
+        for counter, value in (extra_counters or {}).items():
+            counters[counter] = counters.get(counter, 0) + value
+
+        return {
+            'since': self.__since,
+            'phases': phases,
+            'counters': counters,
+            'failures': failures,
+        }
+
+    def to_prometheus(self, extra_counters=None):
+        """
+        Return metrics in Prometheus text format
+
+        Args:
+            extra_counters (dict): values to add to counters (see get_metrics)
+
+        Returns:
+            string: metrics
+        """
+        metrics = self.get_metrics(extra_counters)
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            lines.append('# HELP %s_%s %s' % (self.PREFIX, name, help_text))
+            lines.append('# TYPE %s_%s %s' % (self.PREFIX, name, metric_type))
+            for labels, value in samples:
+                lines.append('%s_%s%s %s' % (self.PREFIX, name, labels, repr(float(value))))
+
+        phases = [(phase, metrics['phases'][phase]) for phase in self.PHASES]
+        add_metric('phase_runs_total', 'counter', 'Number of measured update phases', [
+            ('{phase="%s"}' % phase, stats['count']) for phase, stats in phases
+        ])
+        add_metric('phase_duration_seconds_total', 'counter', 'Total duration of update phases', [
+            ('{phase="%s"}' % phase, stats['total']) for phase, stats in phases
+        ])
+        add_metric('phase_duration_seconds_max', 'gauge', 'Longest duration of update phases', [
+            ('{phase="%s"}' % phase, stats['max']) for phase, stats in phases
+        ])
+        add_metric('phase_last_duration_seconds', 'gauge', 'Last duration of update phases', [
+            ('{phase="%s"}' % phase, stats['last']) for phase, stats in phases if stats['last'] is not None
+        ])
+        for counter, (name, help_text) in sorted(self.COUNTERS.items()):
+            add_metric(name, 'counter', help_text, [('', metrics['counters'][counter])])
+        add_metric('failures_total', 'counter', 'Number of update failures by type', [
+            ('{type="%s"}' % failure_type, count) for failure_type, count in sorted(metrics['failures'].items())
+        ])
+        add_metric('metrics_start_timestamp_seconds', 'gauge', 'Metrics start timestamp', [('', metrics['since'])])
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, extra_counters=None):
+        """
+        Write metrics to Prometheus text file. File is replaced atomically to never expose
+        partial content to collector
+
+        Args:
+            path (string): text file path
+            extra_counters (dict): values to add to counters (see get_metrics)
+
+        Raises:
+            Exception if file can't be written
+        """
+        tmp_path = '%s.tmp' % path
+        fd = self.cleep_filesystem.open(tmp_path, 'w')
+        try:
+            fd.write(self.to_prometheus(extra_counters))
+        finally:
+            self.cleep_filesystem.close(fd)
+        if not self.cleep_filesystem.rename(tmp_path, path):
+            raise Exception('Unable to write metrics file "%s"' % path)
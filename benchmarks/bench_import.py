@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measure import time of update module and its share of Cleep startup imports.
+
+Each measure runs in a fresh python interpreter (nothing cached in sys.modules):
+
+    - cleep: import of Cleep core (baseline paid by every application)
+    - update: import of Cleep core then update module
+    - update (eager): same as update forcing import of lazily imported libraries, to show what
+      would be paid at startup without lazy imports
+
+Standard libraries only needed to check or download packages (http stack, gzip, mmap) that are
+loaded by update module import but not by Cleep core are also reported.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 10]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+LAZY_MODULES = [
+    'cleep.libs.configs.modulesjson',
+    'cleep.libs.configs.cleepconf',
+    'cleep.libs.internals.cleepgithub',
+    'cleep.libs.internals.installcleep',
+    'cleep.libs.internals.install',
+    'cleep.libs.internals.task',
+    'cleep.libs.internals.installmodule',
+]
+
+# standard libraries only needed to check or download packages, or read compressed history
+LAZY_STDLIB_MODULES = [
+    'http.client',
+    'ssl',
+    'email.parser',
+    'urllib.request',
+    'gzip',
+    'mmap',
+]
+
+SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import cleep.core
+core = time.perf_counter()
+core_modules = set(sys.modules)
+%(imports)s
+end = time.perf_counter()
+loaded = len([name for name in %(lazy)r if name in sys.modules])
+stdlib = [name for name in %(stdlib)r if name in sys.modules and name not in core_modules]
+print('%%f %%f %%d %%s' %% (core - start, end - start, loaded, ','.join(stdlib) or '-'))
+"""
+
+def measure(imports, runs):
+    """
+    Run import script in new interpreters
+
+    Args:
+        imports (string): python code executed after Cleep core import
+        runs (int): number of runs
+
+    Returns:
+        tuple: median core import duration, median total duration (seconds), loaded lazy modules count
+               and standard libraries loaded after Cleep core (list)
+    """
+    cores = []
+    totals = []
+    loaded = 0
+    stdlib = '-'
+    script = SCRIPT % {'imports': imports, 'lazy': LAZY_MODULES, 'stdlib': LAZY_STDLIB_MODULES}
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT_PATH)
+        core, total, loaded, stdlib = output.decode('utf-8').split()
+        cores.append(float(core))
+        totals.append(float(total))
+
+    stdlib = [] if stdlib == '-' else stdlib.split(',')
+    return statistics.median(cores), statistics.median(totals), int(loaded), stdlib
+
+def main():
+    parser = argparse.ArgumentParser(description='Update module import time benchmark')
+    parser.add_argument('--runs', type=int, default=10, help='number of runs per measure')
+    args = parser.parse_args()
+
+    eager_imports = '\n'.join(['import %s' % name for name in LAZY_MODULES])
+    measures = [
+        ('cleep', ''),
+        ('update', 'import backend.update'),
+        ('update (eager)', 'import backend.update\n%s' % eager_imports),
+    ]
+
+    print('%-16s %12s %12s %10s %14s  %s' % ('measure', 'total (ms)', 'update (ms)', 'share', 'lazy loaded', 'stdlib loaded'))
+    for name, imports in measures:
+        core, total, loaded, stdlib = measure(imports, args.runs)
+        update = max(total - core, 0.0)
+        share = update / total * 100.0 if total else 0.0
+        print('%-16s %12.1f %12.1f %9.1f%% %8d/%d  %d/%d %s' % (
+            name, total * 1000, update * 1000, share, loaded, len(LAZY_MODULES),
+            len(stdlib), len(LAZY_STDLIB_MODULES), ','.join(stdlib),
+        ))
+
+if __name__ == '__main__':
+    main()
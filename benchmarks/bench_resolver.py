@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Dependencies resolver benchmarks.
+
+Time install, update and uninstall plan computation (_install_main_module, _update_main_module and
+_uninstall_main_module) on synthetic catalogs of different sizes and shapes, and track peak memory
+with tracemalloc.
+
+Catalog shapes:
+    - chain: root depends on chains of modules (each module depends on next one)
+    - diamond: layers of modules, each module depends on two modules of next layer
+    - fanout: root depends directly on all other modules
+    - cycle: root depends on rings of modules (last module of a ring depends on first one)
+
+Usage (pytest-benchmark is used if installed, a simple timer otherwise):
+    python -m pytest benchmarks/bench_resolver.py -s [--benchmark-sort=name]
+
+Catalogs bigger than BENCH_RESOLVER_MAX_SIZE env variable (default 10000) are skipped:
+    BENCH_RESOLVER_MAX_SIZE=50000 python -m pytest benchmarks/bench_resolver.py -s
+"""
+
+import os
+import sys
+import math
+import time
+import logging
+import statistics
+import tracemalloc
+import pytest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.update import Update
+
+SIZES = [1000, 10000, 50000]
+SHAPES = ['chain', 'diamond', 'fanout', 'cycle']
+MAX_SIZE = int(os.environ.get('BENCH_RESOLVER_MAX_SIZE', 10000))
+# resolver is recursive, keep chains far from python recursion limit
+CHAIN_DEPTH = 200
+CYCLE_SIZE = 50
+ROOT = 'root'
+
+def make_catalog(size, shape):
+    """
+    Generate synthetic catalog
+
+    Args:
+        size (int): number of modules in catalog (including root module)
+        shape (string): catalog shape (see SHAPES)
+
+    Returns:
+        dict: modules dependencies (module name => list of dependencies names)
+    """
+    names = ['mod%05d' % index for index in range(size - 1)]
+    deps = {name: [] for name in names}
+
+    if shape == 'chain':
+        heads = names[::CHAIN_DEPTH]
+        for index, name in enumerate(names[:-1]):
+            if (index + 1) % CHAIN_DEPTH:
+                deps[name].append(names[index + 1])
+        deps[ROOT] = heads
+
+    elif shape == 'diamond':
+        width = max(int(math.sqrt(size)), 2)
+        layers = [names[index:index + width] for index in range(0, len(names), width)]
+        for layer, next_layer in zip(layers[:-1], layers[1:]):
+            for index, name in enumerate(layer):
+                deps[name] = sorted(set([next_layer[index % len(next_layer)], next_layer[(index + 1) % len(next_layer)]]))
+        deps[ROOT] = list(layers[0])
+
+    elif shape == 'fanout':
+        deps[ROOT] = list(names)
+
+    elif shape == 'cycle':
+        rings = [names[index:index + CYCLE_SIZE] for index in range(0, len(names), CYCLE_SIZE)]
+        for ring in rings:
+            for index, name in enumerate(ring):
+                deps[name].append(ring[(index + 1) % len(ring)])
+        deps[ROOT] = [ring[0] for ring in rings]
+
+    else:
+        raise ValueError('Invalid shape "%s"' % shape)
+
+    return deps
+
+def make_modules_infos(deps, version):
+    """
+    Build modules infos (modules.json or inventory format) from catalog
+
+    Args:
+        deps (dict): catalog (see make_catalog)
+        version (string): modules version
+
+    Returns:
+        dict: modules infos (module name => infos)
+    """
+    infos = {name: {'version': version, 'deps': module_deps, 'loadedby': []} for name, module_deps in deps.items()}
+    for name, module_deps in deps.items():
+        for dependency_name in module_deps:
+            infos[dependency_name]['loadedby'].append(name)
+
+    return infos
+
+def make_update(deps):
+    """
+    Create Update instance planning actions on specified catalog.
+
+    Update is not started (no Cleep bootstrap): only members used by plan computation are set.
+    Half of catalog modules are installed in older version, so install plans mix installs and
+    updates and update plans update installed dependencies.
+
+    Args:
+        deps (dict): catalog (see make_catalog)
+
+    Returns:
+        Update: Update instance
+    """
+    modules_json = make_modules_infos(deps, '2.0.0')
+    inventory = make_modules_infos(deps, '1.0.0')
+    installed = frozenset([name for index, name in enumerate(sorted(deps.keys())) if index % 2 == 0] + [ROOT])
+
+    update = Update.__new__(Update)
+    update.logger = logging.getLogger('BenchUpdate')
+    update.logger.setLevel(logging.WARNING)
+    if not hasattr(update.logger, 'trace'):
+        update.logger.trace = update.logger.debug
+    update._get_installed_modules_names = lambda: installed
+    update._get_module_infos_from_modules_json = modules_json.get
+    update._get_module_infos_from_inventory = inventory.get
+    update._Update__sub_actions = []
+
+    return update
+
+class SimpleBenchmark():
+    """
+    Minimal pytest-benchmark fixture replacement used when pytest-benchmark is not installed
+    """
+
+    ROUNDS = 5
+
+    def __init__(self, name):
+        self.name = name
+        self.extra_info = {}
+
+    def __call__(self, function, *args, **kwargs):
+        durations = []
+        result = None
+        for _ in range(self.ROUNDS):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            durations.append(time.perf_counter() - start)
+
+        print('\n%-50s min=%.2fms median=%.2fms max=%.2fms %s' % (
+            self.name,
+            min(durations) * 1000,
+            statistics.median(durations) * 1000,
+            max(durations) * 1000,
+            ' '.join(['%s=%s' % (key, value) for key, value in sorted(self.extra_info.items())]),
+        ))
+        return result
+
+try:
+    import pytest_benchmark # pylint: disable=unused-import
+except ImportError:
+    @pytest.fixture
+    def benchmark(request):
+        return SimpleBenchmark(request.node.name)
+
+def measure_peak_memory(function):
+    """
+    Return peak memory allocated during function execution
+
+    Args:
+        function (function): function to execute
+
+    Returns:
+        int: peak allocated memory (bytes)
+    """
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+def run_plan(update, action):
+    """
+    Compute plan of specified action on catalog root module
+
+    Args:
+        update (Update): Update instance (see make_update)
+        action (string): action (install, update, uninstall)
+
+    Returns:
+        list: postponed sub actions
+    """
+    update._Update__sub_actions = []
+    if action == Update.ACTION_MODULE_INSTALL:
+        update._install_main_module(ROOT)
+    elif action == Update.ACTION_MODULE_UPDATE:
+        update._update_main_module(ROOT)
+    else:
+        update._uninstall_main_module(ROOT, {'force': False})
+
+    return update._Update__sub_actions
+
+@pytest.fixture(scope='module', params=SIZES, ids=lambda size: '%dmods' % size)
+def size(request):
+    if request.param > MAX_SIZE:
+        pytest.skip('Catalog size %d bigger than BENCH_RESOLVER_MAX_SIZE' % request.param)
+    return request.param
+
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('action', [Update.ACTION_MODULE_INSTALL, Update.ACTION_MODULE_UPDATE, Update.ACTION_MODULE_UNINSTALL])
+def test_plan(benchmark, size, shape, action):
+    update = make_update(make_catalog(size, shape))
+
+    benchmark.extra_info['peakmemory'] = measure_peak_memory(lambda: run_plan(update, action))
+    sub_actions = benchmark(run_plan, update, action)
+
+    # every catalog module is reachable from root
+    assert len(sub_actions) > 0
+    if action != Update.ACTION_MODULE_UNINSTALL:
+        assert len(sub_actions) == size
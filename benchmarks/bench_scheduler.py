@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measure how fast main and sub actions are processed by update module scheduler.
+
+Install processor is replaced by a fake one with configurable latency distribution, failure rate
+and output volume, so only scheduler overhead is measured (tasks intervals, plan computation,
+callbacks, progress and events handling). Scenarios drive public commands on a started module:
+
+    - install: install_module on not installed modules
+    - update: update_modules on updatable modules
+    - uninstall: uninstall_module on installed modules
+
+Each main module depends on shared libraries already installed and up to date, so every main
+action runs a single sub action.
+
+Reported values:
+    - actions/min: processed main actions per minute
+    - gap: delay between end of a process and start of the next one (dispatch gap)
+    - latency: simulated process duration
+    - peak memory: tracemalloc peak during scenario
+
+Usage:
+    python benchmarks/bench_scheduler.py [--scenario all] [--actions 50] [--latency exponential]
+                                         [--latency-mean 0.05] [--failure-rate 0.0] [--output-lines 20]
+                                         [--interval 1.0]
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import logging
+import argparse
+import unittest
+import threading
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import backend.update
+from backend.update import Update
+from cleep.libs.tests import session
+from mock import patch
+
+SCENARIOS = ['install', 'update', 'uninstall']
+LATENCIES = ['constant', 'uniform', 'exponential', 'lognormal']
+LIBRARIES_COUNT = 5
+SCENARIO_TIMEOUT = 3600.0
+
+class FakeInstall():
+    """
+    Install processor replacement simulating processes in a thread
+    """
+
+    # set by configure
+    latency = 'exponential'
+    latency_mean = 0.05
+    failure_rate = 0.0
+    output_lines = 20
+    output_chunks = 4
+    rng = random.Random()
+    # processes stats (start, end, failed)
+    processes = []
+    processes_lock = threading.Lock()
+
+    def __init__(self, cleep_filesystem, crash_report, status_callback, *args, **kwargs):
+        self.status_callback = status_callback
+
+    @classmethod
+    def configure(cls, latency, latency_mean, failure_rate, output_lines, seed):
+        """
+        Configure simulated processes
+
+        Args:
+            latency (string): latency distribution (see LATENCIES)
+            latency_mean (float): mean process duration (seconds)
+            failure_rate (float): ratio of failed processes (0-1)
+            output_lines (int): number of stdout lines per process
+            seed (int): random seed
+        """
+        real_install = backend.update.Install.resolve()
+        for name in dir(real_install):
+            if name.startswith('STATUS_'):
+                setattr(cls, name, getattr(real_install, name))
+        cls.latency = latency
+        cls.latency_mean = latency_mean
+        cls.failure_rate = failure_rate
+        cls.output_lines = output_lines
+        cls.rng = random.Random(seed)
+        cls.processes = []
+
+    @classmethod
+    def get_latency(cls):
+        """
+        Return random process duration according to configured distribution
+
+        Returns:
+            float: duration (seconds)
+        """
+        if cls.latency == 'constant' or cls.latency_mean <= 0:
+            return max(cls.latency_mean, 0.0)
+        if cls.latency == 'uniform':
+            return cls.rng.uniform(0, 2 * cls.latency_mean)
+        if cls.latency == 'exponential':
+            return cls.rng.expovariate(1.0 / cls.latency_mean)
+
+        # lognormal with sigma=1 and requested mean (long tail of slow processes)
+        return cls.rng.lognormvariate(math.log(cls.latency_mean) - 0.5, 1.0)
+
+    def install_module(self, module_name, module_infos):
+        self._start(module_name)
+
+    def update_module(self, module_name, module_infos):
+        self._start(module_name)
+
+    def uninstall_module(self, module_name, module_infos, force=False):
+        self._start(module_name)
+
+    def _start(self, module_name):
+        latency = self.get_latency()
+        failed = self.rng.random() < self.failure_rate
+        thread = threading.Thread(target=self._run, args=(module_name, time.perf_counter(), latency, failed))
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, module_name, start, latency, failed):
+        # like real Install, each status holds whole outputs since process start
+        lines_per_chunk = max(self.output_lines // self.output_chunks, 1)
+        stdout = []
+        for _ in range(self.output_chunks):
+            time.sleep(latency / self.output_chunks)
+            stdout.extend(['%s output line %d' % (module_name, len(stdout) + index) for index in range(lines_per_chunk)])
+            self.status_callback({
+                'process': [],
+                'stdout': list(stdout),
+                'stderr': [],
+                'status': self.STATUS_PROCESSING,
+                'module': module_name,
+            })
+
+        with self.processes_lock:
+            self.processes.append((start, time.perf_counter(), failed))
+        self.status_callback({
+            'process': ['Simulated process failure'] if failed else [],
+            'stdout': list(stdout),
+            'stderr': ['error'] if failed else [],
+            'status': self.STATUS_ERROR if failed else self.STATUS_DONE,
+            'module': module_name,
+        })
+
+def make_catalog(actions):
+    """
+    Generate catalog of main modules depending on shared libraries
+
+    Args:
+        actions (int): number of main modules
+
+    Returns:
+        tuple: modules.json infos (dict), inventory infos (dict)
+    """
+    libraries = ['lib%02d' % index for index in range(LIBRARIES_COUNT)]
+    modules_json = {}
+    inventory = {}
+    for library in libraries:
+        modules_json[library] = {'version': '1.0.0', 'deps': [], 'download': 'https://dummy/%s.zip' % library, 'size': 1024}
+        inventory[library] = {'version': '1.0.0', 'deps': [], 'loadedby': []}
+    for index in range(actions):
+        deps = [libraries[index % LIBRARIES_COUNT], libraries[(index + 1) % LIBRARIES_COUNT]]
+        for name, installed_version in (('new%05d' % index, None), ('mod%05d' % index, '1.0.0')):
+            modules_json[name] = {'version': '2.0.0', 'deps': deps, 'download': 'https://dummy/%s.zip' % name, 'size': 1024}
+            if installed_version:
+                inventory[name] = {'version': installed_version, 'deps': deps, 'loadedby': []}
+                for library in deps:
+                    inventory[library]['loadedby'].append(name)
+
+    return modules_json, inventory
+
+def make_module(test_session, actions):
+    """
+    Create and start update module instance on generated catalog
+
+    Args:
+        test_session (TestSession): test session
+        actions (int): number of main modules
+
+    Returns:
+        Update: started Update instance
+    """
+    modules_json, inventory = make_catalog(actions)
+    module = test_session.setup(Update)
+    test_session.add_mock_command(test_session.make_mock_command('get_modules', data={}))
+    test_session.start_module(module)
+    module._modules_ready.wait(5.0)
+
+    module.package_cache.set_max_size(0)
+    module._get_module_infos_from_modules_json = modules_json.get
+    module._get_module_infos_from_inventory = inventory.get
+    modules_updates = {}
+    for name, infos in inventory.items():
+        updatable = name.startswith('mod')
+        modules_updates[name] = {
+            'name': name,
+            'version': infos['version'],
+            'updatable': updatable,
+            'processing': False,
+            'pending': False,
+            'update': {
+                'progress': 0,
+                'eta': None,
+                'failed': False,
+                'version': modules_json[name]['version'] if updatable else None,
+                'changelog': None,
+            },
+        }
+    module._modules_updates.load(modules_updates)
+
+    return module
+
+def drive(module, scenario, actions):
+    """
+    Queue scenario main actions using module commands
+
+    Args:
+        module (Update): Update instance
+        scenario (string): scenario name (see SCENARIOS)
+        actions (int): number of main actions
+    """
+    if scenario == 'install':
+        for index in range(actions):
+            module.install_module('new%05d' % index)
+    elif scenario == 'update':
+        module.update_modules()
+    elif scenario == 'uninstall':
+        for index in range(actions):
+            module.uninstall_module('mod%05d' % index)
+
+def wait_end(module, timeout):
+    """
+    Wait until all main actions are processed
+
+    Args:
+        module (Update): Update instance
+        timeout (float): max waiting duration (seconds)
+
+    Returns:
+        bool: True if all actions processed, False if timeout occured
+    """
+    end = time.time() + timeout
+    while time.time() < end:
+        if module._Update__main_actions_task is None and module._Update__processor is None:
+            return True
+        time.sleep(0.01)
+
+    return False
+
+def percentile(values, percent):
+    """
+    Return nearest rank percentile
+
+    Args:
+        values (list): values
+        percent (int): percentile (0-100)
+
+    Returns:
+        float: percentile value or 0.0 if no value
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(int(math.ceil(percent / 100.0 * len(values))) - 1, 0)]
+
+def run_scenario(scenario, args):
+    """
+    Run scenario on new module instance
+
+    Args:
+        scenario (string): scenario name (see SCENARIOS)
+        args (Namespace): command line arguments
+
+    Returns:
+        dict: scenario results
+    """
+    test_session = session.TestSession(unittest.TestCase())
+    try:
+        FakeInstall.configure(args.latency, args.latency_mean, args.failure_rate, args.output_lines, args.seed)
+        with patch('backend.update.Install', FakeInstall), \
+                patch.object(Update, 'MAIN_ACTIONS_TASK_INTERVAL', args.interval), \
+                patch.object(Update, 'SUB_ACTIONS_TASK_INTERVAL', args.interval):
+            module = make_module(test_session, args.actions)
+
+            if args.memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            drive(module, scenario, args.actions)
+            completed = wait_end(module, SCENARIO_TIMEOUT)
+            duration = time.perf_counter() - start
+            peak = 0
+            if args.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+    finally:
+        test_session.clean()
+
+    processes = sorted(FakeInstall.processes)
+    gaps = [next_start - end for (_, end, _), (next_start, _, _) in zip(processes[:-1], processes[1:])]
+    latencies = [end - process_start for process_start, end, _ in processes]
+    return {
+        'scenario': scenario,
+        'completed': completed,
+        'actions': len(processes),
+        'failed': len([process for process in processes if process[2]]),
+        'duration': duration,
+        'actionspermin': len(processes) / duration * 60.0 if duration else 0.0,
+        'gapp50': percentile(gaps, 50),
+        'gapp95': percentile(gaps, 95),
+        'gapmax': max(gaps) if gaps else 0.0,
+        'latencyp50': percentile(latencies, 50),
+        'peakmemory': peak,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Update module scheduler throughput benchmark')
+    parser.add_argument('--scenario', choices=SCENARIOS + ['all'], default='all', help='scenario to run')
+    parser.add_argument('--actions', type=int, default=50, help='number of main actions per scenario')
+    parser.add_argument('--latency', choices=LATENCIES, default='exponential', help='process duration distribution')
+    parser.add_argument('--latency-mean', type=float, default=0.05, help='mean process duration (seconds)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='ratio of failed processes (0-1)')
+    parser.add_argument('--output-lines', type=int, default=20, help='number of output lines per process')
+    parser.add_argument('--interval', type=float, default=Update.MAIN_ACTIONS_TASK_INTERVAL, help='actions tasks interval (seconds)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='disable peak memory tracking')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.FATAL)
+    scenarios = SCENARIOS if args.scenario == 'all' else [args.scenario]
+
+    print('%-10s %8s %7s %12s %11s %11s %11s %13s %12s' % (
+        'scenario', 'actions', 'failed', 'actions/min', 'gap p50 ms', 'gap p95 ms', 'gap max ms', 'latency ms', 'peak (KiB)'
+    ))
+    for scenario in scenarios:
+        result = run_scenario(scenario, args)
+        print('%-10s %8d %7d %12.1f %11.1f %11.1f %11.1f %13.1f %12d%s' % (
+            result['scenario'],
+            result['actions'],
+            result['failed'],
+            result['actionspermin'],
+            result['gapp50'] * 1000,
+            result['gapp95'] * 1000,
+            result['gapmax'] * 1000,
+            result['latencyp50'] * 1000,
+            result['peakmemory'] // 1024,
+            '' if result['completed'] else ' (timeout)',
+        ))
+
+if __name__ == '__main__':
+    main()
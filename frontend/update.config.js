@@ -16,6 +16,7 @@ function($rootScope, cleepService, updateService, $location, toast, $mdDialog, m
         self.modulesUpdateEnabled = false;
         self.cleepUpdates = null;
         self.modulesLogs = null;
+        self.logsPageSize = 65536;
 
         /**
          * Set automatic update
@@ -101,12 +102,32 @@ function($rootScope, cleepService, updateService, $location, toast, $mdDialog, m
         self.showLogsDialog = function(moduleName, ev) {
             $mdDialog.show({
                 controller: function($mdDialog) {
-                    this.logs = '';
-                    this.logsBlockui = blockUI.instances.get('logs-blockui');
-                    this.logsBlockui.start();
-                    this.closeDialog = function() {
+                    var ctl = this;
+                    ctl.logs = '';
+                    ctl.nextOffset = 0;
+                    ctl.size = 0;
+                    ctl.logsBlockui = blockUI.instances.get('logs-blockui');
+                    ctl.closeDialog = function() {
                         $mdDialog.hide();
-                    }
+                    };
+                    ctl.hasMoreLogs = function() {
+                        return ctl.nextOffset < ctl.size;
+                    };
+                    ctl.loadLogs = function() {
+                        ctl.logsBlockui.start();
+                        self.updateService.getLogsPage(moduleName, ctl.nextOffset, self.logsPageSize)
+                            .then(function(resp) {
+                                if (resp.error) {
+                                    return;
+                                }
+                                ctl.logs += resp.data.content;
+                                ctl.nextOffset = resp.data.nextoffset;
+                                ctl.size = resp.data.size;
+                            })
+                            .finally(function() {
+                                ctl.logsBlockui.stop();
+                            });
+                    };
                 },
                 controllerAs: 'logsCtl',
                 templateUrl: 'logs.dialog.html',
@@ -115,13 +136,44 @@ function($rootScope, cleepService, updateService, $location, toast, $mdDialog, m
                 clickOutsideToClose: true,
                 fullscreen: true,
                 onShowing: function(scope, element, options, controller) {
-                    self.updateService.getLogs(moduleName)
-                        .then(function(resp) {
-                            controller.logs = resp.data;
-                        })
-                        .finally(function() {
-                            controller.logsBlockui.stop();;
-                        });
+                    controller.loadLogs();
+                },
+            })
+            .then(function() {}, function() {});
+        };
+
+        /**
+         * Show app process output dialog. Output is seeded with lines already sent by backend
+         * and then follows update.module.output events
+         */
+        self.showOutputDialog = function(moduleName, ev) {
+            $mdDialog.show({
+                controller: function($mdDialog) {
+                    var ctl = this;
+                    ctl.moduleName = moduleName;
+                    ctl.outputBlockui = blockUI.instances.get('output-blockui');
+                    ctl.closeDialog = function() {
+                        $mdDialog.hide();
+                    };
+                    ctl.getLines = function() {
+                        return self.updateService.modulesOutput[moduleName] || [];
+                    };
+                    ctl.loadOutput = function() {
+                        ctl.outputBlockui.start();
+                        self.updateService.loadModuleOutput(moduleName)
+                            .finally(function() {
+                                ctl.outputBlockui.stop();
+                            });
+                    };
+                },
+                controllerAs: 'outputCtl',
+                templateUrl: 'output.dialog.html',
+                parent: angular.element(document.body),
+                targetEvent: ev,
+                clickOutsideToClose: true,
+                fullscreen: true,
+                onShowing: function(scope, element, options, controller) {
+                    controller.loadOutput();
                 },
             })
             .then(function() {}, function() {});
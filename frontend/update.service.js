@@ -9,9 +9,27 @@ function($q, $rootScope, rpcService) {
 
     var self = this;
     self.cleepUpdateStatus = 0;
-
-    self.getModulesUpdates = function() {
-        return rpcService.sendCommand('get_modules_updates', 'update');
+    self.modulesOutput = {};
+    self.modulesSyncing = false;
+    // modules updates revisions restart on each backend run
+    self.modulesUpdatesRunId = null;
+    self.moduleOutputMaxLines = 200;
+
+    self.getModulesUpdates = function(sinceRevision) {
+        var params = undefined;
+        if (sinceRevision !== undefined) {
+            params = {'since_revision': sinceRevision, 'run_id': self.modulesUpdatesRunId};
+        }
+        return rpcService.sendCommand('get_modules_updates', 'update', params)
+            .then(function(resp) {
+                if (resp.data && resp.data.syncing !== undefined) {
+                    self.modulesSyncing = resp.data.syncing;
+                }
+                if (resp.data && resp.data.runid !== undefined) {
+                    self.modulesUpdatesRunId = resp.data.runid;
+                }
+                return resp;
+            });
     };
 
     self.getCleepUpdates = function() {
@@ -69,13 +87,59 @@ function($q, $rootScope, rpcService) {
         });
     };
 
+    self.getLogsPage = function(moduleName, offset, limit) {
+        if (!moduleName) {
+            moduleName = 'cleep';
+        }
+        return rpcService.sendCommand('get_logs', 'update', {
+            'module_name': moduleName,
+            'offset': offset,
+            'limit': limit,
+        });
+    };
+
     self.getModulesLogs = function() {
         return rpcService.sendCommand('get_modules_logs', 'update');
     };
 
+    self.getModuleOutput = function(moduleName) {
+        return rpcService.sendCommand('get_module_output', 'update', {
+            'module_name': moduleName,
+        });
+    };
+
+    /**
+     * Seed module output with lines buffered by backend (lines sent before ui subscribed).
+     * Next lines are appended by update.module.output events
+     */
+    self.loadModuleOutput = function(moduleName) {
+        return self.getModuleOutput(moduleName)
+            .then(function(resp) {
+                if (!resp.error) {
+                    self.modulesOutput[moduleName] = resp.data;
+                }
+                return resp;
+            });
+    };
+
     $rootScope.$on('update.cleep.update', function(event, uuid, params) {
         self.cleepUpdateStatus = params.status;
     });
 
+    $rootScope.$on('update.modules.ready', function(event, uuid, params) {
+        self.modulesSyncing = false;
+    });
+
+    $rootScope.$on('update.module.output', function(event, uuid, params) {
+        if (!self.modulesOutput[params.module]) {
+            self.modulesOutput[params.module] = [];
+        }
+        var output = self.modulesOutput[params.module];
+        Array.prototype.push.apply(output, params.lines);
+        if (output.length > self.moduleOutputMaxLines) {
+            output.splice(0, output.length - self.moduleOutputMaxLines);
+        }
+    });
+
 }]); 
 
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import json
+
+class FakeFilesystem():
+    """
+    Minimal CleepFilesystem working on real filesystem
+    """
+    def open(self, path, mode, encoding=None):
+        return open(path, mode, encoding=encoding)
+
+    def close(self, fd):
+        fd.close()
+
+    def mkdir(self, path, recursive=False):
+        os.makedirs(path, exist_ok=True)
+        return True
+
+    def rename(self, src, dst):
+        os.replace(src, dst)
+        return True
+
+    def rm(self, path):
+        os.remove(path)
+        return True
+
+    def read_json(self, path, encoding=None):
+        with open(path) as fd:
+            return json.load(fd)
+
+    def write_json(self, path, data, encoding=None):
+        with open(path, 'w') as fd:
+            json.dump(data, fd)
+        return True
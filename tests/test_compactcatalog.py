@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('../')
+from backend.compactcatalog import CompactCatalog
+
+MODULES_JSON = {
+    'list': {
+        'system': {'author': 'Cleep', 'certified': False, 'country': '', 'deps': [], 'note': -1, 'price': 0, 'rating': 4.5, 'tags': ['troubleshoot', 'update'], 'urls': {'bugs': 'https://github.com/tangb/cleepmod-system/issues', 'help': None}, 'version': '1.1.0'},
+        'actions': {'author': 'Cleep', 'certified': True, 'country': None, 'deps': ['system'], 'note': -1, 'price': 0, 'tags': ['action', 'script'], 'urls': {'bugs': 'https://github.com/tangb/cleepmod-actions/issues', 'help': None}, 'version': '1.0.1'},
+        'écran': {'author': 'Cleep', 'deps': [], 'description': 'Unicode module', 'version': '0.0.1'},
+    },
+    'update': 1571561176,
+}
+
+class TestsCompactCatalog(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.catalog_path = os.path.join(self.path, 'catalog.bin')
+        self.catalog = CompactCatalog.build(self.catalog_path, MODULES_JSON)
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.path)
+
+    def test_get(self):
+        for module_name, module in MODULES_JSON['list'].items():
+            self.assertEqual(self.catalog.get(module_name), module)
+
+    def test_get_unknown_module(self):
+        self.assertIsNone(self.catalog.get('dummy'))
+        self.assertIsNone(self.catalog.get(''))
+
+    def test_contains(self):
+        self.assertTrue('system' in self.catalog)
+        self.assertFalse('dummy' in self.catalog)
+
+    def test_len_and_names(self):
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(self.catalog.names(), sorted(MODULES_JSON['list'].keys()))
+
+    def test_update(self):
+        self.assertEqual(self.catalog.update, 1571561176)
+
+    def test_open_existing_file(self):
+        catalog = CompactCatalog(self.catalog_path)
+        try:
+            self.assertEqual(catalog.get('actions'), MODULES_JSON['list']['actions'])
+        finally:
+            catalog.close()
+
+    def test_strings_are_interned(self):
+        size = os.path.getsize(self.catalog_path)
+        modules_json = {'list': {}, 'update': 0}
+        for index in range(100):
+            modules_json['list']['module%d' % index] = MODULES_JSON['list']['system']
+        catalog = CompactCatalog.build(self.catalog_path, modules_json)
+        try:
+            # each additional entry only costs its name, index entry and references
+            self.assertLess(os.path.getsize(self.catalog_path), size + 100 * 200)
+        finally:
+            catalog.close()
+
+    def test_empty_catalog(self):
+        catalog = CompactCatalog.build(self.catalog_path, {'list': {}, 'update': None})
+        try:
+            self.assertEqual(len(catalog), 0)
+            self.assertIsNone(catalog.get('system'))
+        finally:
+            catalog.close()
+
+    def test_invalid_file(self):
+        invalid_path = os.path.join(self.path, 'invalid.bin')
+        with open(invalid_path, 'wb') as fd:
+            fd.write(b'\x00' * 64)
+
+        with self.assertRaises(Exception) as cm:
+            CompactCatalog(invalid_path)
+        self.assertEqual(str(cm.exception), 'Invalid compact catalog file "%s"' % invalid_path)
+
+    def test_build_unsupported_value(self):
+        with self.assertRaises(Exception) as cm:
+            CompactCatalog.build(os.path.join(self.path, 'other.bin'), {'list': {'dummy': {'value': object()}}})
+        self.assertEqual(str(cm.exception), 'Unsupported value type "object" in modules catalog')
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_compactcatalog.py; coverage report -m -i
+    unittest.main()
+
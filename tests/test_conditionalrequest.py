@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import urllib.error
+sys.path.append('../')
+from backend.conditionalrequest import ConditionalRequest
+from mock import Mock, MagicMock, patch
+
+URL = 'https://dummy.com/modules.json'
+
+def make_response(etag=None, lastmodified=None):
+    resp = MagicMock()
+    resp.__enter__.return_value = resp
+    resp.headers = {}
+    if etag:
+        resp.headers['ETag'] = etag
+    if lastmodified:
+        resp.headers['Last-Modified'] = lastmodified
+    return resp
+
+class TestsConditionalRequest(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+
+    def test_is_modified_first_check(self):
+        request = ConditionalRequest(URL)
+
+        with patch('urllib.request.urlopen', Mock(return_value=make_response('"123"'))) as mock_urlopen:
+            self.assertTrue(request.is_modified())
+
+        req = mock_urlopen.call_args[0][0]
+        self.assertEqual(req.get_method(), 'HEAD')
+        self.assertFalse(req.has_header('If-none-match'))
+
+    def test_commit(self):
+        request = ConditionalRequest(URL)
+
+        with patch('urllib.request.urlopen', Mock(return_value=make_response('"123"', 'Mon, 01 Jan 2020 00:00:00 GMT'))):
+            request.is_modified()
+        self.assertEqual(request.get_validators(), {})
+
+        request.commit()
+        self.assertEqual(request.get_validators(), {'etag': '"123"', 'lastmodified': 'Mon, 01 Jan 2020 00:00:00 GMT'})
+
+    def test_is_modified_sends_validators(self):
+        request = ConditionalRequest(URL, {'etag': '"123"', 'lastmodified': 'Mon, 01 Jan 2020 00:00:00 GMT'})
+
+        with patch('urllib.request.urlopen', Mock(return_value=make_response('"456"'))) as mock_urlopen:
+            self.assertTrue(request.is_modified())
+
+        req = mock_urlopen.call_args[0][0]
+        self.assertEqual(req.get_header('If-none-match'), '"123"')
+        self.assertEqual(req.get_header('If-modified-since'), 'Mon, 01 Jan 2020 00:00:00 GMT')
+
+    def test_is_modified_not_modified(self):
+        request = ConditionalRequest(URL, {'etag': '"123"'})
+        error = urllib.error.HTTPError(URL, 304, 'Not Modified', {}, None)
+
+        with patch('urllib.request.urlopen', Mock(side_effect=error)):
+            self.assertFalse(request.is_modified())
+
+    def test_is_modified_same_etag(self):
+        request = ConditionalRequest(URL, {'etag': '"123"'})
+
+        with patch('urllib.request.urlopen', Mock(return_value=make_response('"123"'))):
+            self.assertFalse(request.is_modified())
+
+    def test_is_modified_request_failed(self):
+        request = ConditionalRequest(URL, {'etag': '"123"'})
+        error = urllib.error.HTTPError(URL, 500, 'Internal error', {}, None)
+
+        with patch('urllib.request.urlopen', Mock(side_effect=error)):
+            self.assertTrue(request.is_modified())
+        with patch('urllib.request.urlopen', Mock(side_effect=Exception('Test exception'))):
+            self.assertTrue(request.is_modified())
+
+        request.commit()
+        self.assertEqual(request.get_validators(), {'etag': '"123"'})
+
+    def test_reset(self):
+        request = ConditionalRequest(URL, {'etag': '"123"'})
+
+        request.reset()
+
+        self.assertEqual(request.get_validators(), {})
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_conditionalrequest.py; coverage report -m -i
+    unittest.main()
+
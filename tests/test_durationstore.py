@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.durationstore import DurationStore
+from mock import Mock, patch
+
+class TestsDurationStore(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.durations_path = os.path.join(self.path, 'durations.json')
+        self.store = DurationStore(FakeFilesystem(), self.durations_path, max_records=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    @patch('backend.durationstore.time')
+    def test_record(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.store.record('install', 'system', '1.0.0', {'resolve': 0.5, 'download': 2.0, 'install': 10.0, 'callback': 0.25})
+
+        self.assertEqual(self.store.get_records('install', 'system'), [{
+            'timestamp': 1000,
+            'version': '1.0.0',
+            'duration': 12.75,
+            'phases': {'resolve': 0.5, 'download': 2.0, 'install': 10.0, 'callback': 0.25},
+        }])
+        with open(self.durations_path) as fd:
+            self.assertEqual(json.load(fd), {'install:system': [[1000, '1.0.0', 0.5, 2.0, 10.0, 0.25]]})
+
+    def test_record_missing_phases(self):
+        self.store.record('update', 'cleep', '0.0.20', {'install': 30.0, 'download': None})
+
+        records = self.store.get_records('update', 'cleep')
+        self.assertEqual(records[0]['phases'], {'resolve': 0.0, 'download': 0.0, 'install': 30.0, 'callback': 0.0})
+
+    def test_record_ring_buffer(self):
+        for duration in range(5):
+            self.store.record('install', 'system', '1.0.0', {'install': duration})
+
+        records = self.store.get_records('install', 'system')
+        self.assertEqual([record['duration'] for record in records], [2, 3, 4])
+
+    def test_records_loaded_from_file(self):
+        self.store.record('install', 'system', '1.0.0', {'install': 10.0})
+
+        store = DurationStore(FakeFilesystem(), self.durations_path)
+
+        self.assertEqual(len(store.get_records('install', 'system')), 1)
+        self.assertEqual(store.get_records('update', 'system'), [])
+
+    def test_invalid_file(self):
+        with open(self.durations_path, 'w') as fd:
+            json.dump([], fd)
+
+        self.assertEqual(self.store.get_records('install', 'system'), [])
+
+    def test_save_error(self):
+        cleep_filesystem = Mock()
+        cleep_filesystem.write_json.return_value = False
+        store = DurationStore(cleep_filesystem, self.durations_path)
+
+        store.record('install', 'system', '1.0.0', {'install': 10.0})
+
+        self.assertEqual(len(store.get_records('install', 'system')), 1)
+
+    def test_estimate(self):
+        store = DurationStore(FakeFilesystem(), self.durations_path, max_records=20)
+        for duration in range(1, 21):
+            store.record('install', 'system', '1.0.0', {'download': 1.0, 'install': duration})
+
+        self.assertEqual(store.estimate('install', 'system'), {
+            'samples': 20,
+            'p50': 11.0,
+            'p95': 20.0,
+            'phases': {'resolve': 0.0, 'download': 1.0, 'install': 10.0, 'callback': 0.0},
+        })
+
+    def test_estimate_phases(self):
+        self.store.record('install', 'system', '1.0.0', {'download': 1.0, 'install': 10.0})
+
+        self.assertEqual(self.store.estimate('install', 'system', ['install']), {
+            'samples': 1,
+            'p50': 10.0,
+            'p95': 10.0,
+            'phases': {'install': 10.0},
+        })
+
+    def test_estimate_no_record(self):
+        self.assertIsNone(self.store.estimate('install', 'system'))
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_durationstore.py; coverage report -m -i
+    unittest.main()
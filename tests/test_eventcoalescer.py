@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import time
+sys.path.append('../')
+from backend.eventcoalescer import EventCoalescer
+from mock import Mock, patch, call
+
+class TestsEventCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.callback = Mock()
+        self.coalescer = EventCoalescer(interval=0.1)
+
+    def tearDown(self):
+        self.coalescer.stop()
+
+    def test_first_event_sent_immediately(self):
+        self.coalescer.send('system', self.callback, {'status': 1})
+
+        self.callback.assert_called_once_with({'status': 1})
+        self.assertEqual(self.coalescer.get_stats(), {'sent': 1, 'merged': 0, 'dropped': 0, 'pending': 0})
+
+    def test_events_merged_during_interval(self):
+        self.coalescer.send('system', self.callback, {'status': 1})
+        self.coalescer.send('system', self.callback, {'status': 2})
+        self.coalescer.send('system', self.callback, {'status': 3})
+        self.assertEqual(self.callback.call_count, 1)
+        self.assertEqual(self.coalescer.get_stats()['pending'], 1)
+
+        time.sleep(0.3)
+        self.assertEqual(self.callback.call_count, 2)
+        self.callback.assert_called_with({'status': 3})
+        self.assertEqual(self.coalescer.get_stats(), {'sent': 2, 'merged': 1, 'dropped': 0, 'pending': 0})
+
+    def test_keys_are_independent(self):
+        self.coalescer.send('system', self.callback, {'status': 1})
+        self.coalescer.send('audio', self.callback, {'status': 1})
+
+        self.assertEqual(self.callback.call_count, 2)
+
+    def test_terminal_event_sent_immediately(self):
+        self.coalescer.send('system', self.callback, {'status': 1})
+        self.coalescer.send('system', self.callback, {'status': 1})
+        self.coalescer.send('system', self.callback, {'status': 2}, terminal=True)
+
+        self.assertEqual(self.callback.call_count, 2)
+        self.callback.assert_called_with({'status': 2})
+        time.sleep(0.3)
+        self.assertEqual(self.callback.call_count, 2)
+        self.assertEqual(self.coalescer.get_stats(), {'sent': 2, 'merged': 0, 'dropped': 1, 'pending': 0})
+
+    @patch('backend.eventcoalescer.threading.Timer')
+    def test_pending_event_flushed_after_terminal_event_is_dropped(self, mock_timer):
+        self.coalescer.send('system', self.callback, {'status': 1})
+        self.coalescer.send('system', self.callback, {'status': 2})
+        flush_args = mock_timer.call_args[0][2]
+
+        # terminal event is sent while timer is flushing pending event
+        send = self.coalescer._send
+        def send_terminal_first(*args):
+            self.coalescer._send = send
+            self.coalescer.send('system', self.callback, {'status': 3}, terminal=True)
+            send(*args)
+        self.coalescer._send = send_terminal_first
+        self.coalescer._flush(*flush_args)
+
+        self.assertEqual(self.callback.call_args_list, [call({'status': 1}), call({'status': 3})])
+        self.assertEqual(self.coalescer.get_stats(), {'sent': 2, 'merged': 0, 'dropped': 1, 'pending': 0})
+
+    def test_send_drops_older_event(self):
+        self.coalescer._send('system', self.callback, {'status': 2}, 2)
+        self.coalescer._send('system', self.callback, {'status': 1}, 1)
+        self.coalescer._send('audio', self.callback, {'status': 1}, 1)
+
+        self.assertEqual(self.callback.call_args_list, [call({'status': 2}), call({'status': 1})])
+        self.assertEqual(self.coalescer.get_stats()['dropped'], 1)
+
+    def test_event_sent_after_interval(self):
+        self.coalescer.send('system', self.callback, {'status': 1})
+        time.sleep(0.15)
+        self.coalescer.send('system', self.callback, {'status': 1})
+
+        self.assertEqual(self.callback.call_count, 2)
+
+    def test_stop(self):
+        self.coalescer.send('system', self.callback, {'status': 1})
+        self.coalescer.send('system', self.callback, {'status': 2})
+        self.coalescer.stop()
+        time.sleep(0.2)
+
+        self.assertEqual(self.callback.call_count, 1)
+
+    def test_callback_error(self):
+        self.callback.side_effect = Exception('Test exception')
+
+        self.coalescer.send('system', self.callback, {'status': 1}, terminal=True)
+
+        self.assertEqual(self.coalescer.get_stats()['sent'], 1)
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_eventcoalescer.py; coverage report -m -i
+    unittest.main()
+
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import collections
+import subprocess
+sys.path.append('../')
+from backend.lazyimport import LazyImport
+
+class TestsLazyImport(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+
+    def test_not_loaded_until_used(self):
+        lazy = LazyImport('collections', 'OrderedDict')
+
+        self.assertFalse(lazy.is_loaded())
+        self.assertTrue('not loaded' in repr(lazy))
+
+    def test_call(self):
+        lazy = LazyImport('collections', 'OrderedDict')
+
+        instance = lazy([('a', 1)])
+
+        self.assertTrue(lazy.is_loaded())
+        self.assertTrue(isinstance(instance, collections.OrderedDict))
+        self.assertEqual(instance['a'], 1)
+
+    def test_getattr(self):
+        lazy = LazyImport('collections', 'OrderedDict')
+
+        self.assertEqual(list(lazy.fromkeys(['a', 'b']).keys()), ['a', 'b'])
+        self.assertTrue(lazy.is_loaded())
+
+    def test_resolve(self):
+        lazy = LazyImport('collections', 'OrderedDict')
+
+        self.assertIs(lazy.resolve(), collections.OrderedDict)
+        self.assertIs(lazy.resolve(), collections.OrderedDict)
+
+    def test_invalid_module(self):
+        lazy = LazyImport('dummy_module_that_does_not_exist', 'Dummy')
+
+        with self.assertRaises(ImportError):
+            lazy()
+        self.assertFalse(lazy.is_loaded())
+
+    def test_invalid_attribute(self):
+        lazy = LazyImport('collections', 'Dummy')
+
+        with self.assertRaises(AttributeError):
+            lazy.resolve()
+
+    def test_helpers_do_not_import_http_stack(self):
+        script = ';'.join([
+            'import sys',
+            'import backend.packagecache, backend.conditionalrequest, backend.progressmodel',
+            'import backend.processhistory, backend.compactcatalog, backend.packageserver',
+            'print(",".join(name for name in ("http.client", "ssl", "urllib.request", "gzip", "mmap") if name in sys.modules))',
+        ])
+
+        output = subprocess.check_output([sys.executable, '-c', script], cwd='../')
+
+        self.assertEqual(output.decode('utf8').strip(), '')
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_lazyimport.py; coverage report -m -i
+    unittest.main()
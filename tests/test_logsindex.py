@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.logsindex import LogsIndex
+from mock import Mock, patch
+
+class TestsLogsIndex(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.path, 'logs_index.json')
+        self.index = self._make_index()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _make_index(self):
+        return LogsIndex(FakeFilesystem(), self.path, self.index_path, 'process_success.log', 'process_failure.log')
+
+    def _write_log(self, module_name, filename, timestamp, content='{}'):
+        os.makedirs(os.path.join(self.path, module_name), exist_ok=True)
+        path = os.path.join(self.path, module_name, filename)
+        with open(path, 'w') as fd:
+            fd.write(content)
+        os.utime(path, (timestamp, timestamp))
+        return path
+
+    def test_rebuild_when_index_missing(self):
+        success_path = self._write_log('system', 'process_success.log', 1000, 'success')
+        failure_path = self._write_log('audio', 'process_failure.log', 2000, 'failure!')
+        self._write_log('network', 'other.log', 3000)
+
+        self.assertEqual(sorted(self.index.get_module_names()), ['audio', 'system'])
+        self.assertEqual(self.index.get('system'), {'timestamp': 1000, 'path': success_path, 'size': 7, 'failed': False})
+        self.assertEqual(self.index.get('audio'), {'timestamp': 2000, 'path': failure_path, 'size': 8, 'failed': True})
+        self.assertIsNone(self.index.get('network'))
+        self.assertTrue(os.path.exists(self.index_path))
+
+    def test_index_loaded_from_file(self):
+        self._write_log('system', 'process_success.log', 1000)
+        self.index.get('system')
+
+        index = self._make_index()
+        with patch('os.scandir') as mock_scandir:
+            self.assertEqual(index.get('system')['timestamp'], 1000)
+            self.assertFalse(mock_scandir.called)
+
+    def test_get_most_recent_log(self):
+        self._write_log('system', 'process_success.log', 1000)
+        self._write_log('system', 'process_failure.log', 2000)
+        self.assertTrue(self.index.get('system')['failed'])
+
+        self._write_log('cleep', 'process_success.log', 2000)
+        self._write_log('cleep', 'process_failure.log', 1000)
+        self.index.rebuild()
+        self.assertFalse(self.index.get('cleep')['failed'])
+
+    def test_update(self):
+        self.assertIsNone(self.index.get('system'))
+
+        path = self._write_log('system', 'process_failure.log', 1000)
+        self.index.update('system', path, True)
+        self.assertEqual(self.index.get('system'), {'timestamp': 1000, 'path': path, 'size': 2, 'failed': True})
+
+        path = self._write_log('system', 'process_success.log', 2000)
+        self.index.update('system', path, False)
+        self.assertFalse(self.index.get('system')['failed'])
+
+        # update is persisted
+        self.assertEqual(self._make_index().get('system')['timestamp'], 2000)
+
+    def test_update_missing_file(self):
+        self.index.update('system', os.path.join(self.path, 'system', 'process_success.log'), False)
+
+        self.assertIsNone(self.index.get('system'))
+
+    def test_install_path_missing(self):
+        index = LogsIndex(Mock(), os.path.join(self.path, 'dummy'), self.index_path, 'process_success.log', 'process_failure.log')
+
+        self.assertEqual(index.get_module_names(), [])
+        self.assertFalse(index.cleep_filesystem.write_json.called)
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_logsindex.py; coverage report -m -i
+    unittest.main()
+
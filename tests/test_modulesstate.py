@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+sys.path.append('../')
+from backend.modulesstate import ModulesState
+
+class TestsModulesState(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.state = ModulesState()
+
+    def test_add(self):
+        record = self.state.add('system', '1.0.0')
+
+        self.assertIs(self.state['system'], record)
+        self.assertTrue('system' in self.state)
+        self.assertEqual(len(self.state), 1)
+        self.assertEqual(self.state.installed, {'system'})
+        self.assertEqual(self.state.updatable, set())
+        self.assertEqual(self.state.processing, set())
+
+    def test_add_not_installed_module(self):
+        self.state.add('audio', None, '1.0.0')
+
+        self.assertEqual(self.state.installed, set())
+        self.assertEqual(self.state['audio'].update_version, '1.0.0')
+
+    def test_indexes_follow_updates(self):
+        record = self.state.add('system', '1.0.0')
+
+        record.updatable = True
+        record.processing = True
+        self.assertEqual(self.state.updatable, {'system'})
+        self.assertEqual(self.state.processing, {'system'})
+
+        record['processing'] = False
+        self.assertEqual(self.state.processing, set())
+
+        record.version = None
+        self.assertEqual(self.state.installed, set())
+
+    def test_replaced_record_does_not_update_indexes(self):
+        old_record = self.state.add('system', '1.0.0')
+        self.state.add('system', '2.0.0')
+
+        old_record.updatable = True
+
+        self.assertEqual(self.state.updatable, set())
+
+    def test_item_access(self):
+        record = self.state.add('system', '1.0.0', '2.0.0')
+
+        record['update']['progress'] = 50
+        self.assertEqual(record.progress, 50)
+        self.assertEqual(record['update']['version'], '2.0.0')
+        record['update'] = {'version': '3.0.0', 'changelog': 'changelog'}
+        self.assertEqual(record.update_version, '3.0.0')
+        self.assertEqual(record.changelog, 'changelog')
+        self.assertEqual(record['update']['progress'], 50)
+
+        with self.assertRaises(KeyError):
+            record['dummy']
+        with self.assertRaises(KeyError):
+            record['dummy'] = True
+
+    def test_slots(self):
+        record = self.state.add('system', '1.0.0')
+
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.dummy = True
+
+    def test_to_dict(self):
+        self.state.add('system', '1.0.0')
+        self.state.add('audio', '1.0.0')
+
+        self.assertEqual(self.state.to_dict(), {
+            'system': {
+                'updatable': False,
+                'processing': False,
+                'pending': False,
+                'name': 'system',
+                'version': '1.0.0',
+                'update': {
+                    'progress': 0,
+                    'eta': None,
+                    'failed': False,
+                    'version': None,
+                    'changelog': None,
+                },
+            },
+            'audio': self.state['audio'].to_dict(),
+        })
+        self.assertEqual(list(self.state.to_dict(['audio', 'dummy']).keys()), ['audio'])
+
+    def test_load(self):
+        modules_updates = {
+            'system': {
+                'updatable': True,
+                'processing': True,
+                'pending': False,
+                'name': 'system',
+                'version': '1.0.0',
+                'update': {
+                    'progress': 10,
+                    'eta': 120,
+                    'failed': False,
+                    'version': '2.0.0',
+                    'changelog': 'changelog',
+                },
+            },
+            'audio': {
+                'updatable': False,
+            },
+        }
+        self.state.add('network', '1.0.0')
+
+        self.state.load(modules_updates)
+
+        self.assertEqual(self.state.to_dict()['system'], modules_updates['system'])
+        self.assertEqual(sorted(self.state.keys()), ['audio', 'system'])
+        self.assertEqual(self.state.installed, {'system'})
+        self.assertEqual(self.state.updatable, {'system'})
+        self.assertEqual(self.state.processing, {'system'})
+
+    def test_clear(self):
+        record = self.state.add('system', '1.0.0')
+        record.updatable = True
+
+        self.state.clear()
+
+        self.assertEqual(len(self.state), 0)
+        self.assertEqual(self.state.installed, set())
+        self.assertEqual(self.state.updatable, set())
+        self.assertIsNone(self.state.get('system'))
+
+    def test_clear_keep(self):
+        with self.state.writer():
+            self.state.add('audio', '1.0.0')
+            record = self.state.add('system', '1.0.0')
+            record.processing = True
+
+        with self.state.writer():
+            self.state.clear(keep=self.state.processing)
+
+        self.assertIs(self.state['system'], record)
+        self.assertEqual(list(self.state.keys()), ['system'])
+        self.assertEqual(self.state.installed, {'system'})
+        self.assertEqual(self.state.processing, {'system'})
+        self.assertEqual(list(self.state.get_snapshot().modules.keys()), ['system'])
+
+    def test_snapshot_published_by_writer(self):
+        with self.state.writer():
+            record = self.state.add('system', '1.0.0')
+            record.updatable = True
+            self.assertEqual(self.state.get_snapshot().modules, {})
+
+        snapshot = self.state.get_snapshot()
+        self.assertEqual(snapshot.to_dict(), {'system': record.to_dict()})
+        self.assertEqual(snapshot.installed, frozenset(['system']))
+        self.assertEqual(snapshot.updatable, frozenset(['system']))
+        self.assertEqual(snapshot.processing, frozenset())
+
+    def test_snapshot_copy_on_write(self):
+        with self.state.writer():
+            self.state.add('system', '1.0.0')
+            self.state.add('audio', '1.0.0')
+        snapshot = self.state.get_snapshot()
+
+        with self.state.writer():
+            self.state['system'].progress = 50
+
+        new_snapshot = self.state.get_snapshot()
+        self.assertEqual(snapshot.modules['system'].progress, 0)
+        self.assertEqual(new_snapshot.modules['system'].progress, 50)
+        self.assertIs(new_snapshot.modules['audio'], snapshot.modules['audio'])
+
+    def test_snapshot_shares_records_values(self):
+        with self.state.writer():
+            record = self.state.add('system', '1.0.0')
+            record.updatable = True
+
+        self.assertIs(self.state.get_snapshot().modules['system'], record._values)
+
+    def test_snapshot_to_dict(self):
+        with self.state.writer():
+            self.state.add('system', '1.0.0')
+            self.state.add('audio', '1.0.0')
+        snapshot = self.state.get_snapshot()
+
+        self.assertEqual(snapshot.to_dict(), self.state.to_dict())
+        self.assertEqual(list(snapshot.to_dict(['audio', 'dummy']).keys()), ['audio'])
+
+    def test_snapshot_published_by_outermost_writer(self):
+        with self.state.writer():
+            with self.state.writer():
+                self.state.add('system', '1.0.0')
+            self.assertEqual(self.state.get_snapshot().modules, {})
+
+        self.assertEqual(list(self.state.get_snapshot().modules.keys()), ['system'])
+
+    def test_snapshot_removed_records(self):
+        with self.state.writer():
+            self.state.add('system', '1.0.0')
+        with self.state.writer():
+            self.state.clear()
+            self.state.add('audio', '1.0.0')
+
+        self.assertEqual(list(self.state.get_snapshot().modules.keys()), ['audio'])
+
+    def test_touch(self):
+        with self.state.writer():
+            self.state.touch()
+            self.state.touch('system')
+            self.state.touch('audio')
+
+        snapshot = self.state.get_snapshot()
+        self.assertEqual(snapshot.revision, 3)
+        self.assertEqual(snapshot.resetrevision, 1)
+        self.assertEqual(snapshot.revisions, {'system': 2, 'audio': 3})
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_modulesstate.py; coverage report -m -i
+    unittest.main()
+
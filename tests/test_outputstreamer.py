@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import time
+sys.path.append('../')
+from backend.outputstreamer import OutputStreamer
+from mock import Mock, patch
+
+class TestsOutputStreamer(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.send = Mock()
+        self.streamer = OutputStreamer(self.send, interval=60.0, max_bytes=20, buffer_size=3)
+
+    def tearDown(self):
+        self.streamer.stop()
+
+    def test_send_only_new_lines(self):
+        self.streamer.feed('system', {'stdout': ['line 1', 'line 2'], 'stderr': []})
+        self.assertFalse(self.send.called)
+
+        self.streamer.feed('system', {'stdout': ['line 1', 'line 2', 'line 3'], 'stderr': ['error']}, terminated=True)
+        self.send.assert_called_once_with('system', [
+            {'output': 'stdout', 'line': 'line 1'},
+            {'output': 'stdout', 'line': 'line 2'},
+            {'output': 'stdout', 'line': 'line 3'},
+            {'output': 'stderr', 'line': 'error'},
+        ])
+
+    def test_send_when_max_bytes_reached(self):
+        self.streamer.feed('system', {'stdout': ['a' * 10]})
+        self.assertFalse(self.send.called)
+
+        self.streamer.feed('system', {'stdout': ['a' * 10, 'b' * 10]})
+        self.assertEqual(self.send.call_count, 1)
+        self.assertEqual(len(self.send.call_args[0][1]), 2)
+
+        self.streamer.feed('system', {'stdout': ['a' * 10, 'b' * 10]}, terminated=True)
+        self.assertEqual(self.send.call_count, 1)
+
+    def test_send_when_interval_elapsed(self):
+        self.streamer.feed('system', {'stdout': ['line 1']})
+        with patch('backend.outputstreamer.time') as mock_time:
+            mock_time.time.return_value = time.time() + 61
+            self.streamer.feed('system', {'stdout': ['line 1', 'line 2']})
+
+        self.send.assert_called_once_with('system', [
+            {'output': 'stdout', 'line': 'line 1'},
+            {'output': 'stdout', 'line': 'line 2'},
+        ])
+
+    def test_send_pending_lines_of_quiet_process(self):
+        streamer = OutputStreamer(self.send, interval=0.05)
+        streamer.feed('system', {'stdout': ['line 1']})
+        time.sleep(0.2)
+
+        self.send.assert_called_once_with('system', [{'output': 'stdout', 'line': 'line 1'}])
+
+    def test_buffer(self):
+        self.streamer.feed('system', {'process': ['p1'], 'stdout': ['s1', 's2', 's3']})
+
+        self.assertEqual(self.streamer.get_buffer('system'), [
+            {'output': 'stdout', 'line': 's1'},
+            {'output': 'stdout', 'line': 's2'},
+            {'output': 'stdout', 'line': 's3'},
+        ])
+        self.assertEqual(self.streamer.get_buffer('audio'), [])
+
+        # buffer is kept after process end
+        self.streamer.feed('system', {'process': ['p1'], 'stdout': ['s1', 's2', 's3']}, terminated=True)
+        self.assertEqual(len(self.streamer.get_buffer('system')), 3)
+
+    def test_reset(self):
+        self.streamer.feed('system', {'stdout': ['line 1']})
+        self.streamer.reset('system')
+        self.assertEqual(self.streamer.get_buffer('system'), [])
+
+        self.streamer.feed('system', {'stdout': ['line 1']}, terminated=True)
+        self.send.assert_called_once_with('system', [{'output': 'stdout', 'line': 'line 1'}])
+
+    def test_outputs_restarted(self):
+        self.streamer.feed('system', {'stdout': ['line 1', 'line 2']})
+        self.streamer.feed('system', {'stdout': ['new line']}, terminated=True)
+
+        self.assertEqual(self.send.call_args[0][1][-1], {'output': 'stdout', 'line': 'new line'})
+
+    def test_send_error(self):
+        self.send.side_effect = Exception('Test exception')
+
+        self.streamer.feed('system', {'stdout': ['line 1']}, terminated=True)
+
+        self.assertTrue(self.send.called)
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_outputstreamer.py; coverage report -m -i
+    unittest.main()
+
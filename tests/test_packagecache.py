@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import io
+import shutil
+import hashlib
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.packagecache import PackageCache
+from mock import Mock, patch
+
+def make_response(content, headers={}):
+    resp = io.BytesIO(content)
+    resp.headers = headers
+    return resp
+
+class TestsPackageCache(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.path, 'cache')
+        self.cache = PackageCache(FakeFilesystem(), self.cache_path, 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _fetch(self, content):
+        checksum = hashlib.sha256(content).hexdigest()
+        with patch('urllib.request.urlopen', Mock(return_value=make_response(content))) as mock_urlopen:
+            path = self.cache.fetch('http://dummy/package.zip', checksum)
+        return path, checksum, mock_urlopen
+
+    def test_is_enabled(self):
+        self.assertTrue(self.cache.is_enabled())
+        self.cache.set_max_size(0)
+        self.assertFalse(self.cache.is_enabled())
+
+    def test_fetch_miss_then_hit(self):
+        path, checksum, mock_urlopen = self._fetch(b'a' * 10)
+        self.assertEqual(path, os.path.join(self.cache_path, checksum))
+        self.assertTrue(mock_urlopen.called)
+
+        path, checksum, mock_urlopen = self._fetch(b'a' * 10)
+        self.assertEqual(path, os.path.join(self.cache_path, checksum))
+        self.assertFalse(mock_urlopen.called)
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['count'], 1)
+        self.assertEqual(stats['size'], 10)
+        self.assertEqual(stats['downloaded'], 10)
+
+    def test_fetch_invalid_checksum(self):
+        with patch('urllib.request.urlopen', Mock(return_value=make_response(b'content'))):
+            with self.assertRaises(Exception) as cm:
+                self.cache.fetch('http://dummy/package.zip', '0' * 64)
+        self.assertEqual(str(cm.exception), 'Invalid checksum for package downloaded from "http://dummy/package.zip"')
+        self.assertEqual(os.listdir(self.cache_path), [])
+
+    def test_fetch_package_too_big(self):
+        path, checksum, _ = self._fetch(b'a' * 101)
+
+        self.assertIsNone(path)
+        self.assertEqual(self.cache.get_stats()['count'], 0)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_path, checksum)))
+
+    def test_fetch_package_too_big_known_size(self):
+        checksum = hashlib.sha256(b'a' * 101).hexdigest()
+        with patch('urllib.request.urlopen', Mock(return_value=make_response(b'a' * 101))) as mock_urlopen:
+            path = self.cache.fetch('http://dummy/package.zip', checksum, size=101)
+
+        self.assertIsNone(path)
+        self.assertFalse(mock_urlopen.called)
+        self.assertEqual(self.cache.get_stats()['misses'], 1)
+
+    def test_fetch_package_too_big_content_length(self):
+        checksum = hashlib.sha256(b'a' * 101).hexdigest()
+        resp = make_response(b'a' * 101, {'Content-Length': '101'})
+        resp.read = Mock(side_effect=resp.read)
+        with patch('urllib.request.urlopen', Mock(return_value=resp)):
+            path = self.cache.fetch('http://dummy/package.zip', checksum)
+
+        self.assertIsNone(path)
+        self.assertFalse(resp.read.called)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_path, checksum)))
+        self.assertEqual(self.cache.get_stats()['downloaded'], 0)
+
+    def test_lru_eviction(self):
+        _, checksum1, _ = self._fetch(b'1' * 40)
+        _, checksum2, _ = self._fetch(b'2' * 40)
+        # access first package to make second one the least recently used
+        with patch('time.time', Mock(return_value=9999999999)):
+            self.assertIsNotNone(self.cache.get(checksum1))
+        _, checksum3, _ = self._fetch(b'3' * 40)
+
+        self.assertIsNotNone(self.cache.get(checksum1))
+        self.assertIsNone(self.cache.get(checksum2))
+        self.assertIsNotNone(self.cache.get(checksum3))
+        self.assertEqual(self.cache.get_stats()['size'], 80)
+
+    def test_pinned_package_not_evicted(self):
+        _, checksum1, _ = self._fetch(b'1' * 40)
+        self.cache.pin(checksum1)
+        _, checksum2, _ = self._fetch(b'2' * 40)
+
+        _, checksum3, _ = self._fetch(b'3' * 40)
+
+        self.assertIsNotNone(self.cache.get(checksum1))
+        self.assertIsNone(self.cache.get(checksum2))
+        self.assertIsNotNone(self.cache.get(checksum3))
+
+    def test_fetch_package_exceeds_size_left_by_pinned_packages(self):
+        _, checksum1, _ = self._fetch(b'1' * 60)
+        self.cache.pin(checksum1)
+
+        path, checksum2, _ = self._fetch(b'2' * 60)
+
+        self.assertIsNone(path)
+        self.assertIsNotNone(self.cache.get(checksum1))
+        self.assertIsNone(self.cache.get(checksum2))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_path, checksum2)))
+        self.assertEqual(self.cache.get_stats()['size'], 60)
+
+    def test_unpin(self):
+        _, checksum1, _ = self._fetch(b'1' * 60)
+        self.cache.pin(checksum1)
+        self.cache.set_max_size(50)
+        self.assertIsNotNone(self.cache.get(checksum1))
+
+        self.cache.unpin()
+
+        self.assertIsNone(self.cache.get(checksum1))
+        self.assertEqual(self.cache.get_stats()['count'], 0)
+
+    def test_clear_keeps_pinned_packages(self):
+        _, checksum1, _ = self._fetch(b'1' * 40)
+        _, checksum2, _ = self._fetch(b'2' * 40)
+        self.cache.pin(checksum1)
+
+        self.cache.clear()
+
+        self.assertIsNotNone(self.cache.get(checksum1))
+        self.assertIsNone(self.cache.get(checksum2))
+
+    def test_index_persisted(self):
+        _, checksum, _ = self._fetch(b'a' * 10)
+
+        cache = PackageCache(FakeFilesystem(), self.cache_path, 100)
+        self.assertEqual(cache.get(checksum), os.path.join(self.cache_path, checksum))
+
+    def test_get_does_not_save_index(self):
+        _, checksum, _ = self._fetch(b'a' * 10)
+        self.cache.cleep_filesystem.write_json = Mock(return_value=True)
+
+        with patch('time.time', Mock(return_value=9999999999)):
+            self.cache.get(checksum)
+
+        self.assertFalse(self.cache.cleep_filesystem.write_json.called)
+        self.assertEqual(self.cache._get_index()[checksum]['lastaccess'], 9999999999)
+
+    def test_flush(self):
+        _, checksum, _ = self._fetch(b'a' * 10)
+        with patch('time.time', Mock(return_value=9999999999)):
+            self.cache.get(checksum)
+
+        self.cache.flush()
+
+        cache = PackageCache(FakeFilesystem(), self.cache_path, 100)
+        self.assertEqual(cache._get_index()[checksum]['lastaccess'], 9999999999)
+
+    def test_flush_nothing_accessed(self):
+        self._fetch(b'a' * 10)
+        self.cache.cleep_filesystem.write_json = Mock(return_value=True)
+
+        self.cache.flush()
+
+        self.assertFalse(self.cache.cleep_filesystem.write_json.called)
+
+    def test_set_max_size_evicts(self):
+        self._fetch(b'1' * 40)
+        self._fetch(b'2' * 40)
+
+        self.cache.set_max_size(50)
+
+        self.assertEqual(self.cache.get_stats()['count'], 1)
+
+    def test_clear(self):
+        self._fetch(b'1' * 40)
+
+        self.cache.clear()
+
+        self.assertEqual(self.cache.get_stats()['count'], 0)
+        self.assertEqual(os.listdir(self.cache_path), ['index.json'])
+
+    def test_fetch_checksum(self):
+        checksum = hashlib.sha256(b'dummy').hexdigest()
+        content = ('%s  cleep_0.0.20.deb\n' % checksum.upper()).encode('utf8')
+        with patch('urllib.request.urlopen', Mock(return_value=make_response(content))):
+            self.assertEqual(self.cache.fetch_checksum('http://dummy/cleep.sha256'), checksum)
+
+    def test_fetch_checksum_invalid(self):
+        with patch('urllib.request.urlopen', Mock(return_value=make_response(b'invalid'))):
+            with self.assertRaises(Exception) as cm:
+                self.cache.fetch_checksum('http://dummy/cleep.sha256')
+        self.assertEqual(str(cm.exception), 'Invalid checksum file content from "http://dummy/cleep.sha256"')
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_packagecache.py; coverage report -m -i
+    unittest.main()
+
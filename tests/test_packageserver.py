@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+sys.path.append('../')
+from backend.packageserver import PackageServer
+
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None
+
+SHA256 = 'a' * 64
+
+class TestsPackageServer(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.package_path = os.path.join(self.path, SHA256)
+        with open(self.package_path, 'wb') as fd:
+            fd.write(b'package content')
+        self.server = PackageServer(self.path)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.path)
+
+    def test_get_url(self):
+        url = self.server.get_url(self.package_path)
+
+        self.assertTrue(url.startswith('http://127.0.0.1:'))
+        self.assertTrue(url.endswith('/%s' % SHA256))
+        self.assertTrue(self.server.is_url(url))
+
+    def test_get_url_not_cached_package(self):
+        with self.assertRaises(Exception) as cm:
+            self.server.get_url('/tmp/%s' % SHA256)
+        self.assertEqual(str(cm.exception), '"/tmp/%s" is not a cached package' % SHA256)
+
+        with self.assertRaises(Exception):
+            self.server.get_url(os.path.join(self.path, 'index.json'))
+
+    def test_is_url(self):
+        self.assertFalse(self.server.is_url('http://127.0.0.1:8000/%s' % SHA256))
+
+        self.server.start()
+
+        self.assertFalse(self.server.is_url('http://dummy.com/%s' % SHA256))
+        self.assertFalse(self.server.is_url(None))
+
+    def test_download(self):
+        url = self.server.get_url(self.package_path)
+
+        with urllib.request.urlopen(url) as resp:
+            self.assertEqual(resp.headers['Content-Length'], '15')
+            self.assertEqual(resp.read(), b'package content')
+
+    def test_head(self):
+        url = self.server.get_url(self.package_path)
+
+        request = urllib.request.Request(url, method='HEAD')
+        with urllib.request.urlopen(request) as resp:
+            self.assertEqual(resp.headers['Content-Length'], '15')
+            self.assertEqual(resp.read(), b'')
+
+    def test_download_unknown_package(self):
+        url = self.server.get_url(self.package_path)
+        os.remove(self.package_path)
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            urllib.request.urlopen(url)
+        self.assertEqual(cm.exception.code, 404)
+
+    def test_download_invalid_name(self):
+        url = self.server.get_url(self.package_path)
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            urllib.request.urlopen(url.replace(SHA256, '../index.json'))
+        self.assertEqual(cm.exception.code, 404)
+
+    @unittest.skipIf(urllib3 is None, 'urllib3 (used by core downloads) is not installed')
+    def test_download_with_urllib3(self):
+        url = self.server.get_url(self.package_path)
+
+        resp = urllib3.PoolManager().request('GET', url)
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.data, b'package content')
+
+    def test_stop(self):
+        url = self.server.get_url(self.package_path)
+        self.server.stop()
+
+        self.assertFalse(self.server.is_url(url))
+        with self.assertRaises(urllib.error.URLError):
+            urllib.request.urlopen(url, timeout=1.0)
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_packageserver.py; coverage report -m -i
+    unittest.main()
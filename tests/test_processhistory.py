@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.processhistory import ProcessHistory
+from mock import patch
+
+class TestsProcessHistory(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.path, 'system'))
+        os.makedirs(os.path.join(self.path, 'cleep'))
+        self.index_path = os.path.join(self.path, 'process_history_index.json')
+        self.history = self._make_history()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _make_history(self, max_records=3, max_size=262144):
+        return ProcessHistory(FakeFilesystem(), self.path, self.index_path, max_records, max_size)
+
+    def _make_status(self, index):
+        return {
+            'module': 'system',
+            'status': 2,
+            'process': ['process %d' % index],
+            'stdout': ['stdout %d' % index, 'é'],
+            'stderr': [],
+        }
+
+    def test_append_and_get_record(self):
+        status = self._make_status(0)
+        self.history.append('system', status, False)
+
+        self.assertEqual(self.history.get_module_names(), ['system'])
+        self.assertEqual(self.history.get_record('system', 0), status)
+        records = self.history.get_records('system')
+        self.assertEqual(len(records), 1)
+        self.assertFalse(records[0]['failed'])
+        self.assertEqual(records[0]['size'], os.path.getsize(self.history.get_path('system')))
+
+    def test_records_order(self):
+        with patch('backend.processhistory.time') as mock_time:
+            mock_time.time.side_effect = [1000, 2000]
+            self.history.append('system', self._make_status(0), False)
+            self.history.append('system', self._make_status(1), True)
+
+        records = self.history.get_records('system')
+        self.assertEqual([record['timestamp'] for record in records], [2000, 1000])
+        self.assertEqual([record['failed'] for record in records], [True, False])
+        self.assertEqual(self.history.get_record('system', 0), self._make_status(1))
+        self.assertEqual(self.history.get_record('system', 1), self._make_status(0))
+
+    def test_get_record_unknown(self):
+        self.history.append('system', self._make_status(0), False)
+
+        self.assertIsNone(self.history.get_record('system', 1))
+        self.assertIsNone(self.history.get_record('system', -1))
+        self.assertIsNone(self.history.get_record('audio', 0))
+        self.assertEqual(self.history.get_records('audio'), [])
+
+    def test_append_with_lines(self):
+        status = {'module': 'system', 'status': 2, 'stdout': ['tail']}
+        self.history.append('system', status, False, iter([{'stdout': 'head'}, {'stdout': 'tail'}]))
+
+        self.assertEqual(self.history.get_record('system', 0)['stdout'], ['head', 'tail'])
+        self.assertEqual(len(self.history.search('head')['results']), 1)
+
+    def test_iter_record_lines(self):
+        self.history.append('system', self._make_status(0), True)
+
+        lines = list(self.history.iter_record_lines('system', 0))
+        self.assertTrue(lines[0]['failed'])
+        self.assertEqual(lines[0]['status'], {'module': 'system', 'status': 2})
+        self.assertEqual(lines[1:], [{'process': 'process 0'}, {'stdout': 'stdout 0'}, {'stdout': 'é'}])
+
+    def test_rotate_on_max_records(self):
+        for index in range(5):
+            self.history.append('system', self._make_status(index), False)
+
+        self.assertEqual(len(self.history.get_records('system')), 3)
+        self.assertEqual(self.history.get_record('system', 0), self._make_status(4))
+        self.assertEqual(self.history.get_record('system', 2), self._make_status(2))
+        self.assertEqual(
+            os.path.getsize(self.history.get_path('system')),
+            sum([record['size'] for record in self.history.get_records('system')]),
+        )
+
+    def test_rotate_on_max_size(self):
+        self.history.append('system', self._make_status(0), False)
+        record_size = self.history.get_records('system')[0]['size']
+        history = self._make_history(max_records=10, max_size=record_size * 2 + 5)
+
+        for index in range(1, 5):
+            history.append('system', self._make_status(index), False)
+
+        self.assertEqual(len(history.get_records('system')), 2)
+        self.assertEqual(history.get_record('system', 1), self._make_status(3))
+        self.assertLessEqual(os.path.getsize(history.get_path('system')), record_size * 2 + 5)
+
+    def test_index_persisted(self):
+        self.history.append('system', self._make_status(0), False)
+
+        history = self._make_history()
+        self.assertEqual(history.get_records('system'), self.history.get_records('system'))
+        self.assertEqual(history.get_record('system', 0), self._make_status(0))
+
+    def test_search(self):
+        with patch('backend.processhistory.time') as mock_time:
+            mock_time.time.side_effect = [1000, 2000, 3000]
+            self.history.append('system', self._make_status(0), False)
+            self.history.append('system', {'stderr': ['E: Unable to locate package dummy']}, True)
+            self.history.append('cleep', {'stdout': ['ERROR: Could not find a version of pip']}, True)
+
+        results = self.history.search('unable to locate')['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0], {
+            'module': 'system',
+            'timestamp': 2000,
+            'failed': True,
+            'position': 0,
+            'output': 'stderr',
+            'snippet': 'E: Unable to locate package dummy',
+        })
+        self.assertEqual(self.history.get_record(results[0]['module'], results[0]['position'])['stderr'], ['E: Unable to locate package dummy'])
+
+        results = self.history.search('STDOUT')['results']
+        self.assertEqual([(result['module'], result['timestamp']) for result in results], [('system', 1000)])
+
+        results = self.history.search('e')['results']
+        self.assertEqual([result['timestamp'] for result in results], [3000, 2000, 1000])
+
+    def test_search_filters(self):
+        with patch('backend.processhistory.time') as mock_time:
+            mock_time.time.side_effect = [1000, 2000]
+            self.history.append('system', {'stdout': ['error 1']}, False)
+            self.history.append('system', {'stdout': ['error 2']}, True)
+
+        self.assertEqual([result['snippet'] for result in self.history.search('error', since=1500)['results']], ['error 2'])
+        self.assertEqual([result['snippet'] for result in self.history.search('error', failed=False)['results']], ['error 1'])
+        self.assertEqual([result['snippet'] for result in self.history.search('error', failed=True)['results']], ['error 2'])
+
+    def test_search_max_results(self):
+        self.history.append('system', {'stdout': ['error %d' % index for index in range(10)]}, False)
+
+        results = self.history.search('error', max_results=3)
+        self.assertEqual(len(results['results']), 3)
+        self.assertTrue(results['truncated'])
+        self.assertFalse(self.history.search('error', max_results=10)['truncated'])
+
+    def test_search_snippet(self):
+        self.history.append('system', {'stdout': ['a' * 100 + 'error' + 'b' * 100]}, False)
+
+        snippet = self.history.search('error', snippet_size=25)['results'][0]['snippet']
+        self.assertEqual(snippet, 'a' * 10 + 'error' + 'b' * 10)
+
+    def test_search_skips_records_with_tokens_filter(self):
+        self.history.append('system', {'stdout': ['something went wrong']}, False)
+
+        with patch.object(self.history, 'iter_record_lines') as mock_iter:
+            self.assertEqual(self.history.search('unable to locate')['results'], [])
+            self.assertFalse(mock_iter.called)
+
+    def test_search_record_without_tokens_filter(self):
+        self.history.append('system', {'stdout': ['unable to locate']}, False)
+        del self.history._get_index()['system'][0]['tokens']
+
+        self.assertEqual(len(self.history.search('unable to locate')['results']), 1)
+
+    def test_invalid_index_file(self):
+        with open(self.index_path, 'w') as fd:
+            fd.write('[]')
+
+        self.assertEqual(self.history.get_module_names(), [])
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_processhistory.py; coverage report -m -i
+    unittest.main()
+
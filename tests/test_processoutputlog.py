@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.processoutputlog import ProcessOutputLog
+from mock import Mock
+
+class TestsProcessOutputLog(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.output = ProcessOutputLog(FakeFilesystem(), self.path, tail_size=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_write_incrementally(self):
+        self.output.write('system', {'process': ['p1'], 'stdout': ['s1'], 'stderr': []})
+        self.output.write('system', {'process': ['p1'], 'stdout': ['s1', 's2', 'é'], 'stderr': ['e1']})
+
+        self.assertEqual(list(self.output.iter_lines('system')), [
+            {'process': 'p1'},
+            {'stdout': 's1'},
+            {'stdout': 's2'},
+            {'stdout': 'é'},
+            {'stderr': 'e1'},
+        ])
+
+    def test_write_truncates_previous_process_output(self):
+        self.output.write('system', {'stdout': ['old']})
+        self.output.finish('system')
+
+        self.output.write('system', {'stdout': ['new']})
+
+        self.assertEqual(list(self.output.iter_lines('system')), [{'stdout': 'new'}])
+
+    def test_write_without_output(self):
+        self.output.write('system', {'status': 1})
+
+        self.assertTrue(os.path.exists(self.output.get_path('system')))
+        self.assertEqual(list(self.output.iter_lines('system')), [])
+
+    def test_write_error(self):
+        cleep_filesystem = Mock()
+        cleep_filesystem.open.side_effect = Exception('Test exception')
+        output = ProcessOutputLog(cleep_filesystem, self.path)
+
+        output.write('system', {'stdout': ['line']})
+
+        self.assertEqual(list(output.iter_lines('system')), [])
+
+    def test_get_summary(self):
+        status = {'status': 2, 'module': 'system', 'process': ['p1'], 'stdout': ['s1', 's2', 's3'], 'stderr': []}
+        self.output.write('system', status)
+
+        self.assertEqual(self.output.get_summary('system', status), {
+            'status': 2,
+            'module': 'system',
+            'process': ['p1'],
+            'stdout': ['s2', 's3'],
+            'stderr': [],
+            'outputlines': {'process': 1, 'stdout': 3, 'stderr': 0},
+        })
+
+    def test_get_summary_unknown_process(self):
+        summary = self.output.get_summary('system', {'status': 2, 'stdout': ['s1']})
+
+        self.assertEqual(summary['stdout'], [])
+        self.assertEqual(summary['outputlines'], {'process': 0, 'stdout': 0, 'stderr': 0})
+
+    def test_write_status(self):
+        path = os.path.join(self.path, 'process_success.log')
+        self.output.write('system', {'process': ['p1'], 'stdout': ['s1', 's2'], 'stderr': []})
+        status = {'status': 2, 'module': 'system', 'process': ['p1'], 'stdout': ['s1', 's2', 'é'], 'stderr': ['e1']}
+        self.output.write('system', status)
+
+        self.assertTrue(self.output.write_status('system', status, path))
+
+        self.assertEqual(FakeFilesystem().read_json(path), status)
+
+    def test_write_status_without_fields(self):
+        path = os.path.join(self.path, 'process_success.log')
+        self.output.write('system', {'stdout': ['s1']})
+
+        self.assertTrue(self.output.write_status('system', {}, path))
+
+        self.assertEqual(FakeFilesystem().read_json(path), {'process': [], 'stdout': ['s1'], 'stderr': []})
+
+    def test_write_status_error(self):
+        cleep_filesystem = Mock()
+        cleep_filesystem.open.side_effect = Exception('Test exception')
+        output = ProcessOutputLog(cleep_filesystem, self.path)
+
+        self.assertFalse(output.write_status('system', {'status': 2}, os.path.join(self.path, 'process_success.log')))
+
+    def test_iter_lines_no_output(self):
+        self.assertEqual(list(self.output.iter_lines('system')), [])
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_processoutputlog.py; coverage report -m -i
+    unittest.main()
+
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('../')
+from backend.progressmodel import ProgressModel
+from backend.packageserver import PackageServer
+from mock import Mock, patch
+
+class TestsProgressModel(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.model = ProgressModel()
+
+    def test_estimate_duration(self):
+        self.assertEqual(self.model.estimate_duration('install', 'system'), ProgressModel.DEFAULT_DURATION)
+        self.assertEqual(self.model.estimate_duration('uninstall', 'system', 1024), ProgressModel.UNINSTALL_DURATION)
+        self.assertEqual(
+            self.model.estimate_duration('install', 'system', ProgressModel.BYTES_PER_SECOND * 10),
+            ProgressModel.BASE_DURATION + 10,
+        )
+
+    def test_estimate_duration_from_previous_executions(self):
+        get_duration = Mock(side_effect=lambda action, module_name: 42.0 if action == 'install' else None)
+        model = ProgressModel(get_duration)
+
+        self.assertEqual(model.estimate_duration('install', 'system', 1024), 42.0)
+        get_duration.assert_called_with('install', 'system')
+        self.assertEqual(model.estimate_duration('update', 'system'), ProgressModel.DEFAULT_DURATION)
+
+    def test_estimate_duration_get_duration_error(self):
+        model = ProgressModel(Mock(side_effect=Exception('Test exception')))
+
+        self.assertEqual(model.estimate_duration('install', 'system'), ProgressModel.DEFAULT_DURATION)
+
+    def test_start_weights(self):
+        weights = self.model.start([
+            {'action': 'install', 'module': 'mod1', 'size': ProgressModel.BYTES_PER_SECOND * 65},
+            {'action': 'install', 'module': 'mod2', 'size': None},
+            {'action': 'uninstall', 'module': 'mod3', 'size': None},
+        ])
+
+        self.assertEqual(weights, [70.0, 20.0, 10.0])
+
+    def test_start_weights_sum(self):
+        weights = self.model.start([{'action': 'install', 'module': 'mod%s' % i} for i in range(7)])
+
+        self.assertEqual(len(weights), 7)
+        self.assertEqual(round(sum(weights), 2), 100.0)
+
+    def test_start_no_step(self):
+        self.assertEqual(self.model.start([]), [])
+        self.assertEqual(self.model.get_progress(), 0.0)
+        self.assertIsNone(self.model.get_eta())
+
+    @patch('backend.progressmodel.time')
+    def test_progress_and_eta(self, mock_time):
+        mock_time.monotonic.return_value = 1000.0
+        self.model.start([
+            {'action': 'install', 'module': 'mod1', 'size': ProgressModel.BYTES_PER_SECOND * 85},
+            {'action': 'uninstall', 'module': 'mod2', 'size': None},
+        ])
+        self.assertIsNone(self.model.get_eta())
+
+        self.model.start_step()
+        mock_time.monotonic.return_value = 1040.0
+        self.assertEqual(self.model.get_progress(), 40.0)
+        self.assertEqual(self.model.get_eta(), 60)
+
+        # running step never reaches its full weight
+        mock_time.monotonic.return_value = 1200.0
+        self.assertEqual(self.model.get_progress(), 85.5)
+        self.assertEqual(self.model.get_eta(), 10)
+
+        self.model.end_step()
+        self.model.start_step()
+        mock_time.monotonic.return_value = 1205.0
+        self.assertEqual(self.model.get_progress(), 95.0)
+        self.assertEqual(self.model.get_eta(), 5)
+
+        self.model.end_step()
+        self.assertEqual(self.model.get_progress(), 100.0)
+        self.assertEqual(self.model.get_eta(), 0)
+
+    @patch('backend.progressmodel.time')
+    def test_end_step_returns_duration(self, mock_time):
+        mock_time.monotonic.return_value = 1000.0
+        self.model.start([{'action': 'install', 'module': 'mod1'}, {'action': 'install', 'module': 'mod2'}])
+
+        self.model.start_step()
+        mock_time.monotonic.return_value = 1012.0
+        self.assertEqual(self.model.end_step(), 12.0)
+        self.model.start_step()
+        mock_time.monotonic.return_value = 1020.0
+        self.assertEqual(self.model.end_step(), 8.0)
+
+    def test_end_step_twice(self):
+        self.model.start([{'action': 'install', 'module': 'mod1'}])
+        self.model.start_step()
+
+        self.assertIsNotNone(self.model.end_step())
+        self.assertIsNone(self.model.end_step())
+
+        self.assertEqual(self.model.get_progress(), 100.0)
+
+    def test_end_step_without_running_step(self):
+        self.model.start([{'action': 'install', 'module': 'mod1'}])
+
+        self.assertIsNone(self.model.end_step())
+
+        self.assertEqual(self.model.get_progress(), 0.0)
+
+    def test_start_step_after_last_step(self):
+        self.model.start([{'action': 'install', 'module': 'mod1'}])
+        self.model.start_step()
+        self.model.end_step()
+
+        self.model.start_step()
+
+        self.assertEqual(self.model.get_progress(), 100.0)
+
+    def test_get_package_size_cached_package(self):
+        cache_path = tempfile.mkdtemp()
+        path = os.path.join(cache_path, 'a' * 64)
+        with open(path, 'wb') as fd:
+            fd.write(b'0' * 1234)
+        server = PackageServer(cache_path)
+        try:
+            self.assertEqual(self.model.get_package_size(server.get_url(path)), 1234)
+        finally:
+            server.stop()
+            shutil.rmtree(cache_path)
+
+    @patch('urllib.request.urlopen')
+    def test_get_package_size_remote_file(self, mock_urlopen):
+        resp = Mock()
+        resp.headers = {'Content-Length': '4321'}
+        mock_urlopen.return_value.__enter__ = Mock(return_value=resp)
+        mock_urlopen.return_value.__exit__ = Mock(return_value=False)
+
+        self.assertEqual(self.model.get_package_size('https://www.cleep.com/package.zip'), 4321)
+        self.assertEqual(mock_urlopen.call_args[0][0].get_method(), 'HEAD')
+
+    @patch('urllib.request.urlopen')
+    def test_get_package_size_error(self, mock_urlopen):
+        mock_urlopen.side_effect = Exception('Test exception')
+
+        self.assertIsNone(self.model.get_package_size('https://www.cleep.com/package.zip'))
+        self.assertIsNone(self.model.get_package_size(None))
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_progressmodel.py; coverage report -m -i
+    unittest.main()
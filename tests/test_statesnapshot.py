@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.statesnapshot import StateSnapshot
+from mock import Mock
+
+CLEEP_UPDATES = {
+    'updatable': True,
+    'processing': False,
+    'pending': False,
+    'failed': False,
+    'version': '0.0.21',
+    'changelog': 'changelog',
+    'packageurl': 'https://www.cleep.com/package',
+    'checksumurl': 'https://www.cleep.com/checksum',
+}
+
+def make_module(name, version, updatable=False, update_version=None, changelog=None):
+    return {
+        'updatable': updatable,
+        'processing': False,
+        'pending': False,
+        'name': name,
+        'version': version,
+        'update': {
+            'progress': 0,
+            'eta': None,
+            'failed': False,
+            'version': update_version,
+            'changelog': changelog,
+        },
+    }
+
+MODULES_UPDATES = {
+    'system': make_module('system', '1.0.0', True, '2.0.0', 'system changelog'),
+    'audio': make_module('audio', '1.0.0'),
+    'network': make_module('network', None, False, '1.0.0'),
+}
+
+class TestsStateSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.path, 'update_state.json')
+        self.snapshot = StateSnapshot(FakeFilesystem(), self.snapshot_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _reload(self):
+        return StateSnapshot(FakeFilesystem(), self.snapshot_path)
+
+    def test_save(self):
+        self.snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES, (1000.5, 2048))
+
+        with open(self.snapshot_path) as fd:
+            data = json.load(fd)
+        self.assertEqual(data['format'], StateSnapshot.FORMAT)
+        self.assertEqual(data['cleepversion'], '0.0.20')
+        self.assertEqual(data['cleep'], {
+            'version': '0.0.21',
+            'changelog': 'changelog',
+            'packageurl': 'https://www.cleep.com/package',
+            'checksumurl': 'https://www.cleep.com/checksum',
+        })
+        self.assertEqual(data['installed'], {'system': '1.0.0', 'audio': '1.0.0'})
+        self.assertEqual(data['modules'], {'system': ['2.0.0', 'system changelog']})
+        self.assertEqual(data['modulesjson'], [1000.5, 2048])
+
+    def test_save_cleep_not_updatable(self):
+        cleep_updates = dict(CLEEP_UPDATES)
+        cleep_updates['updatable'] = False
+
+        self.snapshot.save('0.0.20', cleep_updates, MODULES_UPDATES)
+
+        self.assertIsNone(self._reload().get_cleep_updates('0.0.20'))
+
+    def test_save_keeps_previous_modules(self):
+        self.snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES, (1000.5, 2048))
+
+        snapshot = self._reload()
+        snapshot.save('0.0.20', CLEEP_UPDATES)
+
+        modules, up_to_date = self._reload().get_modules_updates({'system': '1.0.0', 'audio': '1.0.0'}, (1000.5, 2048))
+        self.assertEqual(modules, {'system': ('2.0.0', 'system changelog')})
+        self.assertTrue(up_to_date)
+
+    def test_save_error(self):
+        cleep_filesystem = Mock()
+        cleep_filesystem.write_json.return_value = False
+        snapshot = StateSnapshot(cleep_filesystem, self.snapshot_path)
+
+        snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES)
+
+        self.assertEqual(snapshot.get_cleep_updates('0.0.20')['version'], '0.0.21')
+
+    def test_get_cleep_updates(self):
+        self.snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES)
+
+        snapshot = self._reload()
+
+        self.assertEqual(snapshot.get_cleep_updates('0.0.20')['version'], '0.0.21')
+        self.assertIsNone(snapshot.get_cleep_updates('0.0.21'))
+
+    def test_get_modules_updates_installed_version_changed(self):
+        self.snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES, (1000.5, 2048))
+
+        modules, up_to_date = self._reload().get_modules_updates({'system': '2.0.0', 'audio': '1.0.0'}, (1000.5, 2048))
+
+        self.assertEqual(modules, {})
+        self.assertFalse(up_to_date)
+
+    def test_get_modules_updates_module_installed(self):
+        self.snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES, (1000.5, 2048))
+
+        modules, up_to_date = self._reload().get_modules_updates(
+            {'system': '1.0.0', 'audio': '1.0.0', 'network': '1.0.0'},
+            (1000.5, 2048),
+        )
+
+        self.assertEqual(modules, {'system': ('2.0.0', 'system changelog')})
+        self.assertFalse(up_to_date)
+
+    def test_get_modules_updates_modules_json_changed(self):
+        self.snapshot.save('0.0.20', CLEEP_UPDATES, MODULES_UPDATES, (1000.5, 2048))
+
+        modules, up_to_date = self._reload().get_modules_updates({'system': '1.0.0', 'audio': '1.0.0'}, (2000.5, 2048))
+
+        self.assertEqual(modules, {'system': ('2.0.0', 'system changelog')})
+        self.assertFalse(up_to_date)
+
+    def test_no_snapshot(self):
+        self.assertIsNone(self.snapshot.get_cleep_updates('0.0.20'))
+        self.assertEqual(self.snapshot.get_modules_updates({}), ({}, False))
+
+    def test_invalid_snapshot(self):
+        with open(self.snapshot_path, 'w') as fd:
+            json.dump({'format': 0, 'cleepversion': '0.0.20', 'cleep': CLEEP_UPDATES}, fd)
+
+        self.assertIsNone(self.snapshot.get_cleep_updates('0.0.20'))
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_statesnapshot.py; coverage report -m -i
+    unittest.main()
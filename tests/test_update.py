@@ -3,15 +3,18 @@
 import unittest
 import logging
 import sys
+import os
 import copy
+import shutil
+import tempfile
 sys.path.append('../')
-from backend.update import Update
+from backend.update import Update, PATH_INSTALL
 from cleep.exception import InvalidParameter, MissingParameter, CommandError, Unauthorized, CommandInfo
 from cleep.libs.tests import session
 from cleep.common import MessageResponse
 from cleep.libs.internals.installcleep import InstallCleep
 from cleep.libs.internals.install import Install
-from mock import Mock, patch, MagicMock, call, PropertyMock
+from mock import Mock, patch, MagicMock, call, PropertyMock, mock_open
 
 MODULES_JSON = {
     "list": {
@@ -127,8 +130,17 @@ class TestsUpdate(unittest.TestCase):
         if mock_setconfigfield:
             self.module._set_config_field = mock_setconfigfield
 
-        # start module
+        # start module and wait for installed modules to be loaded
         self.session.start_module(self.module)
+        self.module._modules_ready.wait(5.0)
+
+        # no package is downloaded to cache during tests
+        self.module.package_cache.set_max_size(0)
+
+    def test_path_install_matches_core(self):
+        from cleep.libs.internals.installmodule import PATH_INSTALL as CORE_PATH_INSTALL
+
+        self.assertEqual(os.path.normpath(PATH_INSTALL), os.path.normpath(CORE_PATH_INSTALL))
 
     @patch('backend.update.VERSION', '6.6.6')
     def test_configure(self):
@@ -216,92 +228,499 @@ class TestsUpdate(unittest.TestCase):
         self.assertFalse(self.module.update_cleep.called)
         self.assertTrue(self.module.update_modules.called)
 
+    def test_on_event_update_modules_command_info(self):
+        self.init_session()
+        self.module._set_config_field('cleepupdateenabled', False)
+        self.module._set_config_field('modulesupdateenabled', True)
+        self.module.check_cleep_updates = Mock()
+        self.module.check_modules_updates = Mock()
+        self.module.update_modules = Mock(side_effect=CommandInfo('Test info'))
+        self.module.crash_report = Mock()
+        event = {
+            'event': 'parameters.time.now',
+            'params': {
+                'hour': self.module._check_update_time['hour'],
+                'minute': self.module._check_update_time['minute'],
+            },
+        }
+
+        self.module.on_event(event)
+
+        self.assertTrue(self.module.update_modules.called)
+        self.assertFalse(self.module.crash_report.report_exception.called)
+
     def test_get_modules_logs(self):
         self.init_session()
         self.module._get_last_update_logs = Mock(side_effect=[{'dummy': 'dummy'}, {'dummy': 'dummy'}])
         self.module._get_installed_modules_names = Mock(return_value=['system'])
-        
-        with patch('os.listdir', Mock(return_value=['cleep', 'system', 'audio'])):
-            with patch('os.path.exists', Mock(return_value=True)):
-                logs = self.module.get_modules_logs()
-                logging.debug('Logs: %s' % logs)
-                self.assertEqual(sorted(['audio', 'system']), sorted(list(logs.keys())))
-                self.assertTrue('dummy' in logs['system'])
-                self.assertTrue('name' in logs['system'])
-                self.assertTrue('installed' in logs['system'])
-                self.assertTrue(logs['system']['installed'])
-                self.assertFalse(logs['audio']['installed'])
-
-    @patch('os.path.exists', Mock(side_effect=[True, True, True, True, False]))
-    def test_get_modules_logs_no_install_path(self):
-        self.init_session()
-
-        with patch('os.path.exists', Mock(return_value=False)):
-            logs = self.module.get_modules_logs()
-            logging.debug('Logs: %s' % logs)
-            self.assertEqual(logs, {})
+        self.module._logs_index = Mock()
+        self.module._logs_index.get_module_names.return_value = ['cleep', 'system', 'audio']
 
-    def test_get_last_update_logs(self):
+        logs = self.module.get_modules_logs()
+        logging.debug('Logs: %s' % logs)
+        self.assertEqual(sorted(['audio', 'system']), sorted(list(logs.keys())))
+        self.assertTrue('dummy' in logs['system'])
+        self.assertTrue('name' in logs['system'])
+        self.assertTrue('installed' in logs['system'])
+        self.assertTrue(logs['system']['installed'])
+        self.assertFalse(logs['audio']['installed'])
+
+    def test_get_modules_logs_no_logs(self):
         self.init_session()
+        self.module._logs_index = Mock()
+        self.module._logs_index.get_module_names.return_value = []
 
-        # success
-        with patch('os.path.exists', Mock(return_value=True)):
-            with patch('os.path.getmtime', Mock(return_value=666)):
-                logs = self.module._get_last_update_logs('module')
-                logging.debug('Logs: %s' % logs)
-                self.assertEqual(logs['timestamp'], 666)
-                self.assertFalse(logs['failed'])
-                self.assertEqual(logs['path'], '/opt/cleep/install/module/process_success.log')
+        logs = self.module.get_modules_logs()
+        logging.debug('Logs: %s' % logs)
+        self.assertEqual(logs, {})
 
-        # failure
-        with patch('os.path.exists', Mock(side_effect=[False, True])):
-            with patch('os.path.getmtime', Mock(return_value=666)):
-                logs = self.module._get_last_update_logs('module')
-                logging.debug('Logs: %s' % logs)
-                self.assertEqual(logs['timestamp'], 666)
-                self.assertTrue(logs['failed'])
-                self.assertEqual(logs['path'], '/opt/cleep/install/module/process_failure.log')
+    def test_get_last_update_logs(self):
+        self.init_session()
+        self.module._logs_index = Mock()
+        self.module._logs_index.get.return_value = {
+            'timestamp': 666,
+            'path': '/opt/cleep/install/module/process_success.log',
+            'size': 123,
+            'failed': False,
+        }
 
-        # neither success nor failure
-        with patch('os.path.exists', Mock(side_effect=[False, False])):
-            with patch('os.path.getmtime', Mock(return_value=666)):
-                logs = self.module._get_last_update_logs('module')
-                logging.debug('Logs: %s' % logs)
-                self.assertEqual(logs['timestamp'], None)
-                self.assertFalse(logs['failed'])
-                self.assertEqual(logs['path'], None)
+        logs = self.module._get_last_update_logs('module')
+        logging.debug('Logs: %s' % logs)
+        self.module._logs_index.get.assert_called_with('module')
+        self.assertEqual(logs['timestamp'], 666)
+        self.assertFalse(logs['failed'])
+        self.assertEqual(logs['path'], '/opt/cleep/install/module/process_success.log')
 
     def test_get_logs(self):
         self.init_session()
         self.module.cleep_filesystem.read_data = Mock(return_value='hello world')
+        self.module._logs_index = Mock()
 
         # success
-        with patch('os.path.exists', side_effect=[True]):
-            logs = self.module.get_logs('module')
-            logging.debug('Logs: %s' % logs)
-            self.assertEqual(logs, 'hello world')
+        self.module._logs_index.get.return_value = {'timestamp': 666, 'path': '/opt/cleep/install/module/process_success.log', 'size': 11, 'failed': False}
+        logs = self.module.get_logs('module')
+        logging.debug('Logs: %s' % logs)
+        self.assertEqual(logs, 'hello world')
+        self.module.cleep_filesystem.read_data.assert_called_with('/opt/cleep/install/module/process_success.log', encoding='utf8')
 
         # failure
-        with patch('os.path.exists', side_effect=[False, True]):
-            logs = self.module.get_logs('module')
-            logging.debug('Logs: %s' % logs)
-            self.assertEqual(logs, 'hello world')
+        self.module._logs_index.get.return_value = {'timestamp': 666, 'path': '/opt/cleep/install/module/process_failure.log', 'size': 11, 'failed': True}
+        logs = self.module.get_logs('module')
+        logging.debug('Logs: %s' % logs)
+        self.assertEqual(logs, 'hello world')
+        self.module.cleep_filesystem.read_data.assert_called_with('/opt/cleep/install/module/process_failure.log', encoding='utf8')
 
         # neither success nor failure
-        with patch('os.path.exists', side_effect=[False, False]):
-            with self.assertRaises(CommandError) as cm:
-                logs = self.module.get_logs('module')
-            self.assertEqual(str(cm.exception), 'There is no logs for app "module"')
+        self.module._logs_index.get.return_value = None
+        with self.assertRaises(CommandError) as cm:
+            logs = self.module.get_logs('module')
+        self.assertEqual(str(cm.exception), 'There is no logs for app "module"')
 
     def test_get_logs_error_read(self):
         self.init_session()
         self.module.cleep_filesystem.read_data = Mock(return_value=None)
+        self.module._logs_index = Mock()
+        self.module._logs_index.get.return_value = {'timestamp': 666, 'path': '/opt/cleep/install/module/process_success.log', 'size': 11, 'failed': False}
 
-        # success
-        with patch('os.path.exists', side_effect=[True]):
-            with self.assertRaises(CommandError) as cm:
-                logs = self.module.get_logs('module')
-            self.assertEqual(str(cm.exception), 'Error reading app "module" logs file')
+        with self.assertRaises(CommandError) as cm:
+            logs = self.module.get_logs('module')
+        self.assertEqual(str(cm.exception), 'Error reading app "module" logs file')
+
+    def test_get_logs_page(self):
+        self.init_session()
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, 'process_success.log')
+        with open(path, 'wb') as fd:
+            fd.write('0123456789\n'.encode('utf8') * 10)
+        self.module._logs_index = Mock()
+        self.module._logs_index.get.return_value = {'timestamp': 666, 'path': path, 'size': 110, 'failed': False}
+
+        try:
+            page = self.module.get_logs('module', offset=0, limit=20)
+            self.assertEqual(page, {'content': '0123456789\n012345678', 'offset': 0, 'nextoffset': 20, 'size': 110})
+
+            page = self.module.get_logs('module', offset=page['nextoffset'], limit=20)
+            self.assertEqual(page['content'], '9\n0123456789\n0123456')
+            self.assertEqual(page['nextoffset'], 40)
+
+            page = self.module.get_logs('module', offset=100)
+            self.assertEqual(page['content'], '0123456789\n')
+            self.assertEqual(page['nextoffset'], 110)
+
+            page = self.module.get_logs('module', tail=11)
+            self.assertEqual(page, {'content': '0123456789\n', 'offset': 99, 'nextoffset': 110, 'size': 110})
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_get_logs_page_utf8_boundaries(self):
+        self.init_session()
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, 'process_success.log')
+        content = 'h\u00e9llo \u20acuro\n' * 5
+        with open(path, 'wb') as fd:
+            fd.write(content.encode('utf8'))
+        self.module._logs_index = Mock()
+        self.module._logs_index.get.return_value = {'timestamp': 666, 'path': path, 'size': 0, 'failed': False}
+
+        try:
+            logs = ''
+            offset = 0
+            while True:
+                page = self.module.get_logs('module', offset=offset, limit=5)
+                logs += page['content']
+                offset = page['nextoffset']
+                if offset >= page['size']:
+                    break
+            self.assertEqual(logs, content)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_get_logs_page_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_logs('module', offset=-1)
+        self.assertEqual(str(cm.exception), 'Parameter "offset" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_logs('module', limit='hello')
+        self.assertEqual(str(cm.exception), 'Parameter "limit" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_logs('module', tail=True)
+        self.assertEqual(str(cm.exception), 'Parameter "tail" is invalid')
+
+    def test_get_logs_page_error_read(self):
+        self.init_session()
+        self.module._logs_index = Mock()
+        self.module._logs_index.get.return_value = {'timestamp': 666, 'path': '/dummy/process_success.log', 'size': 11, 'failed': False}
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.get_logs('module', offset=0)
+        self.assertEqual(str(cm.exception), 'Error reading app "module" logs file')
+
+    def test_get_logs_history(self):
+        self.init_session()
+        self.module._process_history = Mock()
+        records = [{'timestamp': 666, 'failed': False, 'size': 123}]
+        self.module._process_history.get_records.return_value = records
+
+        self.assertEqual(self.module.get_logs_history('module'), records)
+        self.module._process_history.get_records.assert_called_with('module')
+
+    def test_get_logs_history_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.get_logs_history(None)
+        self.assertEqual(str(cm.exception), 'Parameter "module_name" is missing')
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.get_logs_history('')
+        self.assertEqual(str(cm.exception), 'Parameter "module_name" is missing')
+
+    def test_get_logs_history_entry(self):
+        self.init_session()
+        self.module._process_history = Mock()
+        status = {'status': 2, 'module': 'module', 'process': [], 'stdout': ['info'], 'stderr': []}
+        self.module._process_history.get_record.return_value = status
+
+        self.assertEqual(self.module.get_logs_history_entry('module', 1), status)
+        self.module._process_history.get_record.assert_called_with('module', 1)
+
+    def test_get_logs_history_entry_not_found(self):
+        self.init_session()
+        self.module._process_history = Mock()
+        self.module._process_history.get_record.return_value = None
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.get_logs_history_entry('module', 3)
+        self.assertEqual(str(cm.exception), 'There is no logs history entry for app "module"')
+
+    def test_get_logs_history_entry_error_read(self):
+        self.init_session()
+        self.module._process_history = Mock()
+        self.module._process_history.get_record.side_effect = Exception('Test exception')
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.get_logs_history_entry('module', 0)
+        self.assertEqual(str(cm.exception), 'Error reading app "module" logs history')
+
+    def test_get_logs_history_entry_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.get_logs_history_entry('', 0)
+        self.assertEqual(str(cm.exception), 'Parameter "module_name" is missing')
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.get_logs_history_entry('module', None)
+        self.assertEqual(str(cm.exception), 'Parameter "position" is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_logs_history_entry('module', -1)
+        self.assertEqual(str(cm.exception), 'Parameter "position" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_logs_history_entry('module', '1')
+        self.assertEqual(str(cm.exception), 'Parameter "position" is invalid')
+
+    def test_get_events_stats(self):
+        self.init_session()
+
+        stats = self.module.get_events_stats()
+
+        self.assertTrue(all([key in stats for key in ['sent', 'merged', 'dropped', 'pending']]))
+
+    def test_estimate_duration(self):
+        self.init_session()
+        self.module._durations = Mock()
+        self.module._durations.estimate.return_value = {'samples': 1, 'p50': 10.0, 'p95': 10.0, 'phases': {}}
+
+        estimation = self.module.estimate_duration(Update.ACTION_MODULE_INSTALL, 'mod1')
+
+        self.assertEqual(estimation['p50'], 10.0)
+        self.module._durations.estimate.assert_called_with(Update.ACTION_MODULE_INSTALL, 'mod1')
+
+    def test_estimate_duration_check_params(self):
+        self.init_session()
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.estimate_duration(None, 'mod1')
+        self.assertEqual(str(cm.exception), 'Parameter "action" is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.estimate_duration('dummy', 'mod1')
+        self.assertEqual(str(cm.exception), 'Parameter "action" must be "install", "update" or "uninstall"')
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.estimate_duration(Update.ACTION_MODULE_INSTALL, '')
+        self.assertEqual(str(cm.exception), 'Parameter "module_name" is missing')
+
+    def test_estimate_duration_exception(self):
+        self.init_session()
+        self.module._durations = Mock()
+        self.module._durations.estimate.side_effect = Exception('Test exception')
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.estimate_duration(Update.ACTION_MODULE_INSTALL, 'mod1')
+        self.assertEqual(str(cm.exception), 'Error estimating duration')
+
+    def test_get_update_metrics(self):
+        self.init_session()
+        self.module._modules_json_cache['hits'] = 2
+        self.module.package_cache.hits = 1
+        self.module.package_cache.misses = 3
+        self.module.package_cache.downloaded = 2048
+        self.module._metrics.add_duration('resolve', 0.5)
+        self.module._metrics.add_failure(Update.ACTION_MODULE_INSTALL)
+
+        metrics = self.module.get_update_metrics()
+
+        self.assertEqual(metrics['phases']['resolve']['total'], 0.5)
+        self.assertEqual(metrics['counters']['cachehits'], 3)
+        self.assertEqual(metrics['counters']['cachemisses'], 3)
+        self.assertEqual(metrics['counters']['downloadedbytes'], 2048)
+        self.assertEqual(metrics['failures'], {Update.ACTION_MODULE_INSTALL: 1})
+
+    def test_set_metrics_file(self):
+        self.init_session()
+        self.module._metrics = Mock()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'update.prom')
+            self.module.set_metrics_file(path)
+
+            self.assertEqual(self.module._get_config()['metricsfile'], path)
+            self.assertEqual(self.module._metrics.write_prometheus.call_args[0][0], path)
+
+            self.module._metrics.write_prometheus.reset_mock()
+            self.module.set_metrics_file(None)
+
+            self.assertIsNone(self.module._get_config()['metricsfile'])
+            self.assertFalse(self.module._metrics.write_prometheus.called)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_set_metrics_file_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_metrics_file('update.prom')
+        self.assertEqual(str(cm.exception), 'Parameter "path" must be an absolute path to a .prom file')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_metrics_file('/tmp/update.txt')
+        self.assertEqual(str(cm.exception), 'Parameter "path" must be an absolute path to a .prom file')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_metrics_file('/dummy/dir/update.prom')
+        self.assertEqual(str(cm.exception), 'Directory of "path" does not exist')
+
+    def test_export_metrics_exception(self):
+        self.init_session()
+        self.module._get_config_field = Mock(return_value='/tmp/update.prom')
+        self.module._metrics = Mock()
+        self.module._metrics.write_prometheus.side_effect = Exception('Test exception')
+
+        # should not raise
+        self.module._export_metrics()
+
+        self.assertTrue(self.module._metrics.write_prometheus.called)
+
+    def test_restart_cleep_records_metrics(self):
+        self.init_session()
+        self.module._metrics = Mock()
+        self.module._export_metrics = Mock()
+
+        self.module._restart_cleep(delay=5.0)
+
+        self.module._metrics.add_duration.assert_called_with('restart', 5.0)
+        self.assertTrue(self.module._export_metrics.called)
+
+    def test_get_estimated_duration(self):
+        self.init_session()
+        self.module._durations = Mock()
+        self.module._durations.estimate.side_effect = [{'samples': 1, 'p50': 10.0, 'p95': 10.0, 'phases': {}}, None]
+
+        self.assertEqual(self.module._get_estimated_duration(Update.ACTION_MODULE_INSTALL, 'mod1'), 10.0)
+        self.module._durations.estimate.assert_called_with(Update.ACTION_MODULE_INSTALL, 'mod1', ['install'])
+        self.assertIsNone(self.module._get_estimated_duration(Update.ACTION_MODULE_INSTALL, 'mod1'))
+
+    def test_record_sub_action_duration(self):
+        self.init_session()
+        self.module._durations = Mock()
+        sub_action = {
+            'action': Update.ACTION_MODULE_INSTALL,
+            'module': 'mod1',
+            'infos': {'version': '1.0.0'},
+            'timings': {'resolve': 0.5, 'download': 2.0},
+        }
+
+        with patch.object(self.module, '_Update__running_sub_action', sub_action):
+            self.module._record_sub_action_duration(10.0, 0.25)
+
+        self.module._durations.record.assert_called_with(Update.ACTION_MODULE_INSTALL, 'mod1', '1.0.0', {
+            'resolve': 0.5,
+            'download': 2.0,
+            'install': 10.0,
+            'callback': 0.25,
+        })
+
+    def test_record_sub_action_duration_no_running_sub_action(self):
+        self.init_session()
+        self.module._durations = Mock()
+
+        self.module._record_sub_action_duration(10.0, 0.25)
+
+        self.assertFalse(self.module._durations.record.called)
+
+    def test_record_cleep_update_duration(self):
+        self.init_session()
+        self.module._durations = Mock()
+        self.module._cleep_update_timings = {'version': '0.0.20', 'download': 5.0, 'start': 0}
+
+        self.module._record_cleep_update_duration(0.5)
+
+        self.assertIsNone(self.module._cleep_update_timings)
+        args = self.module._durations.record.call_args[0]
+        self.assertEqual(args[:3], (Update.ACTION_MODULE_UPDATE, 'cleep', '0.0.20'))
+        self.assertEqual(args[3]['download'], 5.0)
+        self.assertEqual(args[3]['callback'], 0.5)
+
+    def test_send_process_event(self):
+        self.init_session()
+        self.module._events_coalescer = Mock()
+        params = {'module': 'mod1', 'status': Install.STATUS_PROCESSING}
+
+        self.module._send_process_event(Update.ACTION_MODULE_UPDATE, params)
+        self.module._events_coalescer.send.assert_called_with(
+            (Update.ACTION_MODULE_UPDATE, 'mod1'),
+            self.module.module_update_event.send,
+            params,
+            False,
+        )
+
+        self.module._send_process_event(Update.ACTION_MODULE_INSTALL, params, terminal=True)
+        self.module._events_coalescer.send.assert_called_with(
+            (Update.ACTION_MODULE_INSTALL, 'mod1'),
+            self.module.module_install_event.send,
+            params,
+            True,
+        )
+
+    def test_send_process_event_unknown_action(self):
+        self.init_session()
+        self.module._events_coalescer = Mock()
+
+        self.module._send_process_event('dummy', {'module': 'mod1', 'status': Install.STATUS_PROCESSING})
+
+        self.assertFalse(self.module._events_coalescer.send.called)
+
+    def test_send_process_event_rate_limited(self):
+        self.init_session()
+        params = {'module': 'mod1', 'status': Install.STATUS_PROCESSING}
+
+        self.module._send_process_event(Update.ACTION_MODULE_INSTALL, params)
+        self.module._send_process_event(Update.ACTION_MODULE_INSTALL, params)
+        self.assertEqual(self.session.event_call_count('update.module.install'), 1)
+
+        self.module._send_process_event(Update.ACTION_MODULE_INSTALL, {'module': 'mod1', 'status': Install.STATUS_DONE}, terminal=True)
+        self.assertEqual(self.session.event_call_count('update.module.install'), 2)
+
+    def test_get_module_output(self):
+        self.init_session()
+        self.module._output_streamer = Mock()
+        lines = [{'output': 'stdout', 'line': 'hello'}]
+        self.module._output_streamer.get_buffer.return_value = lines
+
+        self.assertEqual(self.module.get_module_output('module'), lines)
+        self.module._output_streamer.get_buffer.assert_called_with('module')
+
+    def test_get_module_output_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.get_module_output('')
+        self.assertEqual(str(cm.exception), 'Parameter "module_name" is missing')
+
+    def test_send_module_output(self):
+        self.init_session()
+        lines = [{'output': 'stdout', 'line': 'hello'}]
+
+        self.module._send_module_output('module', lines)
+
+        self.assertEqual(self.session.event_call_count('update.module.output'), 1)
+
+    def test_search_update_logs(self):
+        self.init_session()
+        self.module._process_history = Mock()
+        results = {'results': [], 'truncated': False}
+        self.module._process_history.search.return_value = results
+
+        self.assertEqual(self.module.search_update_logs('error'), results)
+        self.module._process_history.search.assert_called_with('error', None, None, Update.SEARCH_LOGS_MAX_RESULTS)
+
+        self.module.search_update_logs('error', since=666, status='failure')
+        self.module._process_history.search.assert_called_with('error', 666, True, Update.SEARCH_LOGS_MAX_RESULTS)
+
+        self.module.search_update_logs('error', status='success')
+        self.module._process_history.search.assert_called_with('error', None, False, Update.SEARCH_LOGS_MAX_RESULTS)
+
+    def test_search_update_logs_error(self):
+        self.init_session()
+        self.module._process_history = Mock()
+        self.module._process_history.search.side_effect = Exception('Test exception')
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.search_update_logs('error')
+        self.assertEqual(str(cm.exception), 'Error searching logs')
+
+    def test_search_update_logs_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.search_update_logs('')
+        self.assertEqual(str(cm.exception), 'Parameter "query" is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.search_update_logs(['error'])
+        self.assertEqual(str(cm.exception), 'Parameter "query" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.search_update_logs('error', since=-1)
+        self.assertEqual(str(cm.exception), 'Parameter "since" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.search_update_logs('error', status='dummy')
+        self.assertEqual(str(cm.exception), 'Parameter "status" must be "success" or "failure"')
 
     def test_restart_cleep(self):
         mock_restart = self.session.make_mock_command('restart_cleep')
@@ -317,6 +736,119 @@ class TestsUpdate(unittest.TestCase):
         self.module._restart_cleep()
         self.assertEqual(self.session.command_call_count('restart_cleep'), 1)
 
+    def test_get_modules_updates(self):
+        self.init_session()
+
+        self.assertEqual(self.module.get_modules_updates(), self.module._modules_updates.to_dict())
+
+    def test_get_modules_updates_since_revision(self):
+        self.init_session()
+        self.module._fill_modules_updates()
+        revision = self.module._modules_updates.get_snapshot().revision
+        run_id = self.module._run_id
+
+        updates = self.module.get_modules_updates(since_revision=revision, run_id=run_id)
+        self.assertEqual(updates, {'revision': revision, 'runid': run_id, 'full': False, 'modules': {}, 'syncing': False})
+
+        self.module._set_module_process(progress=20, forced_module_name='system')
+        updates = self.module.get_modules_updates(since_revision=revision, run_id=run_id)
+        self.assertEqual(updates['revision'], revision + 1)
+        self.assertFalse(updates['full'])
+        self.assertEqual(list(updates['modules'].keys()), ['system'])
+        self.assertEqual(updates['modules']['system']['update']['progress'], 20)
+
+        updates = self.module.get_modules_updates(since_revision=revision + 1, run_id=run_id)
+        self.assertEqual(updates['modules'], {})
+
+    def test_get_modules_updates_since_revision_full(self):
+        self.init_session()
+        self.module._fill_modules_updates()
+        revision = self.module._modules_updates.get_snapshot().revision
+        run_id = self.module._run_id
+
+        # revision older than last modules updates reset
+        updates = self.module.get_modules_updates(since_revision=revision - 1, run_id=run_id)
+        self.assertTrue(updates['full'])
+        self.assertEqual(updates['modules'], self.module._modules_updates.to_dict())
+
+        # revision greater than current one
+        updates = self.module.get_modules_updates(since_revision=revision + 10, run_id=run_id)
+        self.assertTrue(updates['full'])
+        self.assertEqual(updates['revision'], revision)
+
+        # no run id
+        updates = self.module.get_modules_updates(since_revision=revision)
+        self.assertTrue(updates['full'])
+
+    def test_get_modules_updates_since_revision_after_restart(self):
+        self.init_session()
+        self.module._fill_modules_updates()
+        previous_run_id = self.module._run_id
+        for progress in (10, 20, 30):
+            self.module._set_module_process(progress=progress, forced_module_name='system')
+        client_revision = self.module._modules_updates.get_snapshot().revision
+
+        # module restarts, revisions restart and reach client revision again
+        self.module._on_stop()
+        self.init_session()
+        self.module._fill_modules_updates()
+        revision = self.module._modules_updates.get_snapshot().revision
+        for progress in range(client_revision - revision):
+            self.module._set_module_process(progress=progress + 1, forced_module_name='audio')
+        self.assertNotEqual(self.module._run_id, previous_run_id)
+        self.assertEqual(self.module._modules_updates.get_snapshot().revision, client_revision)
+
+        updates = self.module.get_modules_updates(since_revision=client_revision, run_id=previous_run_id)
+
+        self.assertTrue(updates['full'])
+        self.assertEqual(updates['runid'], self.module._run_id)
+        self.assertEqual(updates['modules'], self.module._modules_updates.to_dict())
+
+    def test_get_modules_updates_since_revision_computed_modules(self):
+        self.init_session()
+        self.module._fill_modules_updates()
+        revision = self.module._modules_updates.get_snapshot().revision
+        self.module._get_module_infos_from_modules_json = Mock(return_value=None)
+
+        changed_modules = self.module._compute_modules_updates()
+
+        updates = self.module.get_modules_updates(since_revision=revision, run_id=self.module._run_id)
+        self.assertEqual(set(updates['modules'].keys()), changed_modules)
+
+    def test_get_modules_updates_returns_published_snapshot(self):
+        self.init_session()
+        self.module._fill_modules_updates()
+        updates = self.module.get_modules_updates()
+
+        self.module._set_module_process(progress=20, forced_module_name='system')
+
+        # previously returned snapshot is not modified
+        self.assertEqual(updates['system']['update']['progress'], 0)
+        self.assertEqual(self.module.get_modules_updates()['system']['update']['progress'], 20)
+        # unchanged modules are shared between snapshots
+        snapshot = self.module._modules_updates.get_snapshot()
+        self.assertIs(snapshot.modules['audio'], self.module._modules_updates['audio']._values)
+
+    def test_set_cleep_updates(self):
+        self.init_session()
+        cleep_updates = self.module.get_cleep_updates()
+
+        self.module._set_cleep_updates(processing=True)
+
+        self.assertFalse(cleep_updates['processing'])
+        self.assertTrue(self.module.get_cleep_updates()['processing'])
+        self.assertIsNot(self.module.get_cleep_updates(), cleep_updates)
+
+    def test_get_modules_updates_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_modules_updates(since_revision=-1)
+        self.assertEqual(str(cm.exception), 'Parameter "since_revision" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_modules_updates(since_revision='1')
+        self.assertEqual(str(cm.exception), 'Parameter "since_revision" is invalid')
+
     def test_get_cleep_updates(self):
         self.init_session()
 
@@ -460,6 +992,160 @@ class TestsUpdate(unittest.TestCase):
             self.module._fill_modules_updates()
         self.assertEqual(str(cm.exception), 'Unable to get modules list from inventory')
 
+    def test_fill_modules_updates_keeps_processing_modules(self):
+        self.init_session()
+        with self.module._modules_updates.writer():
+            installing = self.module._modules_updates.add('dummy', None, '1.0.0')
+            installing.processing = True
+            updating = self.module._modules_updates['system']
+            updating.processing = True
+            updating.progress = 50
+            self.module._modules_updates['audio'].updatable = True
+
+        self.module._fill_modules_updates()
+
+        self.assertIs(self.module._modules_updates['dummy'], installing)
+        self.assertIs(self.module._modules_updates['system'], updating)
+        self.assertEqual(updating.progress, 50)
+        self.assertEqual(updating.version, INVENTORY_GETMODULES['system']['version'])
+        self.assertEqual(self.module._modules_updates.processing, {'dummy', 'system'})
+        self.assertFalse(self.module._modules_updates['audio'].updatable)
+        self.assertTrue('dummy' in self.module.get_modules_updates())
+
+    def test_on_start_computes_local_modules_updates(self):
+        self.init_session()
+        modules_json = copy.deepcopy(MODULES_JSON)
+        modules_json['list']['system']['version'] = '6.6.6'
+        modules_json['list']['system']['changelog'] = 'new version changelog'
+        self.module._get_modules_json = Mock(return_value=modules_json)
+        self.module._use_compact_catalog = False
+        self.module._state_snapshot = Mock()
+        self.module._state_snapshot.get_cleep_updates.return_value = None
+        self.module._state_snapshot.get_modules_updates.return_value = ({}, False)
+
+        self.module._on_start()
+        self.assertTrue(self.module._modules_ready.wait(5.0))
+
+        modules_updates = self.module.get_modules_updates()
+        self.assertTrue(modules_updates['system']['updatable'])
+        self.assertEqual(modules_updates['system']['update']['version'], '6.6.6')
+        self.assertFalse(modules_updates['audio']['updatable'])
+
+    def test_on_start_syncs_inventory_in_background(self):
+        self.init_session()
+        self.module._fill_modules_updates = Mock()
+        self.module._compute_local_modules_updates = Mock()
+
+        self.module._on_start()
+
+        self.assertTrue(self.module._modules_ready.wait(5.0))
+        self.assertFalse(self.module._modules_syncing)
+        self.assertFalse(self.module.get_module_config()['modulessyncing'])
+        self.assertTrue(self.module._fill_modules_updates.called)
+        self.assertTrue(self.module._compute_local_modules_updates.called)
+        self.assertEqual(self.session.event_call_count('update.modules.ready'), 2)
+
+    def test_sync_inventory_retry(self):
+        self.init_session()
+        self.module.INVENTORY_SYNC_RETRY_DELAY = 0.01
+        self.module._fill_modules_updates = Mock(side_effect=[Exception('Test exception'), Exception('Test exception'), None])
+        self.module._compute_local_modules_updates = Mock()
+
+        self.module._sync_inventory()
+
+        self.assertEqual(self.module._fill_modules_updates.call_count, 3)
+        self.assertTrue(self.module._modules_ready.is_set())
+
+    def test_sync_inventory_stopped(self):
+        self.init_session()
+        self.module.INVENTORY_SYNC_RETRY_DELAY = 0.01
+        self.module._fill_modules_updates = Mock(side_effect=Exception('Test exception'))
+        self.module._compute_local_modules_updates = Mock()
+        self.module._modules_ready.clear()
+        self.module._modules_syncing = True
+        self.module._on_stop()
+
+        self.module._sync_inventory()
+
+        self.assertEqual(self.module._fill_modules_updates.call_count, 1)
+        self.assertFalse(self.module._compute_local_modules_updates.called)
+        self.assertFalse(self.module._modules_ready.is_set())
+        self.assertTrue(self.module.get_modules_updates(since_revision=0)['syncing'])
+
+    def test_on_start_restores_cleep_updates(self):
+        self.init_session()
+        self.module._state_snapshot = Mock()
+        self.module._state_snapshot.get_cleep_updates.return_value = {
+            'version': '6.6.6',
+            'changelog': 'changelog',
+            'packageurl': 'https://www.cleep.com/package',
+            'checksumurl': 'https://www.cleep.com/checksum',
+        }
+        self.module._state_snapshot.get_modules_updates.return_value = ({}, True)
+
+        self.module._on_start()
+        self.assertTrue(self.module._modules_ready.wait(5.0))
+
+        cleep_updates = self.module.get_cleep_updates()
+        self.assertTrue(cleep_updates['updatable'])
+        self.assertEqual(cleep_updates['version'], '6.6.6')
+        self.assertEqual(cleep_updates['packageurl'], 'https://www.cleep.com/package')
+
+    def test_sync_inventory_restores_modules_updates(self):
+        self.init_session()
+        self.module._state_snapshot = Mock()
+        self.module._state_snapshot.get_modules_updates.return_value = ({'system': ('6.6.6', 'changelog')}, True)
+        self.module._compute_local_modules_updates = Mock()
+
+        self.module._sync_inventory()
+
+        self.assertFalse(self.module._compute_local_modules_updates.called)
+        modules_updates = self.module.get_modules_updates()
+        self.assertTrue(modules_updates['system']['updatable'])
+        self.assertEqual(modules_updates['system']['update']['version'], '6.6.6')
+        self.assertEqual(modules_updates['system']['update']['changelog'], 'changelog')
+        installed_versions = self.module._state_snapshot.get_modules_updates.call_args[0][0]
+        self.assertEqual(installed_versions['system'], INVENTORY_GETMODULES['system']['version'])
+        self.assertTrue(self.module._state_snapshot.save.called)
+
+    def test_sync_inventory_snapshot_not_up_to_date(self):
+        self.init_session()
+        self.module._state_snapshot = Mock()
+        self.module._state_snapshot.get_modules_updates.return_value = ({}, False)
+        self.module._compute_local_modules_updates = Mock()
+
+        self.module._sync_inventory()
+
+        self.assertTrue(self.module._compute_local_modules_updates.called)
+
+    def test_restore_modules_updates_exception(self):
+        self.init_session()
+        self.module._state_snapshot = Mock()
+        self.module._state_snapshot.get_modules_updates.side_effect = Exception('Test exception')
+
+        self.assertFalse(self.module._restore_modules_updates())
+
+    def test_save_state_snapshot(self):
+        self.init_session()
+        self.module._state_snapshot = Mock()
+
+        self.module._save_state_snapshot()
+        args = self.module._state_snapshot.save.call_args[0]
+        self.assertEqual(args[2], self.module.get_modules_updates())
+
+        self.module._modules_syncing = True
+        self.module._save_state_snapshot()
+        args = self.module._state_snapshot.save.call_args[0]
+        self.assertIsNone(args[2])
+
+    def test_compute_local_modules_updates_invalid_modules_json(self):
+        self.init_session()
+        self.module._get_modules_json = Mock(side_effect=Exception('Test exception'))
+        self.module._use_compact_catalog = False
+
+        # should not raise
+        self.module._compute_local_modules_updates()
+
     def test_execute_main_action_task_install(self):
         self.init_session()
         self.module._install_main_module = Mock()
@@ -594,7 +1280,19 @@ class TestsUpdate(unittest.TestCase):
                         'No more main action to execute, stop all tasks.'
                     )
 
-    def test_execute_main_action_task_set_process_step_single_sub_action(self):
+    def test_execute_main_action_task_unpins_previous_action_packages(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        main_action = {
+            'processing': True
+        }
+        with patch.object(self.module, '_Update__sub_actions', []):
+            with patch.object(self.module, '_Update__main_actions', [main_action]):
+                self.module._execute_main_action_task()
+
+        self.assertTrue(self.module.package_cache.unpin.called)
+
+    def test_execute_main_action_task_start_progress_model_single_sub_action(self):
         self.init_session()
         action_install = {
             'action': Update.ACTION_MODULE_INSTALL,
@@ -608,15 +1306,17 @@ class TestsUpdate(unittest.TestCase):
             'version': '1.0.0',
         }
         self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
         self.module._get_module_infos_from_modules_json = Mock(return_value=infos_mod1)
         with patch.object(self.module, '_Update__main_actions', [action_install]) as mock_mainactions:
             with patch.object(self.module, '_Update__sub_actions', []) as mock_subactions:
                 self.module._execute_main_action_task()
 
                 self.module._set_module_process.assert_called_once_with(progress=0)
-                self.assertEqual(mock_subactions[0]['progressstep'], 100)
+                steps = self.module._progress_model.start.call_args[0][0]
+                self.assertEqual([step['module'] for step in steps], ['mod1'])
 
-    def test_execute_main_action_task_set_process_step_three_sub_actions(self):
+    def test_execute_main_action_task_start_progress_model_three_sub_actions(self):
         self.init_session()
         action_install = {
             'action': Update.ACTION_MODULE_INSTALL,
@@ -640,15 +1340,96 @@ class TestsUpdate(unittest.TestCase):
             'version': '0.0.0',
         }
         self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
         self.module._get_module_infos_from_modules_json = Mock(side_effect=[infos_mod1, infos_mod2, infos_mod3])
         with patch.object(self.module, '_Update__main_actions', [action_install]) as mock_mainactions:
             with patch.object(self.module, '_Update__sub_actions', []) as mock_subactions:
                 self.module._execute_main_action_task()
 
                 self.module._set_module_process.assert_called_once_with(progress=0)
-                self.assertEqual(mock_subactions[0]['progressstep'], 33)
-                self.assertEqual(mock_subactions[1]['progressstep'], 33)
-                self.assertEqual(mock_subactions[2]['progressstep'], 33)
+                steps = self.module._progress_model.start.call_args[0][0]
+                # sub actions are executed from the end of the list
+                self.assertEqual([step['module'] for step in steps], ['mod3', 'mod2', 'mod1'])
+
+    def test_stage_sub_actions_packages(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.max_size = 10000
+        self.module.package_cache.fetch.return_value = '/opt/cleep/cache/packages/123456'
+        self.module._package_server = Mock()
+        self.module._package_server.get_url.return_value = 'http://127.0.0.1:8000/123456'
+        sub_actions = [
+            {'action': Update.ACTION_MODULE_INSTALL, 'module': 'mod1', 'infos': {'download': 'http://dummy.com/mod1.zip', 'sha256': '123456', 'size': 1000}},
+            {'action': Update.ACTION_MODULE_UNINSTALL, 'module': 'mod2', 'infos': {'download': 'http://dummy.com/mod2.zip', 'sha256': '654321'}},
+            {'action': Update.ACTION_MODULE_INSTALL, 'module': 'mod3', 'infos': None},
+        ]
+        with patch.object(self.module, '_Update__sub_actions', sub_actions):
+            self.module._stage_sub_actions_packages()
+
+        self.module.package_cache.fetch.assert_called_once_with('http://dummy.com/mod1.zip', '123456', size=1000)
+        self.module._package_server.get_url.assert_called_once_with('/opt/cleep/cache/packages/123456')
+        self.module.package_cache.pin.assert_called_once_with('123456')
+        self.assertEqual(sub_actions[0]['infos']['download'], 'http://127.0.0.1:8000/123456')
+        self.assertEqual(sub_actions[1]['infos']['download'], 'http://dummy.com/mod2.zip')
+
+    def test_stage_sub_actions_packages_exceed_cache_size(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.max_size = 1500
+        sub_actions = [
+            {'action': Update.ACTION_MODULE_INSTALL, 'module': 'mod1', 'infos': {'download': 'http://dummy.com/mod1.zip', 'sha256': '123456', 'size': 1000}},
+            {'action': Update.ACTION_MODULE_UPDATE, 'module': 'mod2', 'infos': {'download': 'http://dummy.com/mod2.zip', 'sha256': '654321', 'size': 1000}},
+        ]
+        with patch.object(self.module, '_Update__sub_actions', sub_actions):
+            self.module._stage_sub_actions_packages()
+
+        self.assertFalse(self.module.package_cache.fetch.called)
+        self.assertEqual(sub_actions[0]['infos']['download'], 'http://dummy.com/mod1.zip')
+        self.assertEqual(sub_actions[1]['infos']['download'], 'http://dummy.com/mod2.zip')
+
+    def test_stage_sub_actions_packages_cache_disabled(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = False
+        sub_actions = [
+            {'action': Update.ACTION_MODULE_INSTALL, 'module': 'mod1', 'infos': {'download': 'http://dummy.com/mod1.zip', 'sha256': '123456'}},
+        ]
+        with patch.object(self.module, '_Update__sub_actions', sub_actions):
+            self.module._stage_sub_actions_packages()
+
+        self.assertFalse(self.module.package_cache.fetch.called)
+
+    def test_execute_main_action_task_staging_failed(self):
+        self.init_session()
+        action_install = {
+            'action': Update.ACTION_MODULE_INSTALL,
+            'processing': False,
+            'module': 'mod1',
+            'extra': None,
+        }
+        infos_mod1 = {
+            'loadedby': [],
+            'deps': [],
+            'version': '1.0.0',
+            'download': 'http://dummy.com/mod1.zip',
+            'sha256': '123456',
+        }
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.max_size = 10000
+        self.module.package_cache.fetch.side_effect = Exception('Test exception')
+        self.module._set_module_process = Mock()
+        self.module._get_module_infos_from_modules_json = Mock(return_value=infos_mod1)
+        self.module.module_install_event = Mock()
+        with patch.object(self.module, '_Update__main_actions', [action_install]):
+            with patch.object(self.module, '_Update__sub_actions', []):
+                self.module._execute_main_action_task()
+
+                self.module._set_module_process.assert_called_once_with(failed=True)
+                self.module.module_install_event.send.assert_called_with({'module': 'mod1', 'status': Install.STATUS_ERROR})
+                self.assertTrue(self.module.package_cache.unpin.called)
 
     def test_execute_main_action_exception_wo_action(self):
         self.init_session()
@@ -748,11 +1529,13 @@ class TestsUpdate(unittest.TestCase):
             'main': 'mod1',
             'infos': {},
             'extra': None,
-            'progressstep': 12,
         }
 
         self.module._is_module_process_failed = Mock(return_value=False)
         self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
+        self.module._progress_model.get_progress.return_value = 12
+        self.module._progress_model.get_eta.return_value = 30
         self.module._install_module = Mock()
         self.module._uninstall_module = Mock()
         self.module._update_module = Mock()
@@ -764,7 +1547,8 @@ class TestsUpdate(unittest.TestCase):
             self.assertFalse(self.module._uninstall_module.called)
             self.assertFalse(self.module._update_module.called)
             self.assertEqual(len(mock_sub_actions), 0)
-            self.module._set_module_process.assert_called_once_with(inc_progress=12)
+            self.module._progress_model.start_step.assert_called_once_with()
+            self.module._set_module_process.assert_called_once_with(progress=12, eta=30)
 
     def test_execute_sub_action_task_uninstall(self):
         self.init_session()
@@ -774,11 +1558,13 @@ class TestsUpdate(unittest.TestCase):
             'main': 'mod1',
             'infos': {},
             'extra': {'force': True},
-            'progressstep': 12,
         }
 
         self.module._is_module_process_failed = Mock(return_value=False)
         self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
+        self.module._progress_model.get_progress.return_value = 12
+        self.module._progress_model.get_eta.return_value = 30
         self.module._install_module = Mock()
         self.module._uninstall_module = Mock()
         self.module._update_module = Mock()
@@ -790,7 +1576,8 @@ class TestsUpdate(unittest.TestCase):
             self.assertTrue(self.module._uninstall_module.called)
             self.assertFalse(self.module._update_module.called)
             self.assertEqual(len(mock_sub_actions), 0)
-            self.module._set_module_process.assert_called_once_with(inc_progress=12)
+            self.module._progress_model.start_step.assert_called_once_with()
+            self.module._set_module_process.assert_called_once_with(progress=12, eta=30)
 
     def test_execute_sub_action_task_update(self):
         self.init_session()
@@ -800,11 +1587,13 @@ class TestsUpdate(unittest.TestCase):
             'main': 'mod1',
             'infos': {},
             'extra': None,
-            'progressstep': 12,
         }
 
         self.module._is_module_process_failed = Mock(return_value=False)
         self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
+        self.module._progress_model.get_progress.return_value = 12
+        self.module._progress_model.get_eta.return_value = 30
         self.module._install_module = Mock()
         self.module._uninstall_module = Mock()
         self.module._update_module = Mock()
@@ -816,7 +1605,8 @@ class TestsUpdate(unittest.TestCase):
             self.assertFalse(self.module._uninstall_module.called)
             self.assertTrue(self.module._update_module.called)
             self.assertEqual(len(mock_sub_actions), 0)
-            self.module._set_module_process.assert_called_once_with(inc_progress=12)
+            self.module._progress_model.start_step.assert_called_once_with()
+            self.module._set_module_process.assert_called_once_with(progress=12, eta=30)
 
     def test_execute_sub_action_task_already_running(self):
         self.init_session()
@@ -826,7 +1616,6 @@ class TestsUpdate(unittest.TestCase):
             'main': 'mod1',
             'infos': {},
             'extra': None,
-            'progressstep': 100,
         }
 
         self.module._is_module_process_failed = Mock(return_value=False)
@@ -852,7 +1641,6 @@ class TestsUpdate(unittest.TestCase):
             'main': 'mod1',
             'infos': {},
             'extra': None,
-            'progressstep': 100,
         }
 
         self.module._is_module_process_failed = Mock(return_value=True)
@@ -915,68 +1703,26 @@ class TestsUpdate(unittest.TestCase):
             'module': 'mod1',
             'extra': None,
         }
-        action_uninstall = {
-            'action': Update.ACTION_MODULE_UNINSTALL,
-            'processing': False,
-            'module': 'mod2',
-            'extra': {'force': True},
-        }
-        action_update = {
-            'action': Update.ACTION_MODULE_UPDATE,
-            'processing': False,
-            'module': 'mod3',
-            'extra': None,
-        }
-
-        with patch.object(self.module, '_Update__main_actions', [action_install, action_uninstall, action_update]) as mock_main_actions:
-            self.assertEqual(self.module._get_processing_module_name(), None)
-
-    def test_set_module_process_update_progress(self):
-        self.init_session()
-        self.module._get_processing_module_name = Mock(return_value='mod1')
-        self.module._modules_updates = {
-            'mod1': {
-                'processing': False,
-                'name': 'mod1',
-                'version': '0.0.0',
-                'updatable': False,
-                'update': {
-                    'changelog': 'changelog',
-                    'version': None,
-                    'progress': 0,
-                    'failed': False,
-                }
-            },
-        }
-        self.module._set_module_process(progress=15)
-        self.assertEqual(self.module._modules_updates['mod1']['processing'], True)
-        self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 15)
-
-    def test_set_module_process_update_progress_greater_100(self):
-        self.init_session()
-        self.module._get_processing_module_name = Mock(return_value='mod1')
-        self.module._modules_updates = {
-            'mod1': {
-                'processing': False,
-                'name': 'mod1',
-                'version': '0.0.0',
-                'updatable': False,
-                'update': {
-                    'changelog': 'changelog',
-                    'version': None,
-                    'progress': 0,
-                    'failed': False,
-                }
-            },
-        }
-        self.module._set_module_process(progress=150)
-        self.assertEqual(self.module._modules_updates['mod1']['processing'], True)
-        self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 100)
+        action_uninstall = {
+            'action': Update.ACTION_MODULE_UNINSTALL,
+            'processing': False,
+            'module': 'mod2',
+            'extra': {'force': True},
+        }
+        action_update = {
+            'action': Update.ACTION_MODULE_UPDATE,
+            'processing': False,
+            'module': 'mod3',
+            'extra': None,
+        }
+
+        with patch.object(self.module, '_Update__main_actions', [action_install, action_uninstall, action_update]) as mock_main_actions:
+            self.assertEqual(self.module._get_processing_module_name(), None)
 
-    def test_set_module_process_update_inc_progress(self):
+    def test_set_module_process_update_progress(self):
         self.init_session()
         self.module._get_processing_module_name = Mock(return_value='mod1')
-        self.module._modules_updates = {
+        self.module._modules_updates.load({
             'mod1': {
                 'processing': False,
                 'name': 'mod1',
@@ -985,20 +1731,19 @@ class TestsUpdate(unittest.TestCase):
                 'update': {
                     'changelog': 'changelog',
                     'version': None,
-                    'progress': 10,
+                    'progress': 0,
                     'failed': False,
                 }
             },
-        }
-        self.module._set_module_process(inc_progress=10)
+        })
+        self.module._set_module_process(progress=15)
         self.assertEqual(self.module._modules_updates['mod1']['processing'], True)
-        self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 20)
+        self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 15)
 
-    def test_set_module_process_update_inc_progress_greater_100(self):
+    def test_set_module_process_update_progress_greater_100(self):
         self.init_session()
         self.module._get_processing_module_name = Mock(return_value='mod1')
-        self.module._get_module_infos_from_modules_json = Mock(return_value=MODULES_JSON['list']['system'])
-        self.module._modules_updates = {
+        self.module._modules_updates.load({
             'mod1': {
                 'processing': False,
                 'name': 'mod1',
@@ -1007,12 +1752,12 @@ class TestsUpdate(unittest.TestCase):
                 'update': {
                     'changelog': 'changelog',
                     'version': None,
-                    'progress': 90,
+                    'progress': 0,
                     'failed': False,
                 }
             },
-        }
-        self.module._set_module_process(inc_progress=30)
+        })
+        self.module._set_module_process(progress=150)
         self.assertEqual(self.module._modules_updates['mod1']['processing'], True)
         self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 100)
 
@@ -1020,7 +1765,7 @@ class TestsUpdate(unittest.TestCase):
         self.init_session()
         self.module._get_processing_module_name = Mock(return_value='mod1')
         self.module._get_module_infos_from_modules_json = Mock(return_value=MODULES_JSON['list']['system'])
-        self.module._modules_updates = {
+        self.module._modules_updates.load({
             'mod1': {
                 'processing': False,
                 'name': 'mod1',
@@ -1033,7 +1778,7 @@ class TestsUpdate(unittest.TestCase):
                     'failed': False,
                 }
             },
-        }
+        })
         self.module._set_module_process(failed=True)
         self.assertEqual(self.module._modules_updates['mod1']['processing'], True)
         self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 100)
@@ -1042,7 +1787,7 @@ class TestsUpdate(unittest.TestCase):
     def test_set_module_process_update_no_action_running(self):
         self.init_session()
         self.module._get_processing_module_name = Mock(return_value=None)
-        self.module._modules_updates = {
+        self.module._modules_updates.load({
             'mod1': {
                 'processing': False,
                 'name': 'mod1',
@@ -1055,7 +1800,7 @@ class TestsUpdate(unittest.TestCase):
                     'failed': False,
                 }
             },
-        }
+        })
         self.module._set_module_process(failed=True)
         self.assertEqual(self.module._modules_updates['mod1']['processing'], False)
 
@@ -1063,7 +1808,7 @@ class TestsUpdate(unittest.TestCase):
         self.init_session()
         self.module._get_processing_module_name = Mock(return_value='mod1')
         self.module._get_module_infos_from_modules_json = Mock(return_value=MODULES_JSON['list']['system'])
-        self.module._modules_updates = {
+        self.module._modules_updates.load({
             'mod2': {
                 'processing': False,
                 'name': 'mod1',
@@ -1076,13 +1821,72 @@ class TestsUpdate(unittest.TestCase):
                     'failed': False,
                 }
             },
-        }
+        })
 
-        self.module._set_module_process(inc_progress=15)
+        self.module._set_module_process(progress=15)
         self.assertEqual(self.module._modules_updates['mod1']['processing'], True)
         self.assertEqual(self.module._modules_updates['mod1']['update']['progress'], 15)
         self.assertEqual(self.module._modules_updates['mod1']['update']['version'], MODULES_JSON['list']['system']['version'])
 
+    def test_set_module_process_update_eta(self):
+        self.init_session()
+        self.module._get_processing_module_name = Mock(return_value='system')
+
+        self.module._set_module_process(progress=15.5, eta=30)
+        self.assertEqual(self.module._modules_updates['system']['update']['progress'], 15.5)
+        self.assertEqual(self.module._modules_updates['system']['update']['eta'], 30)
+
+        self.module._set_module_process(pending=True)
+        self.assertIsNone(self.module._modules_updates['system']['update']['eta'])
+
+    def test_update_module_progress(self):
+        self.init_session()
+        self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
+        self.module._progress_model.get_progress.return_value = 42.5
+        self.module._progress_model.get_eta.return_value = 12
+
+        self.module._update_module_progress(pending=True)
+
+        self.module._set_module_process.assert_called_once_with(progress=42.5, eta=12, pending=True)
+
+    def test_get_sub_action_package_size(self):
+        self.init_session()
+        self.module._progress_model = Mock()
+        self.module._progress_model.get_package_size.return_value = 2048
+        sub_action = {
+            'action': Update.ACTION_MODULE_INSTALL,
+            'module': 'mod1',
+            'infos': {'download': 'https://www.cleep.com/mod1.zip'},
+        }
+
+        self.assertEqual(self.module._get_sub_action_package_size(sub_action), 2048)
+        self.module._progress_model.get_package_size.assert_called_once_with('https://www.cleep.com/mod1.zip')
+
+    def test_get_sub_action_package_size_from_infos(self):
+        self.init_session()
+        self.module._progress_model = Mock()
+        sub_action = {
+            'action': Update.ACTION_MODULE_UPDATE,
+            'module': 'mod1',
+            'infos': {'download': 'https://www.cleep.com/mod1.zip', 'size': 1024},
+        }
+
+        self.assertEqual(self.module._get_sub_action_package_size(sub_action), 1024)
+        self.assertFalse(self.module._progress_model.get_package_size.called)
+
+    def test_get_sub_action_package_size_uninstall(self):
+        self.init_session()
+        self.module._progress_model = Mock()
+        sub_action = {
+            'action': Update.ACTION_MODULE_UNINSTALL,
+            'module': 'mod1',
+            'infos': {'download': 'https://www.cleep.com/mod1.zip'},
+        }
+
+        self.assertIsNone(self.module._get_sub_action_package_size(sub_action))
+        self.assertFalse(self.module._progress_model.get_package_size.called)
+
     def test_is_module_process_failed_return_false(self):
         mock_getmodules = self.session.make_mock_command('get_modules', data=INVENTORY_GETMODULES)
         self.init_session(mock_commands=[mock_getmodules])
@@ -1148,6 +1952,152 @@ class TestsUpdate(unittest.TestCase):
             self.module.set_automatic_update(True, 666)
         self.assertEqual(str(cm.exception), 'Parameter "modules_update_enabled" is invalid')
 
+    def test_set_package_cache_size(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+
+        self.module.set_package_cache_size(1024)
+
+        self.assertEqual(self.module._get_config()['packagecachesize'], 1024)
+        self.module.package_cache.set_max_size.assert_called_with(1024)
+        self.assertTrue(self.module.package_cache.get_stats.called)
+
+    def test_set_package_cache_size_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.set_package_cache_size(None)
+        self.assertEqual(str(cm.exception), 'Parameter "size" is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_package_cache_size(-1)
+        self.assertEqual(str(cm.exception), 'Parameter "size" is invalid')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_package_cache_size('hello')
+        self.assertEqual(str(cm.exception), 'Parameter "size" is invalid')
+
+    def test_is_compact_catalog_enabled(self):
+        self.init_session()
+        self.module._get_total_memory = Mock(return_value=512 * 1024 * 1024)
+
+        self.assertTrue(self.module._is_compact_catalog_enabled(None))
+        self.assertFalse(self.module._is_compact_catalog_enabled(False))
+        self.module._get_total_memory.return_value = 4 * 1024 * 1024 * 1024
+        self.assertFalse(self.module._is_compact_catalog_enabled(None))
+        self.assertTrue(self.module._is_compact_catalog_enabled(True))
+        # unknown memory size
+        self.module._get_total_memory.return_value = 0
+        self.assertFalse(self.module._is_compact_catalog_enabled(None))
+
+    def test_set_compact_catalog(self):
+        self.init_session()
+        self.module._get_total_memory = Mock(return_value=512 * 1024 * 1024)
+        self.module._close_compact_catalog = Mock()
+
+        self.assertTrue(self.module.set_compact_catalog(True))
+        self.assertTrue(self.module._use_compact_catalog)
+        self.assertEqual(self.module._get_config()['compactcatalog'], True)
+        self.assertFalse(self.module._close_compact_catalog.called)
+
+        self.assertFalse(self.module.set_compact_catalog(False))
+        self.assertFalse(self.module._use_compact_catalog)
+        self.assertEqual(self.module._get_config()['compactcatalog'], False)
+        self.assertTrue(self.module._close_compact_catalog.called)
+
+        self.assertTrue(self.module.set_compact_catalog(None))
+        self.assertIsNone(self.module._get_config()['compactcatalog'])
+
+    def test_set_compact_catalog_invalid_parameters(self):
+        self.init_session()
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_compact_catalog('hello')
+        self.assertEqual(str(cm.exception), 'Parameter "enabled" is invalid')
+
+    def test_get_cached_module_infos(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.fetch.return_value = '/opt/cleep/cache/packages/123456'
+        self.module._package_server = Mock()
+        self.module._package_server.is_url.return_value = False
+        self.module._package_server.get_url.return_value = 'http://127.0.0.1:8000/123456'
+        infos = {'download': 'http://dummy.com/dummy.zip', 'sha256': '123456', 'size': 1000}
+
+        cached_infos = self.module._get_cached_module_infos('dummy', infos)
+
+        self.module.package_cache.fetch.assert_called_with('http://dummy.com/dummy.zip', '123456', size=1000)
+        self.module._package_server.get_url.assert_called_with('/opt/cleep/cache/packages/123456')
+        self.assertEqual(cached_infos['download'], 'http://127.0.0.1:8000/123456')
+        self.assertEqual(infos['download'], 'http://dummy.com/dummy.zip')
+
+    def test_get_cached_module_infos_already_staged(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module._package_server = Mock()
+        self.module._package_server.is_url.return_value = True
+        infos = {'download': 'http://127.0.0.1:8000/123456', 'sha256': '123456'}
+
+        cached_infos = self.module._get_cached_module_infos('dummy', infos)
+
+        self.assertFalse(self.module.package_cache.fetch.called)
+        self.assertEqual(cached_infos, infos)
+
+    def test_get_cached_module_infos_cache_disabled(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = False
+        infos = {'download': 'http://dummy.com/dummy.zip', 'sha256': '123456'}
+
+        cached_infos = self.module._get_cached_module_infos('dummy', infos)
+
+        self.assertFalse(self.module.package_cache.fetch.called)
+        self.assertEqual(cached_infos, infos)
+
+    def test_get_cached_module_infos_fetch_failed(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.fetch.side_effect = Exception('Test exception')
+        infos = {'download': 'http://dummy.com/dummy.zip', 'sha256': '123456'}
+
+        cached_infos = self.module._get_cached_module_infos('dummy', infos)
+
+        self.assertEqual(cached_infos, infos)
+
+    def test_get_cached_cleep_package_url(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.fetch_checksum.return_value = '123456'
+        self.module.package_cache.fetch.return_value = '/opt/cleep/cache/packages/123456'
+        self.module._package_server = Mock()
+        self.module._package_server.get_url.return_value = 'http://127.0.0.1:8000/123456'
+
+        url = self.module._get_cached_cleep_package_url('http://dummy.com/cleep.deb', 'http://dummy.com/cleep.sha256')
+
+        self.module.package_cache.fetch.assert_called_with('http://dummy.com/cleep.deb', '123456', None)
+        self.module._package_server.get_url.assert_called_with('/opt/cleep/cache/packages/123456')
+        self.assertEqual(url, 'http://127.0.0.1:8000/123456')
+
+    def test_get_cached_cleep_package_url_fetch_failed(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+        self.module.package_cache.is_enabled.return_value = True
+        self.module.package_cache.fetch_checksum.side_effect = Exception('Test exception')
+
+        url = self.module._get_cached_cleep_package_url('http://dummy.com/cleep.deb', 'http://dummy.com/cleep.sha256')
+
+        self.assertEqual(url, 'http://dummy.com/cleep.deb')
+
+    def test_on_stop_flushes_package_cache(self):
+        self.init_session()
+        self.module.package_cache = Mock()
+
+        self.module._on_stop()
+
+        self.assertTrue(self.module.package_cache.flush.called)
+
     def test_get_module_infos_from_modules_json(self):
         self.init_session()
         self.module.modules_json = Mock()
@@ -1178,8 +2128,80 @@ class TestsUpdate(unittest.TestCase):
         infos = self.module._get_module_infos_from_modules_json('dummy')
         self.assertIsNone(infos)
 
+    def test_get_module_infos_from_modules_json_compact_catalog(self):
+        self.init_session()
+        self.module.modules_json = Mock()
+        self.module.modules_json.get_json = Mock(return_value=MODULES_JSON)
+        self.module._use_compact_catalog = True
+        self.module._get_modules_json_signature = Mock(return_value=(666, 123))
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            with patch.object(self.module, 'COMPACT_CATALOG_PATH', os.path.join(tmp_dir, 'catalog.bin')):
+                self.assertEqual(self.module._get_module_infos_from_modules_json('system'), MODULES_JSON['list']['system'])
+                self.assertIsNone(self.module._get_module_infos_from_modules_json('dummy'))
+                self.assertEqual(self.module.modules_json.get_json.call_count, 1)
+
+                # modules.json changed, catalog is rebuilt
+                self.module._get_modules_json_signature.return_value = (667, 123)
+                self.module._get_module_infos_from_modules_json('system')
+                self.assertEqual(self.module.modules_json.get_json.call_count, 2)
+        finally:
+            self.module._close_compact_catalog()
+            shutil.rmtree(tmp_dir)
+
+    def test_get_modules_json_cached(self):
+        self.init_session()
+        self.module.modules_json = Mock()
+        self.module.modules_json.get_json = Mock(return_value=MODULES_JSON)
+        self.module._get_modules_json_signature = Mock(return_value=(666, 123))
+
+        self.assertEqual(self.module._get_modules_json(), MODULES_JSON)
+        self.assertEqual(self.module._get_modules_json(), MODULES_JSON)
+
+        self.assertEqual(self.module.modules_json.get_json.call_count, 1)
+        stats = self.module.get_cache_stats()
+        self.assertEqual(stats['modulesjson']['hits'], 1)
+        self.assertEqual(stats['modulesjson']['misses'], 1)
+        self.assertEqual(stats['modulesjson']['update'], MODULES_JSON['update'])
+
+    def test_get_modules_json_file_changed(self):
+        self.init_session()
+        self.module.modules_json = Mock()
+        self.module.modules_json.get_json = Mock(return_value=MODULES_JSON)
+        self.module._get_modules_json_signature = Mock(side_effect=[(666, 123), (667, 123), (667, 124), None, None])
+
+        for _ in range(5):
+            self.module._get_modules_json()
+
+        self.assertEqual(self.module.modules_json.get_json.call_count, 5)
+        stats = self.module.get_cache_stats()
+        self.assertEqual(stats['modulesjson']['hits'], 0)
+        self.assertEqual(stats['modulesjson']['misses'], 5)
+
+    def test_get_modules_json_invalidated(self):
+        self.init_session()
+        self.module.modules_json = Mock()
+        self.module.modules_json.get_json = Mock(return_value=MODULES_JSON)
+        self.module._get_modules_json_signature = Mock(return_value=(666, 123))
+
+        self.module._get_modules_json()
+        self.module._invalidate_modules_json_cache()
+        self.module._get_modules_json()
+
+        self.assertEqual(self.module.modules_json.get_json.call_count, 2)
+
+    def test_get_total_memory(self):
+        self.init_session()
+
+        with patch('builtins.open', mock_open(read_data='MemTotal:         949448 kB\nMemFree:          115508 kB\n')):
+            self.assertEqual(self.module._get_total_memory(), 949448 * 1024)
+        with patch('builtins.open', Mock(side_effect=Exception('Test exception'))):
+            self.assertEqual(self.module._get_total_memory(), 0)
+
+    @patch('backend.update.ConditionalRequest', Mock())
     @patch('backend.update.ModulesJson')
     def test_check_modules_updates_modules_json_not_updated(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
         mock_modulesjson.return_value.get_json.return_value = MODULES_JSON
         mock_modulesjson.return_value.update.return_value = False
         self.init_session()
@@ -1190,8 +2212,10 @@ class TestsUpdate(unittest.TestCase):
         self.assertFalse(updates['modulesjsonupdated'])
         self.assertTrue('moduleslastcheck' in updates)
 
+    @patch('backend.update.ConditionalRequest', Mock())
     @patch('backend.update.ModulesJson')
     def test_check_modules_updates_modules_json_updated_with_no_module_update(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
         mock_modulesjson.return_value.get_json.return_value = MODULES_JSON
         mock_modulesjson.return_value.update.return_value = True
         self.init_session()
@@ -1202,8 +2226,10 @@ class TestsUpdate(unittest.TestCase):
         self.assertTrue(updates['modulesjsonupdated'])
         self.assertTrue('moduleslastcheck' in updates)
 
+    @patch('backend.update.ConditionalRequest', Mock())
     @patch('backend.update.ModulesJson')
     def test_check_modules_updates_modules_json_updated_with_module_update(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
         modules_json = copy.deepcopy(MODULES_JSON)
         version = '6.6.6'
         changelog = 'new version changelog'
@@ -1228,8 +2254,129 @@ class TestsUpdate(unittest.TestCase):
         self.assertEqual(modules_updates['system']['update']['changelog'], changelog)
         self.assertEqual(modules_updates['system']['update']['version'], version)
         
+    @patch('backend.update.ModulesJson')
+    def test_check_modules_updates_modules_json_not_modified(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
+        mock_modulesjson.return_value.get_json.return_value = MODULES_JSON
+        self.init_session()
+        self.module._get_modules_json_signature = Mock(return_value=(666, 123))
+        request = Mock()
+        request.is_modified.return_value = False
+        self.module._get_modules_json_request = Mock(return_value=request)
+
+        updates = self.module.check_modules_updates()
+
+        self.assertFalse(request.reset.called)
+        self.assertFalse(mock_modulesjson.return_value.update.called)
+        self.assertFalse(request.commit.called)
+        self.assertFalse(updates['modulesupdates'])
+        self.assertFalse(updates['modulesjsonupdated'])
+
+    @patch('backend.update.ModulesJson')
+    def test_check_modules_updates_modules_json_modified(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
+        mock_modulesjson.return_value.get_json.return_value = MODULES_JSON
+        mock_modulesjson.return_value.update.return_value = True
+        self.init_session()
+        request = Mock(url='http://dummy.com/modules.json')
+        request.is_modified.return_value = True
+        request.get_validators.return_value = {'etag': '"123"', 'lastmodified': None}
+        self.module._get_modules_json_request = Mock(return_value=request)
+
+        updates = self.module.check_modules_updates()
+
+        self.assertTrue(mock_modulesjson.return_value.update.called)
+        self.assertTrue(request.commit.called)
+        self.assertEqual(self.module._get_config()['modulesjsonvalidators'], {
+            'etag': '"123"',
+            'lastmodified': None,
+            'url': 'http://dummy.com/modules.json',
+        })
+        self.assertTrue(updates['modulesjsonupdated'])
+
+    @patch('backend.update.ModulesJson')
+    def test_check_modules_updates_modules_json_missing(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
+        mock_modulesjson.return_value.get_json.return_value = MODULES_JSON
+        self.init_session()
+        request = Mock()
+        request.is_modified.return_value = True
+        request.get_validators.return_value = {}
+        self.module._get_modules_json_request = Mock(return_value=request)
+
+        self.module.check_modules_updates()
+
+        self.assertTrue(request.reset.called)
+        self.assertTrue(mock_modulesjson.return_value.update.called)
+
+    @patch('backend.update.ConditionalRequest')
+    @patch('backend.update.ModulesJson')
+    def test_get_modules_json_request(self, mock_modulesjson, mock_conditionalrequest):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
+        mock_modulesjson.return_value.remote_url_version = 'http://dummy.com/v1/modules.json'
+        mock_conditionalrequest.side_effect = lambda url, validators: Mock(url=url, validators=validators)
+        self.init_session()
+        self.module._set_config_field('modulesjsonvalidators', {'etag': '"123"', 'lastmodified': None, 'url': 'http://dummy.com/v1/modules.json'})
+
+        request = self.module._get_modules_json_request()
+        self.assertEqual(request.url, 'http://dummy.com/v1/modules.json')
+        self.assertEqual(request.validators['etag'], '"123"')
+        self.assertIs(self.module._get_modules_json_request(), request)
+
+        # url changed, validators of previous url are dropped
+        mock_modulesjson.return_value.remote_url_version = 'http://dummy.com/v2/modules.json'
+        request = self.module._get_modules_json_request()
+        self.assertEqual(request.url, 'http://dummy.com/v2/modules.json')
+        self.assertIsNone(request.validators)
+
+    def test_compute_modules_updates_only_changed_entries(self):
+        self.init_session()
+        modules_json = copy.deepcopy(MODULES_JSON)
+
+        changed = self.module._compute_modules_updates(modules_json)
+        self.assertEqual(changed, set(self.module._modules_updates.keys()))
+
+        # nothing changed
+        changed = self.module._compute_modules_updates(modules_json)
+        self.assertEqual(changed, set())
+
+        # single entry changed
+        modules_json['list']['system']['version'] = '6.6.6'
+        modules_json['list']['system']['changelog'] = 'new version changelog'
+        changed = self.module._compute_modules_updates(modules_json)
+        self.assertEqual(changed, {'system'})
+        self.assertTrue(self.module._modules_updates['system']['updatable'])
+        self.assertEqual(self.module._modules_updates['system']['update']['version'], '6.6.6')
+
+        # installed version changed
+        self.module._modules_updates['audio']['version'] = '1.0.0'
+        changed = self.module._compute_modules_updates(modules_json)
+        self.assertEqual(changed, {'audio'})
+
+    @patch('backend.update.ModulesJson')
+    def test_check_modules_updates_returns_changed_modules(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
+        modules_json = copy.deepcopy(MODULES_JSON)
+        mock_modulesjson.return_value.get_json.return_value = modules_json
+        mock_modulesjson.return_value.update.return_value = True
+        self.init_session()
+        request = Mock()
+        request.is_modified.return_value = True
+        request.get_validators.return_value = {}
+        self.module._get_modules_json_request = Mock(return_value=request)
+
+        updates = self.module.check_modules_updates()
+        self.assertEqual(updates['changedmodules'], sorted(self.module._modules_updates.keys()))
+
+        modules_json['list']['system']['version'] = '6.6.6'
+        updates = self.module.check_modules_updates()
+        self.assertEqual(updates['changedmodules'], ['system'])
+        self.assertTrue(updates['modulesupdates'])
+
+    @patch('backend.update.ConditionalRequest', Mock())
     @patch('backend.update.ModulesJson')
     def test_check_modules_updates_modules_json_exception(self, mock_modulesjson):
+        mock_modulesjson.CONF = '/tmp/notexists/modules.json'
         mock_modulesjson.return_value.get_json.return_value = MODULES_JSON
         mock_modulesjson.return_value.update.side_effect = Exception('Test exception')
         self.init_session()
@@ -1238,6 +2385,7 @@ class TestsUpdate(unittest.TestCase):
            self.module.check_modules_updates()
         self.assertEqual(str(cm.exception), 'Unable to refresh modules list from internet')
 
+    @patch('backend.update.ConditionalRequest', Mock())
     @patch('backend.update.ModulesJson')
     @patch('backend.update.Tools')
     def test_check_modules_updates_check_failed(self, mock_tools, mock_modulesjson):
@@ -1282,15 +2430,69 @@ class TestsUpdate(unittest.TestCase):
             'checksumurl': 'https://www.cleep.com/checksumurl'
         }
 
-        self.module.update_cleep()
+        with patch('backend.update.threading.Thread') as mock_thread:
+            self.module.update_cleep()
+            mock_thread.return_value.start.assert_called_once_with()
+            target = mock_thread.call_args[1]['target']
+            args = mock_thread.call_args[1]['args']
+
+        # filesystem is unlocked by background install, not by command
+        self.assertFalse(self.module.cleep_filesystem.enable_write.called)
+        self.assertFalse(mock_installcleep.return_value.install.called)
+        self.assertTrue(self.module.get_cleep_updates()['processing'])
+
+        target(*args)
 
         self.assertTrue(self.module.cleep_filesystem.enable_write.called)
         mock_installcleep.return_value.install.assert_called_once_with(
-            self.module._cleep_updates['packageurl'],
-            self.module._cleep_updates['checksumurl'],
+            'https://www.cleep.com/packageurl',
+            'https://www.cleep.com/checksumurl',
+            self.module._update_cleep_callback
+        )
+
+    def test_update_cleep_already_processing(self):
+        self.init_session()
+        self.module._cleep_updates = {
+            'updatable': True,
+            'processing': True,
+        }
+
+        with self.assertRaises(CommandInfo) as cm:
+            self.module.update_cleep()
+        self.assertEqual(str(cm.exception), 'Cleep update is already in progress')
+
+    @patch('backend.update.InstallCleep')
+    def test_install_cleep_fetches_package_before_unlocking_filesystem(self, mock_installcleep):
+        self.init_session()
+        calls = []
+        self.module.cleep_filesystem = MagicMock()
+        self.module.cleep_filesystem.enable_write.side_effect = lambda *args: calls.append('enable_write')
+        self.module._get_cached_cleep_package_url = Mock(side_effect=lambda package_url, checksum_url: calls.append('fetch') or 'http://127.0.0.1/cleep.deb')
+
+        self.module._install_cleep('https://www.cleep.com/packageurl', 'https://www.cleep.com/checksumurl', '1.0.0')
+
+        self.assertEqual(calls, ['fetch', 'enable_write'])
+        mock_installcleep.return_value.install.assert_called_once_with(
+            'http://127.0.0.1/cleep.deb',
+            'https://www.cleep.com/checksumurl',
             self.module._update_cleep_callback
         )
 
+    @patch('backend.update.InstallCleep')
+    def test_install_cleep_failed(self, mock_installcleep):
+        mock_installcleep.return_value.install.side_effect = Exception('Test exception')
+        self.init_session()
+        self.module.cleep_filesystem = MagicMock()
+        self.module._set_cleep_updates(processing=True)
+
+        self.module._install_cleep('https://www.cleep.com/packageurl', 'https://www.cleep.com/checksumurl', '1.0.0')
+
+        self.assertTrue(self.module.cleep_filesystem.enable_write.called)
+        self.assertTrue(self.module.cleep_filesystem.disable_write.called)
+        updates = self.module.get_cleep_updates()
+        self.assertFalse(updates['processing'])
+        self.assertTrue(updates['failed'])
+
     def test_update_cleep_callback_success(self):
         self.init_session()
         self.module.cleep_filesystem = Mock()
@@ -1380,13 +2582,13 @@ class TestsUpdate(unittest.TestCase):
             'processing': False,
             'pending': True,
         }
-        self.module._modules_updates = {
+        self.module._modules_updates.load({
             'mod1': mod1,
             'mod2': mod2,
             'mod3': mod3,
             'mod4': mod4,
             'mod5': mod5
-        }
+        })
         self.module._postpone_main_action = Mock()
 
         self.module.update_modules()
@@ -1411,6 +2613,16 @@ class TestsUpdate(unittest.TestCase):
         self.assertEqual(str(cm.exception), 'Cleep update is in progress. Please wait end of it')
         self.assertFalse(mock_task.return_value.start.called)
 
+    @patch('backend.update.Task')
+    def test_update_modules_modules_syncing(self, mock_task):
+        self.init_session()
+        self.module._modules_syncing = True
+
+        with self.assertRaises(CommandInfo) as cm:
+            self.module.update_modules()
+        self.assertEqual(str(cm.exception), 'Installed applications are loading. Please try again in a few seconds')
+        self.assertFalse(mock_task.return_value.start.called)
+
     def test_postpone_main_action_install(self):
         self.init_session()
         self.module._set_module_process = Mock()
@@ -1505,10 +2717,13 @@ class TestsUpdate(unittest.TestCase):
 
     def test_store_process_status_module(self):
         self.init_session()
+        self.module._logs_index = Mock()
+        self.module._process_history = Mock()
+        self.module._process_output = Mock()
+        self.module._process_output.get_summary.return_value = {'summary': True}
         with patch('os.path.exists', return_value=True) as mock_os_path_exists:
             cleep_filesystem = MagicMock()
             cleep_filesystem.mkdir = Mock()
-            cleep_filesystem.write_json = Mock()
             self.module.cleep_filesystem = cleep_filesystem
             status = {
                 'status': 'testing',
@@ -1519,18 +2734,31 @@ class TestsUpdate(unittest.TestCase):
 
             self.module._store_process_status(status)
             self.assertFalse(cleep_filesystem.mkdir.called)
-            cleep_filesystem.write_json.assert_called_with('/opt/cleep/install/dummy/process_success.log', status)
+            self.module._process_output.write_status.assert_called_with('dummy', status, '/opt/cleep/install/dummy/process_success.log')
 
             self.module._store_process_status(status, success=False)
             self.assertFalse(cleep_filesystem.mkdir.called)
-            cleep_filesystem.write_json.assert_called_with('/opt/cleep/install/dummy/process_failure.log', status)
+            self.module._process_output.write_status.assert_called_with('dummy', status, '/opt/cleep/install/dummy/process_failure.log')
+            self.module._logs_index.update.assert_called_with('dummy', '/opt/cleep/install/dummy/process_failure.log', True)
+            self.module._process_output.write.assert_called_with('dummy', status)
+            self.module._process_output.get_summary.assert_called_with('dummy', status)
+            self.module._process_history.append.assert_called_with(
+                'dummy',
+                {'summary': True},
+                True,
+                self.module._process_output.iter_lines.return_value,
+            )
+            self.module._process_output.finish.assert_called_with('dummy')
 
     def test_store_process_status_cleep(self):
         self.init_session()
+        self.module._logs_index = Mock()
+        self.module._process_history = Mock()
+        self.module._process_output = Mock()
+        self.module._process_output.get_summary.return_value = {'summary': True}
         with patch('os.path.exists', return_value=True) as mock_os_path_exists:
             cleep_filesystem = MagicMock()
             cleep_filesystem.mkdir = Mock()
-            cleep_filesystem.write_json = Mock()
             self.module.cleep_filesystem = cleep_filesystem
             status = {
                 'status': 'testing',
@@ -1541,19 +2769,23 @@ class TestsUpdate(unittest.TestCase):
             self.module._store_process_status(status)
             self.assertFalse(cleep_filesystem.mkdir.called)
             status.update({'module': 'cleep'})
-            cleep_filesystem.write_json.assert_called_with('/opt/cleep/install/cleep/process_success.log', status)
+            self.module._process_output.write_status.assert_called_with('cleep', status, '/opt/cleep/install/cleep/process_success.log')
 
             self.module._store_process_status(status, success=False)
             self.assertFalse(cleep_filesystem.mkdir.called)
             status.update({'module': 'cleep'})
-            cleep_filesystem.write_json.assert_called_with('/opt/cleep/install/cleep/process_failure.log', status)
+            self.module._process_output.write_status.assert_called_with('cleep', status, '/opt/cleep/install/cleep/process_failure.log')
+            self.module._process_output.write.assert_called_with('cleep', status)
 
     def test_store_process_status_create_log_dir(self):
         self.init_session()
+        self.module._logs_index = Mock()
+        self.module._process_history = Mock()
+        self.module._process_output = Mock()
+        self.module._process_output.get_summary.return_value = {'summary': True}
         with patch('os.path.exists', return_value=False) as mock_os_path_exists:
             cleep_filesystem = MagicMock()
             cleep_filesystem.mkdir = Mock()
-            cleep_filesystem.write_json = Mock()
             self.module.cleep_filesystem = cleep_filesystem
             status = {
                 'status': 'testing',
@@ -1569,12 +2801,16 @@ class TestsUpdate(unittest.TestCase):
 
     def test_store_process_status_handle_write_error(self):
         self.init_session()
+        self.module._logs_index = Mock()
+        self.module._process_history = Mock()
+        self.module._process_output = Mock()
+        self.module._process_output.get_summary.return_value = {'summary': True}
         with patch('os.path.exists', return_value=True) as mock_os_path_exists:
             self.module.logger = Mock()
             self.module.logger.error = Mock()
             cleep_filesystem = MagicMock()
             cleep_filesystem.mkdir = Mock()
-            cleep_filesystem.write_json = Mock(return_value=False)
+            self.module._process_output.write_status.return_value = False
             self.module.cleep_filesystem = cleep_filesystem
             status = {
                 'status': 'testing',
@@ -1586,6 +2822,28 @@ class TestsUpdate(unittest.TestCase):
             self.module._store_process_status(status)
 
             self.assertTrue(self.module.logger.error.called)
+            self.assertFalse(self.module._logs_index.update.called)
+            self.assertFalse(self.module._process_history.append.called)
+            self.module._process_output.finish.assert_called_with('dummy')
+
+    def test_store_process_status_handle_history_error(self):
+        self.init_session()
+        self.module._logs_index = Mock()
+        self.module._process_history = Mock()
+        self.module._process_history.append.side_effect = Exception('Test exception')
+        self.module._process_output = Mock()
+        with patch('os.path.exists', return_value=True) as mock_os_path_exists:
+            self.module.cleep_filesystem = MagicMock()
+            status = {
+                'status': 'testing',
+                'module': 'dummy',
+                'stdout': ['info'],
+                'stderr': ['error'],
+            }
+
+            self.module._store_process_status(status)
+
+            self.assertTrue(self.module._logs_index.update.called)
 
     @patch('backend.update.Task')
     def test_install_module(self, mock_task):
@@ -1607,6 +2865,14 @@ class TestsUpdate(unittest.TestCase):
             self.module.install_module('dummy')
         self.assertEqual(str(cm.exception), 'Cleep update is in progress. Please wait end of it')
 
+    def test_install_module_modules_syncing(self):
+        self.init_session()
+        self.module._modules_syncing = True
+
+        with self.assertRaises(CommandInfo) as cm:
+            self.module.install_module('dummy')
+        self.assertEqual(str(cm.exception), 'Installed applications are loading. Please try again in a few seconds')
+
     @patch('backend.update.Task')
     def test_install_module_already_installed(self, mock_task):
         self.init_session()
@@ -1754,9 +3020,15 @@ class TestsUpdate(unittest.TestCase):
         }
         self.init_session()
         self.module._store_process_status = Mock()
+        self.module._process_output = Mock()
+        self.module._output_streamer = Mock()
+        self.module._update_module_progress = Mock()
 
         self.module._Update__install_module_callback(status)
 
+        self.module._process_output.write.assert_called_with('dummy', status)
+        self.module._output_streamer.feed.assert_called_with('dummy', status, False)
+        self.module._update_module_progress.assert_called_once_with()
         self.assertFalse(self.module._store_process_status.called)
         self.assertEqual(self.session.event_call_count('update.module.install'), 1)
         self.assertFalse(self.module._need_restart)
@@ -1772,9 +3044,16 @@ class TestsUpdate(unittest.TestCase):
         }
         self.init_session()
         self.module._store_process_status = Mock()
+        self.module._process_output = Mock()
+        self.module._output_streamer = Mock()
+        self.module._progress_model = Mock()
+        self.module._update_module_progress = Mock()
 
         self.module._Update__install_module_callback(status)
 
+        self.module._output_streamer.feed.assert_called_with('dummy', status, True)
+        self.module._progress_model.end_step.assert_any_call()
+        self.module._update_module_progress.assert_called_once_with(pending=True)
         self.module._store_process_status.assert_called_with(status, success=True)
         self.assertEqual(self.session.event_call_count('update.module.install'), 1)
         self.assertTrue(self.module._need_restart)
@@ -1791,9 +3070,11 @@ class TestsUpdate(unittest.TestCase):
         self.init_session()
         self.module._store_process_status = Mock()
         self.module._set_module_process = Mock()
+        self.module._progress_model = Mock()
 
         self.module._Update__install_module_callback(status)
 
+        self.module._progress_model.end_step.assert_called_once_with()
         self.module._store_process_status.assert_called_with(status, success=False)
         self.assertEqual(self.session.event_call_count('update.module.install'), 1)
         self.assertFalse(self.module._need_restart)
@@ -1914,6 +3195,21 @@ class TestsUpdate(unittest.TestCase):
         self.assertEqual(sorted(deps), ['dummy1', 'dummy2', 'dummy3'])
         self.assertCountEqual(deps, list(modules_infos.keys()))
 
+    def test_get_module_dependencies_circular_deps_without_main_module(self):
+        callback = Mock(side_effect=[
+            { 'deps': ['dummy2'] }, # dummy1 deps
+            { 'deps': ['dummy3'] }, # dummy2 deps
+            { 'deps': ['dummy2'] }, # dummy3 deps
+        ])
+        self.init_session()
+
+        modules_infos = {}
+        deps = self.module._get_module_dependencies('dummy1', modules_infos, callback)
+        logging.debug('Deps: %s' % deps)
+
+        self.assertEqual(deps, ['dummy3', 'dummy2', 'dummy1'])
+        self.assertEqual(callback.call_count, 3)
+
     @patch('backend.update.Task')
     def test_uninstall_module(self, mock_task):
         self.init_session()
@@ -1941,6 +3237,14 @@ class TestsUpdate(unittest.TestCase):
             self.module.uninstall_module('dummy')
         self.assertEqual(str(cm.exception), 'Cleep update is in progress. Please wait end of it')
 
+    def test_uninstall_module_modules_syncing(self):
+        self.init_session()
+        self.module._modules_syncing = True
+
+        with self.assertRaises(CommandInfo) as cm:
+            self.module.uninstall_module('dummy')
+        self.assertEqual(str(cm.exception), 'Installed applications are loading. Please try again in a few seconds')
+
     @patch('backend.update.Task')
     def test_uninstall_module_check_params(self, mock_task):
         self.init_session()
@@ -2191,6 +3495,14 @@ class TestsUpdate(unittest.TestCase):
             self.module.update_module('dummy')
         self.assertEqual(str(cm.exception), 'Cleep update is in progress. Please wait end of it')
 
+    def test_update_module_modules_syncing(self):
+        self.init_session()
+        self.module._modules_syncing = True
+
+        with self.assertRaises(CommandInfo) as cm:
+            self.module.update_module('dummy')
+        self.assertEqual(str(cm.exception), 'Installed applications are loading. Please try again in a few seconds')
+
     @patch('backend.update.Task')
     def test_update_module_not_installed(self, mock_task):
         self.init_session()
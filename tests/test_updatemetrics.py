@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('../')
+from fakefilesystem import FakeFilesystem
+from backend.updatemetrics import UpdateMetrics
+from mock import Mock, patch
+
+class TestsUpdateMetrics(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=logging.FATAL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.metrics = UpdateMetrics(FakeFilesystem())
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_metrics_empty(self):
+        metrics = self.metrics.get_metrics()
+
+        self.assertCountEqual(list(metrics['phases'].keys()), UpdateMetrics.PHASES)
+        self.assertEqual(metrics['phases']['install'], {'count': 0, 'total': 0.0, 'max': 0.0, 'last': None, 'average': None})
+        self.assertEqual(metrics['counters'], {
+            'cleepchecks': 0,
+            'moduleschecks': 0,
+            'cachehits': 0,
+            'cachemisses': 0,
+            'downloadedbytes': 0,
+        })
+        self.assertEqual(metrics['failures'], {})
+
+    def test_add_duration(self):
+        self.metrics.add_duration('install', 4.0)
+        self.metrics.add_duration('install', 2.0)
+        self.metrics.add_duration('install', None)
+
+        self.assertEqual(self.metrics.get_metrics()['phases']['install'], {
+            'count': 2,
+            'total': 6.0,
+            'max': 4.0,
+            'last': 2.0,
+            'average': 3.0,
+        })
+
+    @patch('backend.updatemetrics.time')
+    def test_timer(self, mock_time):
+        mock_time.monotonic.side_effect = [10.0, 12.5]
+
+        with self.metrics.timer('resolve'):
+            pass
+
+        self.assertEqual(self.metrics.get_metrics()['phases']['resolve']['total'], 2.5)
+
+    @patch('backend.updatemetrics.time')
+    def test_timer_exception(self, mock_time):
+        mock_time.monotonic.side_effect = [10.0, 11.0]
+
+        with self.assertRaises(Exception):
+            with self.metrics.timer('inventory'):
+                raise Exception('Test exception')
+
+        self.assertEqual(self.metrics.get_metrics()['phases']['inventory']['count'], 1)
+
+    def test_increment(self):
+        self.metrics.increment('moduleschecks')
+        self.metrics.increment('downloadedbytes', 1024)
+
+        counters = self.metrics.get_metrics({'downloadedbytes': 100, 'cachehits': 3})['counters']
+        self.assertEqual(counters['moduleschecks'], 1)
+        self.assertEqual(counters['downloadedbytes'], 1124)
+        self.assertEqual(counters['cachehits'], 3)
+
+    def test_add_failure(self):
+        self.metrics.add_failure('install')
+        self.metrics.add_failure('install')
+        self.metrics.add_failure('inventory')
+
+        self.assertEqual(self.metrics.get_metrics()['failures'], {'install': 2, 'inventory': 1})
+
+    def test_to_prometheus(self):
+        self.metrics.add_duration('install', 4.0)
+        self.metrics.increment('cleepchecks')
+        self.metrics.add_failure('update')
+
+        lines = self.metrics.to_prometheus({'cachehits': 2}).splitlines()
+        logging.debug('Metrics: %s' % lines)
+
+        self.assertIn('# TYPE cleep_update_phase_duration_seconds_total counter', lines)
+        self.assertIn('cleep_update_phase_runs_total{phase="install"} 1.0', lines)
+        self.assertIn('cleep_update_phase_duration_seconds_total{phase="install"} 4.0', lines)
+        self.assertIn('cleep_update_phase_last_duration_seconds{phase="install"} 4.0', lines)
+        self.assertNotIn('cleep_update_phase_last_duration_seconds{phase="resolve"} 0.0', lines)
+        self.assertIn('cleep_update_cleep_checks_total 1.0', lines)
+        self.assertIn('cleep_update_cache_hits_total 2.0', lines)
+        self.assertIn('cleep_update_failures_total{type="update"} 1.0', lines)
+
+    def test_write_prometheus(self):
+        path = os.path.join(self.path, 'update.prom')
+        self.metrics.add_duration('download', 1.5)
+
+        self.metrics.write_prometheus(path)
+
+        with open(path) as fd:
+            content = fd.read()
+        self.assertEqual(content, self.metrics.to_prometheus())
+        self.assertEqual(os.listdir(self.path), ['update.prom'])
+
+    def test_write_prometheus_error(self):
+        cleep_filesystem = Mock()
+        cleep_filesystem.open.side_effect = Exception('Test exception')
+        metrics = UpdateMetrics(cleep_filesystem)
+
+        with self.assertRaises(Exception):
+            metrics.write_prometheus(os.path.join(self.path, 'update.prom'))
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_write_prometheus_rename_error(self):
+        cleep_filesystem = FakeFilesystem()
+        cleep_filesystem.rename = Mock(return_value=False)
+        metrics = UpdateMetrics(cleep_filesystem)
+        path = os.path.join(self.path, 'update.prom')
+
+        with self.assertRaises(Exception) as cm:
+            metrics.write_prometheus(path)
+        self.assertEqual(str(cm.exception), 'Unable to write metrics file "%s"' % path)
+        cleep_filesystem.rename.assert_called_with('%s.tmp' % path, path)
+
+if __name__ == '__main__':
+    # coverage run --omit="*lib/python*/*","test_*" --concurrency=thread test_updatemetrics.py; coverage report -m -i
+    unittest.main()